@@ -0,0 +1,91 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import time
+import threading
+from collections import OrderedDict
+
+from FeatureServer.Cache import Cache
+
+class Memory (Cache):
+    """Per-process LRU response cache bounded by the size in bytes of the
+       cached response bodies. Its generation counters are only seen by
+       this process, so ETags are off unless conditional=true."""
+
+    def __init__ (self, size = 10485760, conditional = 'false', **kwargs):
+        Cache.__init__(self, conditional = conditional, **kwargs)
+        self.size        = int(size)
+        self.bytes       = 0
+        self.entries     = OrderedDict() # key -> (layer, generation, expires, response, size)
+        self.layers      = {} # layer -> set of keys
+        self.generations = {}
+        self.lock        = threading.Lock()
+
+        self.hits   = 0
+        self.misses = 0
+
+    def get (self, key):
+        self.lock.acquire()
+        try:
+            entry = self.entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            layer, generation, expires, response, size = entry
+            if expires < time.time() or generation != self.generations.get(layer, 0):
+                self._forget(key, layer, size)
+                self.misses += 1
+                return None
+            # most recently used entries are kept at the end
+            self.entries[key] = entry
+            self.hits += 1
+            return response
+        finally:
+            self.lock.release()
+
+    def set (self, key, layer, generation, response, ttl):
+        size = len(response[1])
+        if size > self.max_entry or size > self.size:
+            return
+        self.lock.acquire()
+        try:
+            if generation != self.generations.get(layer, 0):
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self._forget(key, old[0], old[4])
+            while self.entries and self.bytes + size > self.size:
+                old_key, old = self.entries.popitem(last = False)
+                self._forget(old_key, old[0], old[4])
+            self.entries[key] = (layer, generation, time.time() + ttl, response, size)
+            self.layers.setdefault(layer, set()).add(key)
+            self.bytes += size
+        finally:
+            self.lock.release()
+
+    def generation (self, layer):
+        return self.generations.get(layer, 0)
+
+    def invalidate (self, layer):
+        self.lock.acquire()
+        try:
+            self.generations[layer] = self.generations.get(layer, 0) + 1
+            for key in self.layers.pop(layer, ()):
+                entry = self.entries.pop(key, None)
+                if entry is not None:
+                    self.bytes -= entry[4]
+        finally:
+            self.lock.release()
+
+    def stats (self):
+        return {'entries': len(self.entries), 'bytes': self.bytes,
+                'hits': self.hits, 'misses': self.misses}
+
+    def _forget (self, key, layer, size):
+        """Drops the bookkeeping of an entry already removed from entries."""
+        self.bytes -= size
+        keys = self.layers.get(layer)
+        if keys is not None:
+            keys.discard(key)
@@ -0,0 +1,200 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import os
+import time
+import hashlib
+import threading
+import sqlite3
+import simplejson
+
+try:
+    import fcntl
+except ImportError:
+    # no lock files on Windows, requests are only coalesced per process
+    fcntl = None
+
+from FeatureServer.Cache import Cache
+
+class SQLite (Cache):
+    """Response cache in a SQLite file shared by all worker processes of a
+       host. Every write runs in its own transaction, so workers never see
+       partially written entries, and the layer generations live in the
+       same file, so an invalidation in one worker is seen by all others.
+
+       The cache is bounded by the bytes of the cached bodies, the least
+       recently read entries are removed first. To keep reads cheap the
+       access time of an entry is updated at most once per
+       touch_interval seconds.
+
+       Single flights span the worker processes: the leading process holds
+       a lock on one byte of the file lock_file, at an offset derived from
+       the request signature, while it builds the response."""
+
+    def __init__ (self, file, size = 104857600, timeout = 5.0, touch_interval = 1.0, lock_file = None, poll_interval = 0.05, **kwargs):
+        Cache.__init__(self, **kwargs)
+        self.file           = file
+        self.size           = int(size)
+        self.timeout        = float(timeout)
+        self.touch_interval = float(touch_interval)
+        self.poll_interval  = float(poll_interval)
+        self.local          = threading.local()
+
+        self.lock_file = None
+        if self.coalesce and fcntl is not None:
+            # kept open, closing any descriptor of the file would release
+            # all locks of the process
+            self.lock_file = os.open(lock_file or file + ".lock", os.O_RDWR | os.O_CREAT, 0666)
+
+        db = self.connection()
+        db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, layer TEXT, generation INTEGER, expires REAL, accessed REAL, size INTEGER, mime TEXT, headers TEXT, encoding TEXT, text INTEGER, data BLOB)")
+        db.execute("CREATE INDEX IF NOT EXISTS responses_layer ON responses (layer)")
+        db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        db.execute("CREATE TABLE IF NOT EXISTS generations (layer TEXT PRIMARY KEY, generation INTEGER)")
+        # the epoch of the file is shared by all workers, a new file has
+        # a new one
+        db.execute("CREATE TABLE IF NOT EXISTS settings (name TEXT PRIMARY KEY, value TEXT)")
+        db.execute("INSERT OR IGNORE INTO settings (name, value) VALUES ('epoch', ?)", (self.epoch,))
+        self.epoch = db.execute("SELECT value FROM settings WHERE name = 'epoch'").fetchone()[0]
+
+    def connection (self):
+        """One connection per thread; sqlite3 connections can not be
+           shared between threads."""
+        db = getattr(self.local, 'db', None)
+        if db is None:
+            # transactions are started explicitly with BEGIN IMMEDIATE
+            db = sqlite3.connect(self.file, timeout = self.timeout, isolation_level = None)
+            db.execute("PRAGMA journal_mode=WAL")
+            self.local.db = db
+        return db
+
+    def get (self, key):
+        db = self.connection()
+        row = db.execute("SELECT r.generation, COALESCE(g.generation, 0), r.expires, r.accessed, r.mime, r.headers, r.encoding, r.text, r.data FROM responses r LEFT JOIN generations g ON g.layer = r.layer WHERE r.key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        generation, current, expires, accessed, mime, headers, encoding, text, data = row
+        now = time.time()
+        if generation != current or expires < now:
+            return None
+        if now - accessed > self.touch_interval:
+            try:
+                db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                # another worker holds the write lock, the entry stays older
+                pass
+        if not text:
+            data = str(data)
+        return (mime, data, simplejson.loads(headers), encoding)
+
+    def set (self, key, layer, generation, response, ttl):
+        mime, data, headers, encoding = response
+        text = isinstance(data, unicode)
+        if text:
+            size = len(data.encode('utf-8'))
+        else:
+            size = len(data)
+            data = buffer(data)
+        if size > self.max_entry or size > self.size:
+            return
+
+        db = self.connection()
+        try:
+            # take the write lock first so the generation can not change
+            # before the entry is stored
+            db.execute("BEGIN IMMEDIATE")
+            if generation != self._generation(db, layer):
+                db.execute("ROLLBACK")
+                return
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total + size > self.size:
+                self._evict(db, total + size - self.size)
+            now = time.time()
+            db.execute("INSERT INTO responses (key, layer, generation, expires, accessed, size, mime, headers, encoding, text, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                       (key, layer, generation, now + ttl, now, size, mime, simplejson.dumps(headers or {}), encoding, int(text), data))
+            db.execute("COMMIT")
+        except sqlite3.OperationalError:
+            # the cache is busy, the response is simply not cached
+            self._rollback(db)
+
+    def lead (self, key):
+        if not Cache.lead(self, key):
+            return False
+        if self.lock_file is None:
+            return True
+        # this is the first thread of the process, but another process may
+        # already lead the flight
+        offset = self._lockOffset(key)
+        deadline = time.time() + self.flight_timeout
+        waited = False
+        while True:
+            try:
+                fcntl.lockf(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+            except IOError:
+                if time.time() >= deadline:
+                    break
+                waited = True
+                time.sleep(self.poll_interval)
+                continue
+            if not waited:
+                return True
+            fcntl.lockf(self.lock_file, fcntl.LOCK_UN, 1, offset)
+            break
+        # the threads of this process waiting for this one read the
+        # response of the other process from the cache as well
+        Cache.land(self, key)
+        return False
+
+    def land (self, key):
+        if self.lock_file is not None:
+            fcntl.lockf(self.lock_file, fcntl.LOCK_UN, 1, self._lockOffset(key))
+        Cache.land(self, key)
+
+    def generation (self, layer):
+        return self._generation(self.connection(), layer)
+
+    def invalidate (self, layer):
+        db = self.connection()
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("INSERT OR IGNORE INTO generations (layer, generation) VALUES (?, 0)", (layer,))
+            db.execute("UPDATE generations SET generation = generation + 1 WHERE layer = ?", (layer,))
+            db.execute("DELETE FROM responses WHERE layer = ?", (layer,))
+            db.execute("COMMIT")
+        except:
+            self._rollback(db)
+            raise
+
+    def stats (self):
+        entries, size = self.connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {'entries': entries, 'bytes': size}
+
+    def _generation (self, db, layer):
+        row = db.execute("SELECT generation FROM generations WHERE layer = ?", (layer,)).fetchone()
+        if row is None:
+            return 0
+        return row[0]
+
+    def _lockOffset (self, key):
+        return int(hashlib.sha1(key).hexdigest()[:7], 16)
+
+    def _rollback (self, db):
+        try:
+            db.execute("ROLLBACK")
+        except sqlite3.OperationalError:
+            # BEGIN itself failed, there is no transaction
+            pass
+
+    def _evict (self, db, needed):
+        """Deletes the least recently read entries, at least needed bytes."""
+        freed = 0
+        keys = []
+        for key, size in db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            keys.append((key,))
+            freed += size
+            if freed >= needed:
+                break
+        db.executemany("DELETE FROM responses WHERE key = ?", keys)
@@ -0,0 +1,107 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import uuid
+import hashlib
+import threading
+
+from FeatureServer.Registry import Registry
+
+class Cache (object):
+    """Base response cache. Caches map the signature of a read-only
+       request to its encoded response, a (mime, data, headers, encoding)
+       tuple, for the time to live of the layer.
+
+       Every layer has a generation counter which is increased by
+       invalidate() when features of the layer are written. Responses are
+       stored together with the generation they were read in and are only
+       valid as long as the generation has not changed, so a response that
+       was being built while a transaction committed is never served.
+       The same counters make up the ETags of conditional GET requests,
+       together with the epoch of the cache: the counters of a new cache
+       start at 0 again, so its ETags must differ from those of the last.
+
+       Identical requests arriving while the response is being built wait
+       for the first one and are answered from the cache (single flight),
+       see lead() and land()."""
+
+    def __init__ (self, ttl = 0, max_entry = 1048576, conditional = 'true', coalesce = 'true', flight_timeout = 30, **kwargs):
+        self.ttl       = int(ttl)
+        self.max_entry = int(max_entry)
+
+        self.conditional = True
+        if str(conditional).lower() == 'false':
+            self.conditional = False
+        self.epoch = uuid.uuid4().hex
+
+        self.coalesce = True
+        if str(coalesce).lower() == 'false':
+            self.coalesce = False
+        self.flight_timeout = float(flight_timeout)
+        self.flights        = {} # key -> threading.Event
+        self.flights_lock   = threading.Lock()
+
+    def signature (self, layer, format, base_path, path_info, params):
+        """Normalised key of a request: the parameters are sorted, so the
+           same query in a different parameter order shares the entry."""
+        items = [(unicode(key), unicode(value)) for key, value in params.items()]
+        items.sort()
+        signature = repr((layer, format, base_path, path_info, items))
+        return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+    def entityTag (self, signature, generation, last_modified = None):
+        """ETag of a response, changes with every write to the layer, with
+           the modification time reported by the datasource and with the
+           epoch of the cache."""
+        return hashlib.sha1("%s:%s:%s:%s" % (self.epoch, signature, generation, last_modified)).hexdigest()
+
+    def getTTL (self, datasource):
+        """Time to live of the layer in seconds, the cache_ttl option of
+           its section or the ttl of the cache. 0 disables caching."""
+        return int(getattr(datasource, 'cache_ttl', self.ttl))
+
+    def lead (self, key):
+        """Starts the single flight of key. Returns True if no identical
+           request is in flight; the caller builds and caches the response
+           and has to call land() afterwards. Otherwise waits for the
+           leading request to land, at most flight_timeout seconds, and
+           returns False: the response is in the cache by then, unless it
+           could not be cached."""
+        self.flights_lock.acquire()
+        try:
+            flight = self.flights.get(key)
+            if flight is None:
+                self.flights[key] = threading.Event()
+                return True
+        finally:
+            self.flights_lock.release()
+        flight.wait(self.flight_timeout)
+        return False
+
+    def land (self, key):
+        """Ends the single flight of key and wakes up the waiting requests.
+           Landing twice is harmless."""
+        self.flights_lock.acquire()
+        try:
+            flight = self.flights.pop(key, None)
+        finally:
+            self.flights_lock.release()
+        if flight is not None:
+            flight.set()
+
+    def get (self, key):
+        raise NotImplementedError
+
+    def set (self, key, layer, generation, response, ttl):
+        raise NotImplementedError
+
+    def generation (self, layer):
+        raise NotImplementedError
+
+    def invalidate (self, layer):
+        raise NotImplementedError
+
+# cache types of the type option of the cache section
+caches = Registry("FeatureServer.Cache", ["Memory", "SQLite"])
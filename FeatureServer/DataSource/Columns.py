@@ -0,0 +1,45 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import re
+
+alias = re.compile(r'\s+as\s+("?)([^"\s]+)\1\s*$', re.IGNORECASE)
+
+def split (columns, separator = ','):
+    """Splits a configured column list, e.g. attribute_cols, into its
+       SELECT expressions. Separators inside parentheses or quotes are part
+       of an expression."""
+    expressions = []
+    depth = 0
+    quote = None
+    start = 0
+    for index, char in enumerate(columns):
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == separator and depth == 0:
+            expressions.append(columns[start:index].strip())
+            start = index + 1
+    expressions.append(columns[start:].strip())
+    return [expression for expression in expressions if expression]
+
+def name (expression):
+    """Property name of a SELECT expression, its alias or else the column
+       it reads."""
+    match = alias.search(expression)
+    if match is not None:
+        return match.group(2)
+    return expression.strip().split('.')[-1].strip('"')
+
+def named (columns, separator = ','):
+    """(property name, SELECT expression) pairs of a configured column
+       list."""
+    return [(name(expression), expression) for expression in split(columns, separator)]
@@ -0,0 +1,191 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import time
+import threading
+import warnings
+
+class PoolExhaustedException(Exception):
+    """Raised when no connection became available within the wait timeout."""
+    pass
+
+class ConnectionPool (object):
+    """Per-process pool of long-lived database connections. Connections are
+       checked out with getconn() and handed back with putconn() instead of
+       being closed, so the TCP and authentication setup is only paid when
+       the pool grows.
+
+       connect is a callable returning a new DB-API connection. Idle
+       connections are health checked before they are handed out again and
+       reaped once they were unused for longer than idle_timeout seconds
+       (the pool never shrinks below minconn)."""
+
+    def __init__ (self, connect, minconn = 1, maxconn = 10, idle_timeout = 300.0, check_interval = 30.0, wait_timeout = 30.0):
+        self.connect        = connect
+        self.minconn        = int(minconn)
+        self.maxconn        = int(maxconn)
+        self.idle_timeout   = float(idle_timeout)
+        self.check_interval = float(check_interval)
+        self.wait_timeout   = float(wait_timeout)
+
+        self._idle      = [] # (connection, last used) tuples, most recent last
+        self._used      = {}
+        self._connecting = 0
+        self._cond     = threading.Condition(threading.Lock())
+
+        self.created    = 0
+        self.closed     = 0
+        self.checkouts  = 0
+        self.waits      = 0
+        self.failed_checks = 0
+
+    def getconn (self):
+        """Check out a connection. Reuses a healthy idle connection if there
+           is one, opens a new one while below maxconn and otherwise waits for
+           another request to return its connection."""
+        self._cond.acquire()
+        try:
+            self._reap()
+            deadline = None
+            while True:
+                while self._idle:
+                    conn, last_used = self._idle.pop()
+                    if self._healthy(conn, last_used):
+                        return self._checkout(conn)
+                    self._close(conn)
+                    self.failed_checks += 1
+
+                if len(self._used) + self._connecting < self.maxconn:
+                    # reserve the slot and connect without holding the lock
+                    self._connecting += 1
+                    self._cond.release()
+                    try:
+                        conn = self.connect()
+                    finally:
+                        self._cond.acquire()
+                        self._connecting -= 1
+                    self.created += 1
+                    return self._checkout(conn)
+
+                if deadline is None:
+                    deadline = time.time() + self.wait_timeout
+                    self.waits += 1
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise PoolExhaustedException("All %d connections of the pool are in use." % self.maxconn)
+                self._cond.wait(remaining)
+        finally:
+            self._cond.release()
+
+    def putconn (self, conn, close = False):
+        """Return a connection to the pool. Any transaction still open on it
+           is rolled back so the next request starts clean."""
+        self._cond.acquire()
+        try:
+            if not self._used.has_key(id(conn)):
+                return
+            del self._used[id(conn)]
+
+            if not close and not getattr(conn, 'closed', False):
+                try:
+                    conn.rollback()
+                except Exception:
+                    close = True
+
+            if close or getattr(conn, 'closed', False) or len(self._idle) >= self.maxconn:
+                self._close(conn)
+            else:
+                self._idle.append((conn, time.time()))
+
+            self._reap()
+            self._cond.notify()
+        finally:
+            self._cond.release()
+
+    def closeall (self):
+        """Close all idle connections. Checked out connections are closed
+           when they are returned."""
+        self._cond.acquire()
+        try:
+            for conn, last_used in self._idle:
+                self._close(conn)
+            self._idle = []
+        finally:
+            self._cond.release()
+
+    def stats (self):
+        """Return a dict describing the current state of the pool."""
+        self._cond.acquire()
+        try:
+            return {'idle'          : len(self._idle),
+                    'used'          : len(self._used),
+                    'minconn'       : self.minconn,
+                    'maxconn'       : self.maxconn,
+                    'created'       : self.created,
+                    'closed'        : self.closed,
+                    'checkouts'     : self.checkouts,
+                    'waits'         : self.waits,
+                    'failed_checks' : self.failed_checks}
+        finally:
+            self._cond.release()
+
+    def _checkout (self, conn):
+        self._used[id(conn)] = conn
+        self.checkouts += 1
+        return conn
+
+    def _healthy (self, conn, last_used):
+        if getattr(conn, 'closed', False):
+            return False
+        if time.time() - last_used < self.check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _reap (self):
+        """Close connections idle for longer than idle_timeout, oldest first,
+           keeping at least minconn connections open."""
+        now = time.time()
+        while self._idle and len(self._idle) + len(self._used) > self.minconn:
+            conn, last_used = self._idle[0]
+            if now - last_used < self.idle_timeout:
+                break
+            self._idle.pop(0)
+            self._close(conn)
+
+    def _close (self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self.closed += 1
+
+
+pools = {}
+pools_lock = threading.Lock()
+
+def getPool (key, connect, **kwargs):
+    """Return the process-wide pool registered for key (usually a dsn),
+       creating it on first use. The pool keeps the settings of the first
+       layer using it, other settings are warned about."""
+    pools_lock.acquire()
+    try:
+        if not pools.has_key(key):
+            pools[key] = ConnectionPool(connect, **kwargs)
+        else:
+            pool = pools[key]
+            for name, value in kwargs.items():
+                current = getattr(pool, name, None)
+                if current is not None and current != type(current)(value):
+                    warnings.warn("connection pool %s already uses %s=%s, ignoring %s" % (key, name, current, value))
+        return pools[key]
+    finally:
+        pools_lock.release()
@@ -0,0 +1,123 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import base64
+
+import simplejson
+
+from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
+
+def sort_keys (order, fid):
+    """(column, descending) pairs of the ORDER BY clause of a layer. The
+       fid is added as the last key, so every row has a distinct position
+       to continue from."""
+    keys = []
+    for term in (order or '').split(','):
+        parts = term.split()
+        if len(parts) == 0:
+            continue
+        descending = len(parts) > 1 and parts[1].upper() == 'DESC'
+        keys.append((parts[0], descending))
+    if fid not in [column for column, descending in keys]:
+        keys.append((fid, False))
+    return keys
+
+def order_by (keys, dialect = 'postgresql'):
+    """ORDER BY terms of keys, with NULL values of the order columns last
+       as seek expects them. SQLite before 3.30 has no NULLS LAST, but
+       sorts NULLs last in descending order. The last key is the fid,
+       which is never NULL."""
+    terms = []
+    for index, (column, descending) in enumerate(keys):
+        term = "%s%s" % (column, descending and " DESC" or "")
+        if index == len(keys) - 1:
+            terms.append(term)
+        elif dialect == 'postgresql':
+            terms.append(term + " NULLS LAST")
+        elif descending:
+            terms.append(term)
+        else:
+            terms.append("%s IS NULL, %s" % (column, term))
+    return ", ".join(terms)
+
+def property_name (column):
+    """Property of the features a sort column is read from, e.g. name for
+       t."name"."""
+    return column.split('.')[-1].strip('"')
+
+def encode (keys, feature, fid):
+    """Opaque token continuing a paged select after feature, or None if
+       a sort key is not among the properties of the feature."""
+    values = []
+    for column, descending in keys:
+        if column == fid:
+            values.append(feature.id)
+        elif feature.properties.has_key(property_name(column)):
+            values.append(feature.properties[property_name(column)])
+        else:
+            return None
+    return base64.urlsafe_b64encode(simplejson.dumps(values, default=unicode)).rstrip('=')
+
+def decode (token, keys, layer):
+    try:
+        values = simplejson.loads(base64.urlsafe_b64decode(str(token) + '=' * (-len(token) % 4)))
+    except Exception, E:
+        raise InvalidValueException(**{'dump':"Continuation token is malformed: %s" % E, 'layer':layer, 'locator':'continuation'})
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidValueException(**{'dump':"Continuation token does not match the sort order of the layer.", 'layer':layer, 'locator':'continuation'})
+    return values
+
+def seek (keys, values, placeholder, row_values = False):
+    """WHERE predicate selecting the rows after values in the order of
+       keys, with its bind parameters. placeholder formats a parameter
+       name for the database, e.g. ':%s'. If all keys have the same
+       direction and row_values is set the keys are compared as one row,
+       which the database can answer with a single index range scan.
+
+       NULL values of the order columns sort last, see order_by. Only the
+       last key, the fid, must not be NULL."""
+    params = {}
+    names = []
+    for index, value in enumerate(values):
+        name = "fs_seek_%d" % index
+        names.append(placeholder % name)
+        if value is not None:
+            params[name] = value
+
+    directions = set([descending for column, descending in keys])
+    if len(keys) == 1:
+        return "%s %s %s" % (keys[0][0], directions.pop() and "<" or ">", names[0]), params
+
+    if row_values and len(directions) == 1 and None not in values:
+        # rows with a NULL order column are not comparable as a row
+        operator = directions.pop() and "<" or ">"
+        alternatives = ["(%s) %s (%s)" % (", ".join([column for column, descending in keys]), operator, ", ".join(names))]
+        for index in range(len(keys) - 1):
+            terms = ["%s = %s" % (keys[i][0], names[i]) for i in range(index)]
+            terms.append("%s IS NULL" % keys[index][0])
+            alternatives.append(" AND ".join(terms))
+        return "(%s)" % " OR ".join(alternatives), params
+
+    # (a > x) OR (a = x AND b > y) OR ...
+    alternatives = []
+    for index, (column, descending) in enumerate(keys):
+        terms = []
+        for i in range(index):
+            if values[i] is None:
+                terms.append("%s IS NULL" % keys[i][0])
+            else:
+                terms.append("%s = %s" % (keys[i][0], names[i]))
+        after = "%s %s %s" % (column, descending and "<" or ">", names[index])
+        if index < len(keys) - 1:
+            if values[index] is None:
+                # nothing sorts after NULL
+                continue
+            after = "(%s OR %s IS NULL)" % (after, column)
+            if not terms:
+                alternatives.append(after)
+                continue
+        terms.append(after)
+        alternatives.append("(%s)" % " AND ".join(terms))
+    return "(%s)" % " OR ".join(alternatives), params
@@ -115,6 +115,19 @@ class DBM (DataSource):
                     if not count: break
             return result
 
+    def count (self, action):
+        """Number of features matched by a select action. Without a bbox
+           or attribute filter the records are counted without unpickling
+           them."""
+        if action.id is not None:
+            return self.db.has_key(action.id) and 1 or 0
+        if not action.bbox and not action.attributes:
+            return len([id for id in self])
+        select = Action()
+        select.bbox = action.bbox
+        select.attributes = action.attributes
+        return len(self.select(select))
+
     def freeze_feature (self, feature):
         feature.bbox = feature.get_bbox()
         return pickle.dumps(feature)
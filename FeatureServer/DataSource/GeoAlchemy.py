@@ -3,7 +3,7 @@ from vectorformats.Feature import Feature
 from vectorformats.Formats import WKT
 from sqlalchemy import create_engine, func
 from sqlalchemy.sql import expression, visitors, operators
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, defer
 
 import copy
 import datetime
@@ -169,6 +169,12 @@ class GeoAlchemy (DataSource):
                         self.bbox2wkt(action.bbox), self.srid)
                     )
                 ))
+            if action.properties is not None:
+                # columns which are not asked for are not loaded
+                query = query.options(*[defer(col) for col in cls.__table__.c.keys()
+                                        if col not in action.properties and col not in (self.fid_col, self.geom_col, self.order)])
+            if action.geometry is False and not (self.geom_rel and self.geom_cls):
+                query = query.options(defer(self.geom_col))
             if self.order:
                 query = query.order_by(getattr(cls, self.order))
             if action.maxfeatures:
@@ -194,8 +200,11 @@ class GeoAlchemy (DataSource):
                         if col == self.fid_col:
                             id = getattr(row, col)
                         elif col == self.geom_col:
-                            geom = WKT.from_wkt(self.session.scalar(getattr(row, col).wkt))
+                            if action.geometry is not False:
+                                geom = WKT.from_wkt(self.session.scalar(getattr(row, col).wkt))
                         else:
+                            if action.properties is not None and col not in action.properties:
+                                continue
                             if self.attribute_cols == '*' or col in self.attribute_cols:
                                 props[col] = getattr(row, col)
                 elif isinstance(row, geom_cls) and geom_cls:
@@ -204,8 +213,11 @@ class GeoAlchemy (DataSource):
                         if col == self.fid_col:
                             pass
                         elif col == self.geom_col:
-                            geom = WKT.from_wkt(self.session.scalar(getattr(row, col).wkt))
+                            if action.geometry is not False:
+                                geom = WKT.from_wkt(self.session.scalar(getattr(row, col).wkt))
                         else:
+                            if action.properties is not None and col not in action.properties:
+                                continue
                             if self.attribute_cols == '*' or col in self.attribute_cols:
                                 props[col] = getattr(row, col)
                 else:
@@ -224,6 +236,6 @@ class GeoAlchemy (DataSource):
                 except:
                     pass
                     
-            if (geom):
+            if geom or action.geometry is False:
                 features.append( Feature( id=id, geometry=geom, geometry_attr=self.geom_col, srs=self.srid_out, props=props ) ) 
         return features
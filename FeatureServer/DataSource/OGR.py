@@ -5,7 +5,9 @@ __version__ = "$Id: OGR.py 617 2009-10-06 18:10:49Z jlivni $"
 
 from FeatureServer.DataSource import DataSource
 from FeatureServer.DataSource import Lock
+from FeatureServer.DataSource import Continuation
 from vectorformats.Feature import Feature
+from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
 
 try:
     from osgeo import ogr
@@ -42,6 +44,8 @@ class OGR (DataSource):
         "Unknown failure",
         "Unsupported SRS"
     ]
+    # pages are continued by FID
+    keys = [('FID', False)]
 
     def __init__(self, name, writable = 0, lockfile = 0, 
                  dsn = None, layer = None, attribute_cols = '', **args):
@@ -93,26 +97,54 @@ class OGR (DataSource):
                                 % (action.id, self.error_msgs[err]))
         return []
 
+    def set_filters (self, action):
+        """Sets the bbox and attribute filters of a select action on the
+           layer. Returns the attribute filter terms."""
+        if action.bbox:
+            self.layer.SetSpatialFilterRect(*action.bbox)
+        else:
+            self.layer.SetSpatialFilter(None)
+        query = []
+        if action.attributes:
+            for keyval in action.attributes.items():
+                query.append("( %s = '%s' )" % keyval)
+        self.layer.SetAttributeFilter(" AND ".join(query) or None)
+        return query
+
+    def count (self, action):
+        """Number of features matched by a select action. Drivers which
+           keep an index or a feature count answer it without reading the
+           features."""
+        if action.id is not None:
+            return self.layer.GetFeature(action.id) and 1 or 0
+        self.set_filters(action)
+        return self.layer.GetFeatureCount()
+
     def select (self, action):
         result = []
+        if hasattr(self.layer, 'SetIgnoredFields'):
+            # fields which are not asked for are not read by the driver
+            ignored = []
+            if action.properties is not None:
+                ignored = [defn.GetName() for defn in self.fields if defn.GetName() not in action.properties]
+            if action.geometry is False:
+                ignored.append("OGR_GEOMETRY")
+            self.layer.SetIgnoredFields(ignored)
         if action.id is not None:
             feature = self.layer.GetFeature(action.id)
             if not feature:
                 raise Exception("No such feature. (%s)" % action.id)
             result.append( feature )
         else:
-            if action.bbox:
-                self.layer.SetSpatialFilterRect(*action.bbox)
-            else:
-                self.layer.SetSpatialFilter(None)
-            if action.attributes:
-                query = []
-                for keyval in action.attributes.items():
-                    query.append("( %s = '%s' )" % keyval)
-                query = " AND ".join(query)
-            else:
-                query = None
-            self.layer.SetAttributeFilter(query)
+            query = self.set_filters(action)
+            if action.continuation:
+                # OGR reads features in FID order, the filter seeks past
+                # the previous page
+                fid = Continuation.decode(action.continuation, self.keys, self.name)[0]
+                if not isinstance(fid, (int, long)):
+                    raise InvalidValueException(**{'dump':"Continuation token is malformed.", 'layer':self.name, 'locator':'continuation'})
+                query.append("( FID > %d )" % fid)
+                self.layer.SetAttributeFilter(" AND ".join(query))
 
             feature = True
             count = action.maxfeatures
@@ -123,7 +155,7 @@ class OGR (DataSource):
             while feature:
                 feature = self.layer.GetNextFeature()
                 if not feature: break
-                if counter < action.startfeature:
+                if counter < action.startfeature and not action.continuation:
                     counter += 1
                     continue
                 result.append(feature)
@@ -132,7 +164,10 @@ class OGR (DataSource):
                     if not count: break
                 
 
-        return self.freeze_features(result)
+        return self.freeze_features(result, action.properties, action.geometry)
+
+    def getContinuation (self, feature):
+        return Continuation.encode(self.keys, feature, 'FID')
 
     def begin (self):
         if self.lock: return self.lock.lock()
@@ -212,18 +247,21 @@ class OGR (DataSource):
 
     freeze_geometry = classmethod(_freeze_geometry)
 
-    def freeze_features (self, features):
+    def freeze_features (self, features, properties = None, geometry = True):
         result = []
         for ogrfeat in features:
             feat = Feature(ogrfeat.GetFID())
 
-            geom = ogrfeat.GetGeometryRef()
-            feat.geometry = OGR.freeze_geometry(geom)
+            if geometry:
+                geom = ogrfeat.GetGeometryRef()
+                feat.geometry = OGR.freeze_geometry(geom)
 
             for n, defn in enumerate(self.fields):
                 key = defn.GetName()
                 if self.attribute_cols and not key.lower() in self.attribute_cols:
                     continue
+                if properties is not None and key not in properties:
+                    continue
                 value = ogrfeat.GetField(n)
                 if isinstance(value, str): value = unicode(value, "utf-8")
                 feat.properties[key] = value 
@@ -4,10 +4,13 @@ __license__ = "Clear BSD"
 __version__ = "$Id: PostGIS.py 615 2009-09-23 00:47:48Z jlivni $"
 
 from psycopg2 import errorcodes
+from psycopg2 import extensions
 
 from FeatureServer.DataSource import DataSource
 from vectorformats.Feature import Feature
 from vectorformats.Formats import WKT
+from vectorformats.Formats import WKB
+from vectorformats.Formats.GeoJSON import GeometryFragment
 
 from FeatureServer.WebFeatureService.Response.InsertResult import InsertResult
 from FeatureServer.WebFeatureService.Response.UpdateResult import UpdateResult
@@ -16,6 +19,10 @@ from FeatureServer.WebFeatureService.Response.ReplaceResult import ReplaceResult
 
 from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
 from FeatureServer.Exceptions.ConnectionException import ConnectionException
+from FeatureServer.DataSource import ConnectionPool
+from FeatureServer.DataSource import StatementCache
+from FeatureServer.DataSource import Continuation
+from FeatureServer.DataSource import Columns
 
 try:
     import psycopg2 as psycopg
@@ -25,12 +32,37 @@ except:
 
 import copy
 import re
+import simplejson
 import datetime
+import uuid
+import decimal
+import threading
+import codecs
+
+# type codes of cursor.description, see PostGIS.column_converter
+plain_types   = frozenset(extensions.INTEGER.values + extensions.LONGINTEGER.values + extensions.FLOAT.values + extensions.BOOLEAN.values)
+string_types  = frozenset(extensions.UNICODE.values)
+date_types    = frozenset(extensions.PYDATE.values + extensions.PYDATETIME.values + extensions.PYDATETIMETZ.values)
+decimal_types = frozenset(extensions.DECIMAL.values)
+
+def decimal_value (value):
+    return unicode(str(value))
+
+def codec_name (encoding):
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return None
 
-try:
-    import decimal
-except:
-    pass
+def client_encoding (encoding):
+    """PostgreSQL client encoding which psycopg decodes with the Python
+       codec encoding, or None if there is none."""
+    codec = codec_name(encoding)
+    names = [name for name, python_name in extensions.encodings.items() if codec is not None and codec_name(python_name) == codec]
+    if not names:
+        return None
+    # the canonical name, e.g. UTF8 rather than UNICODE
+    return min([(len(name), name) for name in names])[1]
     
 class PostGIS (DataSource):
     """PostGIS datasource. Setting up the table is beyond the scope of
@@ -43,11 +75,11 @@ class PostGIS (DataSource):
                         'gte': '>=', 'lte': '<=',
                         'eq': '='}
      
-    def __init__(self, name, srid = 4326, srid_out = 4326, fid = "gid", geometry = "the_geom", fe_attributes = 'true', order = "", attribute_cols = '*', writable = True, encoding = "utf-8", hstore = 'false', hstore_attr = "", **args):
+    def __init__(self, name, srid = 4326, srid_out = 4326, fid = "gid", geometry = "the_geom", fe_attributes = 'true', order = "", attribute_cols = '*', writable = True, encoding = "utf-8", hstore = 'false', hstore_attr = "", pool = 'true', pool_min = 1, pool_max = 10, pool_idle = 300, pool_check = 30, stream = 'false', fetch_size = 1000, wkb = 'false', geojson = 'false', geojson_precision = 15, filter_encoding = 'xslt', prepare = 'false', prepare_size = 100, hits = 'exact', bbox_mode = 'exact', **args):
         DataSource.__init__(self, name, **args)
         self.table          = args["layer"]
         self.fid_col        = fid
-        self.encoding       = encoding
+        self.setEncoding(encoding)
         self.geom_col       = geometry
         self.order          = order
         self.srid           = srid
@@ -68,21 +100,143 @@ class PostGIS (DataSource):
             self.hstore = False
             self.hstoreAttribute = "";
 
+        self.stream = False
+        if str(stream).lower() == 'true':
+            self.stream = True
+        self.fetch_size = int(fetch_size)
+
+        self.wkb = False
+        if str(wkb).lower() == 'true':
+            self.wkb = True
+
+        self.geojson = False
+        if str(geojson).lower() == 'true':
+            self.geojson = True
+        self.geojson_precision = int(geojson_precision)
+
+        # 'xslt' inlines the literals of OGC filters with the stylesheets,
+        # 'python' compiles them with the FilterEncoding Compiler to bind
+        # parameters
+        self.filter_encoding = str(filter_encoding).lower()
+
+        self.prepare = False
+        if str(prepare).lower() == 'true':
+            self.prepare = True
+        self.prepare_size = int(prepare_size)
+
+        # resultType=hits is answered with count(*), or with the planner's
+        # row estimate for hits=estimate
+        self.hits = str(hits).lower()
+
+        # bbox_mode=fast only compares bounding boxes, which is exact for
+        # point layers
+        self.bbox_mode = str(bbox_mode).lower()
+
+        self.setPool(pool, pool_min, pool_max, pool_idle, pool_check)
+        self.build_templates()
+
+    def setEncoding (self, encoding = "utf-8"):
+        """Encoding of the layer's text and the PostgreSQL client encoding
+           begin sets for it."""
+        self.encoding = encoding
+        self.client_encoding = client_encoding(encoding)
+
+    def setPool (self, pool = 'true', pool_min = 1, pool_max = 10, pool_idle = 300, pool_check = 30):
+        """Configure the per-process connection pool shared by all layers
+           using the same dsn. pool=false falls back to connect-per-request."""
+        self.pool = None
+        if str(pool).lower() != 'false':
+            self.pool = ConnectionPool.getPool(self.dsn, self.connect,
+                                               minconn = pool_min,
+                                               maxconn = pool_max,
+                                               idle_timeout = pool_idle,
+                                               check_interval = pool_check)
+
+    def connect (self):
+        connection = psycopg.connect(self.dsn, connection_factory=StatementCache.Connection)
+        # let psycopg decode text columns instead of doing it per value
+        extensions.register_type(extensions.UNICODE, connection)
+        extensions.register_type(extensions.UNICODEARRAY, connection)
+        return connection
+
+    def execute (self, cursor, sql, params):
+        """Executes a query with pyformat parameters. With prepare=true
+           queries on pooled connections run as server-side prepared
+           statements, cached per connection by their SQL text."""
+        cache = getattr(self.db, 'statement_cache', None)
+        if self.prepare and self.pool and cache is not None and cursor.name is None:
+            cache.size = self.prepare_size
+            cache.execute(cursor, sql, params)
+        else:
+            cursor.execute(sql, params)
+
+    def local (self):
+        """State of the request served by the current thread. One
+           datasource instance serves all threads, so the connection of a
+           request must never be seen by another one."""
+        return self.__dict__.setdefault('_local', threading.local())
+
+    def getConnection (self):
+        return getattr(self.local(), 'db', None)
+
+    def setConnection (self, db):
+        self.local().db = db
+
+    # checked out connection of the current thread's request
+    db = property(getConnection, setConnection)
+
     def begin (self):
+        if self.db is not None:
+            return
         try:
-            self.db = psycopg.connect(self.dsn)
+            if self.pool:
+                db = self.pool.getconn()
+            else:
+                db = self.connect()
+            # text columns are decoded by psycopg with the client encoding,
+            # pooled connections may come from a layer with another one
+            if self.client_encoding is not None and codec_name(extensions.encodings.get(getattr(db, 'encoding', None), '')) != codec_name(self.encoding):
+                db.set_client_encoding(self.client_encoding)
+            self.db = db
         except Exception as e:
-            raise ConnectionException(**{'dump':str(e),'layer':self.name,'locator':'PostGIS','code':e.pgcode})
+            raise ConnectionException(**{'dump':str(e),'layer':self.name,'locator':'PostGIS','code':getattr(e, 'pgcode', '')})
     
     def commit (self):
+        if self.db is None:
+            return
         if self.writable:
             self.db.commit()
-        self.db.close()
+        self.release()
 
     def rollback (self):
+        if self.db is None:
+            return
         if self.writable:
             self.db.rollback()
-        self.db.close()
+        self.release()
+
+    def savepoint (self, name):
+        self.db.cursor().execute("SAVEPOINT %s" % name)
+
+    def release_savepoint (self, name):
+        self.db.cursor().execute("RELEASE SAVEPOINT %s" % name)
+
+    def rollback_savepoint (self, name):
+        self.db.cursor().execute("ROLLBACK TO SAVEPOINT %s" % name)
+
+    def release (self):
+        """Hand the connection back to the pool (or close it if pooling
+           is disabled)."""
+        db, self.db = self.db, None
+        if self.pool:
+            self.pool.putconn(db)
+        else:
+            db.close()
+
+    def getPoolStats (self):
+        if self.pool:
+            return self.pool.stats()
+        return {}
 
     def column_names (self, feature):
         return feature.properties.keys()
@@ -117,7 +271,7 @@ class PostGIS (DataSource):
                 else:
                     predicates.append("%s = %s" % pair)
         if feature.geometry and feature.geometry.has_key("coordinates"):
-            predicates.append(" %s = ST_SetSRID('%s'::geometry, %s) " % (self.geom_col, WKT.to_wkt(feature.geometry), self.srid))
+            predicates.append(" %s = ST_SetSRID(%%(fs_geometry)s::geometry, %s) " % (self.geom_col, self.srid))
         return predicates
 
     def feature_values (self, feature):
@@ -127,6 +281,8 @@ class PostGIS (DataSource):
                 props[key] = val.encode(self.encoding)
             if type(val)  is dict:
                 props[key] = val['value']
+        if feature.geometry and feature.geometry.has_key("coordinates"):
+            props['fs_geometry'] = WKT.to_wkt(feature.geometry)
         return props
 
 
@@ -138,7 +294,7 @@ class PostGIS (DataSource):
         if action.feature != None:
             feature = action.feature
             columns = ", ".join(self.column_names(feature)+[self.geom_col])
-            values = ", ".join(self.value_formats(feature)+["ST_SetSRID('%s'::geometry, %s) " % (WKT.to_wkt(feature.geometry), self.srid)])
+            values = ", ".join(self.value_formats(feature)+["ST_SetSRID(%%(fs_geometry)s::geometry, %s) " % self.srid])
 
             sql = "INSERT INTO \"%s\" (%s) VALUES (%s)" % (self.table, columns, values)
 
@@ -164,6 +320,48 @@ class PostGIS (DataSource):
         return None
         
 
+    def insert_many (self, actions):
+        """Inserts the features of consecutive insert actions with a single
+           statement. Every row is inserted by a data-modifying WITH query
+           which returns its id together with the position of its action,
+           so the ids are matched to the actions without relying on the
+           order of RETURNING. Returns the InsertResults in the order of
+           the actions."""
+        self.begin()
+        results = [None] * len(actions)
+        queries = []
+        params = {}
+        for index, action in enumerate(actions):
+            if action.feature != None:
+                prefix = "fs_%d_" % index
+                columns = self.column_names(action.feature)
+                values = ["%%(%s%s)s" % (prefix, column) for column in columns]
+                values.append("ST_SetSRID(%%(%sfs_geometry)s::geometry, %s)" % (prefix, self.srid))
+                queries.append((index, "INSERT INTO \"%s\" (%s) VALUES (%s)" % (self.table, ", ".join(columns + [self.geom_col]), ", ".join(values)), False))
+                for key, value in self.feature_values(action.feature).iteritems():
+                    params[prefix + key] = value
+            elif action.wfsrequest != None and str(action.wfsrequest.getStatement(self)).strip().upper().startswith("INSERT"):
+                queries.append((index, str(action.wfsrequest.getStatement(self)).strip().rstrip(";"), True))
+            else:
+                results[index] = self.insert(action)
+        
+        if len(queries) > 0:
+            inserts = []
+            for index, sql, literal in queries:
+                if literal and params:
+                    # statements of the stylesheets contain their values
+                    sql = sql.replace("%", "%%")
+                inserts.append("fs_insert_%d AS (%s RETURNING %s)" % (index, sql, self.fid_col))
+            sql = "WITH %s %s" % (", ".join(inserts), " UNION ALL ".join(["SELECT %d, %s FROM fs_insert_%d" % (index, self.fid_col, index) for index, sql, literal in queries]))
+            
+            cursor = self.db.cursor()
+            cursor.execute(str(sql), params or None)
+            for index, id in cursor.fetchall():
+                actions[index].id = id
+                results[index] = InsertResult(id, "")
+        
+        return results
+
     def update (self, action):
         if action.feature != None:
             feature = action.feature
@@ -212,151 +410,351 @@ class PostGIS (DataSource):
 
 
     def select (self, action):
-        cursor = self.db.cursor()
-
+        """Returns a list of features, or a generator of features if the
+           layer is configured with stream=true. In streaming mode the rows
+           are read through a server-side cursor in batches of fetch_size,
+           so the connection has to stay checked out until the generator
+           is exhausted."""
         if action.id is not None:
-            sql = "SELECT ST_AsText(ST_Transform(%s, %d)) as fs_text_geom, " % (self.geom_col, int(self.srid_out))
-            
-            if hasattr(self, 'version'):
-                sql += "%s as version, " % self.version
-            if hasattr(self, 'ele'):
-                sql += "%s as ele, " % self.ele
-            
-            sql += "\"%s\"" % self.fid_col
-            
-            if len(self.attribute_cols) > 0:
-                sql += ", %s" % self.attribute_cols
-            
-            if hasattr(self, "additional_cols"):
-                cols = self.additional_cols.split(';')
-                additional_col = ",".join(cols)
-                sql += ", %s" % additional_col
-
-            sql += " FROM \"%s\" WHERE %s = %%(%s)s" % (self.table, self.fid_col, self.fid_col)
-            
-            #sql = "SELECT ST_AsText(ST_Transform(%s, %d)) as fs_text_geom, %s as ele, %s as version, \"%s, %s FROM \"%s\" WHERE %s = %%(%s)s" % (
-            #        self.geom_col, int(self.srid_out), self.ele, self.version, self.fid_col, self.attribute_cols, self.table, self.fid_col, self.fid_col )
-
-            cursor.execute(str(sql), {self.fid_col: str(action.id)})
+            cursor = self.db.cursor()
+            sql = self.select_sql(action) + self.id_filter
+            self.execute(cursor, str(sql), {self.fid_col: str(action.id)})
 
             result = [cursor.fetchone()]
         else:
-            filters = []
-            attrs   = {}
-            if action.attributes:
-                match = Feature(props = action.attributes)
-                filters = self.feature_predicates(match)
-                for key, value in action.attributes.items():
-                    if isinstance(value, dict):
-                        attrs[key] = value['value']
-                    else:
-                        attrs[key] = value
-            if action.bbox:
-                filters.append( "%s && ST_Transform(ST_SetSRID('BOX3D(%f %f,%f %f)'::box3d, %s), %s) AND ST_Intersects(%s, ST_Transform(ST_SetSRID('BOX3D(%f %f,%f %f)'::box3d, %s), %s))" % (
-                                        (self.geom_col,) + tuple(action.bbox) + (self.srid_out,) + (self.srid,) + (self.geom_col,) + (tuple(action.bbox) + (self.srid_out,) + (self.srid,))))
-            sql = "SELECT ST_AsText(ST_Transform(%s, %d)) as fs_text_geom, " % (self.geom_col, int(self.srid_out))
-            if hasattr(self, 'ele'):
-                sql += "%s as ele, " % self.ele
-            if hasattr(self, 'version'):
-                sql += "%s as version, " % self.version
-            sql += "\"%s\"" % self.fid_col
-    
-            if len(self.attribute_cols) > 0:
-                sql += ", %s" % self.attribute_cols
-            
+            where, attrs = self.where_sql(action)
+            keys = Continuation.sort_keys(self.order, self.fid_col)
+            if action.continuation:
+                # seek to the last row of the previous page instead of
+                # skipping all rows before it
+                seek_sql, seek_params = Continuation.seek(keys, Continuation.decode(action.continuation, keys, self.name), "%%(%s)s", row_values = True)
+                where += (where and " AND " or " WHERE ") + seek_sql
+                attrs.update(seek_params)
+
             # check OGC FE attributes
+            fe_cols = []
             if self.fe_attributes and action.wfsrequest:
-                fe_cols = action.wfsrequest.getAttributes()
-                ad_cols = self.getColumns()
-                
-                fe_cols = filter(lambda x: x not in ad_cols, fe_cols)
-                
-                if len(fe_cols) > 0:
-                    sql += ", %s" % ",".join(fe_cols)
-    
-            if hasattr(self, "additional_cols"):
-                cols = self.additional_cols.split(';')
-                additional_col = ",".join(cols)
-                sql += ", %s" % additional_col
+                fe_cols = [col for col in action.wfsrequest.getAttributes() if col not in self.column_set]
+            sql = self.select_sql(action, fe_cols) + where
 
-
-            sql += " FROM \"%s\"" % (self.table)
-            
-            #sql = "SELECT ST_AsText(Transform(%s, %d)) as fs_text_geom, %s as ele, %s as version, \"%s\", %s FROM \"%s\"" % (self.geom_col, int(self.srid_out), self.ele, self.version, self.fid_col, self.attribute_cols, self.table)
-            if filters:
-                sql += " WHERE " + " AND ".join(filters)
-            if action.wfsrequest:
-                if filters:
-                    sql += " AND "
-                else:
-                    sql += " WHERE "
-                
-                sql += action.wfsrequest.render(self)
-                
-                
-            if self.order:
+            if action.maxfeatures or action.continuation:
+                # pages are ordered by the fid as well, so they can be continued
+                sql += " ORDER BY " + Continuation.order_by(keys)
+            elif self.order:
                 sql += " ORDER BY " + self.order
             if action.maxfeatures:
-                sql += " LIMIT %d" % action.maxfeatures
+                sql += " LIMIT %(fs_limit)s"
+                attrs['fs_limit'] = int(action.maxfeatures)
             #else:   
             #    sql += " LIMIT 1000"
-            if action.startfeature:
-                sql += " OFFSET %d" % action.startfeature
+            if action.startfeature and not action.continuation:
+                sql += " OFFSET %(fs_offset)s"
+                attrs['fs_offset'] = int(action.startfeature)
                         
+            if self.stream:
+                # named cursors are declared on the server and read in batches
+                cursor = self.db.cursor("fs_%s" % uuid.uuid4().hex)
+                cursor.itersize = self.fetch_size
+            else:
+                cursor = self.db.cursor()
+            
             try:
-                cursor.execute(str(sql), attrs)
+                self.execute(cursor, str(sql), attrs)
             except Exception, e:
-                if e.pgcode[:2] == errorcodes.CLASS_SYNTAX_ERROR_OR_ACCESS_RULE_VIOLATION:
+                if getattr(e, 'pgcode', None) and e.pgcode[:2] == errorcodes.CLASS_SYNTAX_ERROR_OR_ACCESS_RULE_VIOLATION:
                     raise InvalidValueException(**{'dump':e.pgerror,'layer':self.name,'locator':'PostGIS'})
+                raise
+            
+            if self.stream:
+                return self.iter_features(cursor)
                 
-            result = cursor.fetchall() # should use fetchmany(action.maxfeatures)
+            result = cursor.fetchall()
         
-        columns = [desc[0] for desc in cursor.description]
+        reader = self.row_reader(cursor.description)
         features = []
         for row in result:
-            props = dict(zip(columns, row))
-            if not props['fs_text_geom']: continue
-            geom  = WKT.from_wkt(props['fs_text_geom'])
-            id = props[self.fid_col]
-            del props[self.fid_col]
-            if self.attribute_cols == '*':
-                del props[self.geom_col]
-            del props['fs_text_geom']
-            for key, value in props.items():
-                if isinstance(value, str): 
-                        props[key] = unicode(value, self.encoding)
-                elif isinstance(value, datetime.datetime) or isinstance(value, datetime.date):
-                    # stringify datetimes 
-                    props[key] = str(value)
-                    
-                try:
-                    if isinstance(value, decimal.Decimal):
-                            props[key] = unicode(str(value), self.encoding)
-                except:
-                    pass
-                    
-            if (geom):
-                features.append( Feature( id, geom, self.geom_col, self.srid_out, props ) ) 
+            feature = self.create_feature(reader, row)
+            if feature:
+                features.append(feature)
         return features
+
+    def where_sql (self, action):
+        """WHERE clause of the attribute, bbox and OGC filters of a select
+           action, with its bind parameters."""
+        filters = []
+        attrs   = {}
+        if action.attributes:
+            match = Feature(props = action.attributes)
+            filters = self.feature_predicates(match)
+            for key, value in action.attributes.items():
+                if isinstance(value, dict):
+                    attrs[key] = value['value']
+                else:
+                    attrs[key] = value
+        if action.bbox:
+            filters.append(self.bbox_filter)
+            attrs.update(self.bbox_params(action.bbox))
+
+        sql = ""
+        if filters:
+            sql += " WHERE " + " AND ".join(filters)
+        if action.wfsrequest:
+            if filters:
+                sql += " AND "
+            else:
+                sql += " WHERE "
             
-    def getColumns(self):
-        cols = []
-        
-        if hasattr(self, 'attribute_cols'):
-            cols = self.attribute_cols.split(",")
-                
-        cols.append(self.geom_col)
-        cols.append(self.fid_col)
-                
+            if self.filter_encoding == 'python':
+                filter_sql, filter_params = action.wfsrequest.compile(self)
+                sql += filter_sql
+                attrs.update(filter_params)
+            else:
+                sql += action.wfsrequest.render(self)
+        return sql, attrs
+
+    def count (self, action):
+        """Number of features matched by a select action, counted by the
+           database without reading any rows. With hits=estimate the row
+           estimate of the query planner is returned instead, which does
+           not scan the table at all."""
+        if action.id is not None:
+            where, attrs = self.id_filter, {self.fid_col: str(action.id)}
+        else:
+            where, attrs = self.where_sql(action)
+        cursor = self.db.cursor()
+        try:
+            if self.hits == 'estimate':
+                # EXPLAIN can not be prepared
+                cursor.execute(str("EXPLAIN (FORMAT JSON) SELECT 1 FROM \"%s\"%s" % (self.table, where)), attrs)
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, basestring):
+                    plan = simplejson.loads(plan)
+                return int(plan[0]['Plan']['Plan Rows'])
+            self.execute(cursor, str("SELECT count(*) FROM \"%s\"%s" % (self.table, where)), attrs)
+        except Exception, e:
+            if getattr(e, 'pgcode', None) and e.pgcode[:2] == errorcodes.CLASS_SYNTAX_ERROR_OR_ACCESS_RULE_VIOLATION:
+                raise InvalidValueException(**{'dump':e.pgerror,'layer':self.name,'locator':'PostGIS'})
+            raise
+        return int(cursor.fetchone()[0])
+
+    def getContinuation (self, feature):
+        return Continuation.encode(Continuation.sort_keys(self.order, self.fid_col), feature, self.fid_col)
+
+    def bbox_params (self, bbox):
+        return {'fs_minx': float(bbox[0]), 'fs_miny': float(bbox[1]),
+                'fs_maxx': float(bbox[2]), 'fs_maxy': float(bbox[3])}
+
+    def iter_features (self, cursor):
+        """Generator yielding the features of an executed (server-side)
+           cursor, fetching fetch_size rows at a time."""
+        try:
+            reader = None
+            while True:
+                rows = cursor.fetchmany(self.fetch_size)
+                if not rows:
+                    break
+                if reader is None:
+                    reader = self.row_reader(cursor.description)
+                for row in rows:
+                    feature = self.create_feature(reader, row)
+                    if feature:
+                        yield feature
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                # transaction already ended, the cursor is gone with it
+                pass
+
+    def geometry_select (self, action = None):
+        """Select expression for the output geometry. With wkb=true the
+           geometry is transported as binary WKB, which is decoded much
+           faster than parsing WKT. With geojson=true and a service that
+           writes GeoJSON the database serialises the geometry itself."""
+        return self.select_templates[self.select_format(action)][0]
+
+    def select_format (self, action = None):
+        if action is not None and action.geometry is False:
+            return 'none'
+        if self.geojson and action is not None and action.geometry_format == 'geojson' and not hasattr(self, 'processes'):
+            return 'geojson'
+        return None
+
+    def select_sql (self, action, fe_cols = None):
+        """SELECT ... FROM table for the geometry format of the action,
+           with the additional OGC FE columns fe_cols. If the action names
+           its properties only those columns are selected."""
+        geometry, head, tail = self.select_templates[self.select_format(action)]
+        if action is not None and action.properties is not None:
+            head = "SELECT " + ", ".join([column for column in [geometry, self.key_columns] + self.projection(action.properties) if column])
+            tail = " FROM \"%s\"" % self.table
+        if fe_cols:
+            return head + ", " + ",".join(fe_cols) + tail
+        return head + tail
+
+    def projection (self, names):
+        """SELECT expressions of the attribute and additional columns
+           named in names, and of the order columns which continuation
+           tokens are made of."""
+        names = set(names)
+        for column, descending in Continuation.sort_keys(self.order, self.fid_col):
+            names.add(Continuation.property_name(column))
+        names.discard(self.fid_col)
+        names.discard(self.geom_col)
+        if self.attribute_cols == '*':
+            # unknown columns are reported by the database
+            columns = ["\"%s\"" % name for name in sorted(names) if '"' not in name]
+        else:
+            columns = [expression for name, expression in self.attribute_list if name in names]
+        return columns + [expression for name, expression in self.additional_list if name in names]
+
+    def build_templates (self):
+        """Precomputes the parts of the SELECT statements which only depend
+           on the layer configuration, so select only has to add the request
+           specific filters."""
+        geometry = self.transform(self.geom_col, self.srid, self.srid_out)
+        if self.wkb:
+            geometries = {None : "ST_AsBinary(%s) as fs_binary_geom" % geometry}
+        else:
+            geometries = {None : "ST_AsText(%s) as fs_text_geom" % geometry}
+        if self.geojson:
+            geometries['geojson'] = "ST_AsGeoJSON(%s, %d) as fs_geojson_geom" % (geometry, self.geojson_precision)
+        # geometry=false, attributes only
+        geometries['none'] = ""
+
+        columns = []
+        if hasattr(self, 'ele'):
+            columns.append("%s as ele" % self.ele)
         if hasattr(self, 'version'):
-            cols.append(self.version)
+            columns.append("%s as version" % self.version)
+        columns.append("\"%s\"" % self.fid_col)
+        # always selected, whichever properties are asked for
+        self.key_columns = ", ".join(columns)
+        if len(self.attribute_cols) > 0:
+            columns.append(self.attribute_cols)
+
+        self.attribute_list = Columns.named(self.attribute_cols)
+        self.additional_list = []
+        if hasattr(self, "additional_cols"):
+            self.additional_list = Columns.named(self.additional_cols, ';')
+
+        tail = ""
+        if hasattr(self, "additional_cols"):
+            tail += ", %s" % ",".join(self.additional_cols.split(';'))
+        tail += " FROM \"%s\"" % self.table
+
+        # (geometry expression, SELECT up to the attribute columns, rest up to FROM table)
+        self.select_templates = {}
+        for format, geometry in geometries.items():
+            self.select_templates[format] = (geometry, "SELECT " + ", ".join([column for column in [geometry] + columns if column]), tail)
+
+        self.id_filter = " WHERE %s = %%(%s)s" % (self.fid_col, self.fid_col)
+
+        # the envelope is built once, ST_Intersects does the index backed
+        # && test with it itself
+        envelope = self.transform("ST_MakeEnvelope(%%(fs_minx)s, %%(fs_miny)s, %%(fs_maxx)s, %%(fs_maxy)s, %d)" % int(self.srid_out), self.srid_out, self.srid)
+        if self.bbox_mode == 'fast':
+            self.bbox_filter = "%s && %s" % (self.geom_col, envelope)
+        else:
+            self.bbox_filter = "ST_Intersects(%s, %s)" % (self.geom_col, envelope)
+
+        self.columns = self.attribute_cols.split(",") + [self.geom_col, self.fid_col]
+        if hasattr(self, 'version'):
+            self.columns.append(self.version)
         if hasattr(self, 'ele'):
-            cols.append(self.ele)
-                
-        return cols
+            self.columns.append(self.ele)
+        self.column_set = set(self.columns)
+
+    def transform (self, expression, srid, to_srid):
+        """expression reprojected from srid to to_srid, or as it is if both
+           are the same, so layers served in their own SRID are not
+           transformed row by row."""
+        if int(srid) == int(to_srid):
+            return expression
+        return "ST_Transform(%s, %d)" % (expression, int(to_srid))
+
+    def row_reader (self, description):
+        """Inspects the result columns once per query. Returns the name and
+           index of the geometry column, the index of the fid column and a
+           (name, index, converter) tuple for every property, where the
+           converter is picked from the column type and is None for values
+           that are used as they are."""
+        geometry = (None, None)
+        fid = None
+        properties = []
+        for index, column in enumerate(description):
+            name = column[0]
+            if name in ('fs_geojson_geom', 'fs_binary_geom', 'fs_text_geom'):
+                geometry = (name, index)
+            elif name == self.fid_col:
+                fid = index
+            elif name == self.geom_col and self.attribute_cols == '*':
+                continue
+            else:
+                type_code = len(column) > 1 and column[1] or None
+                properties.append((name, index, self.column_converter(type_code)))
+        return geometry, fid, tuple(properties)
+
+    def column_converter (self, type_code):
+        if type_code in plain_types:
+            return None
+        if type_code in string_types:
+            return self.decode_value
+        if type_code in date_types:
+            return str
+        if type_code in decimal_types:
+            return decimal_value
+        return self.convert_value
+
+    def decode_value (self, value):
+        # strings are usually decoded by the UNICODE typecaster already
+        if isinstance(value, str):
+            return unicode(value, self.encoding)
+        return value
+
+    def convert_value (self, value):
+        """Conversion for columns of other or unknown types."""
+        if isinstance(value, str):
+            return unicode(value, self.encoding)
+        elif isinstance(value, datetime.datetime) or isinstance(value, datetime.date):
+            # stringify datetimes 
+            return str(value)
+        elif isinstance(value, decimal.Decimal):
+            return decimal_value(value)
+        return value
+
+    def create_feature (self, reader, row):
+        """Turns a result row into a Feature, using the row_reader of the
+           query. Returns None for rows without a geometry, unless the
+           query did not select the geometry at all."""
+        (geometry, index), fid, properties = reader
+        geom = None
+        if geometry is not None:
+            geom_data = row[index]
+            if not geom_data: return None
+            if geometry == 'fs_geojson_geom':
+                geom = GeometryFragment(geom_data)
+            elif geometry == 'fs_binary_geom':
+                geom = WKB.from_wkb(geom_data)
+            else:
+                geom = WKT.from_wkt(geom_data)
+            if not geom: return None
+
+        props = {}
+        for name, index, converter in properties:
+            value = row[index]
+            if converter is not None and value is not None:
+                value = converter(value)
+            props[name] = value
+
+        return Feature( row[fid], geom, self.geom_col, self.srid_out, props )
+            
+    def getColumns(self):
+        return list(self.columns)
 
     
     def getAttributeDescription(self, attribute):
+        opened = self.db is None
         self.begin()
         cursor = self.db.cursor()
         result = []
@@ -367,9 +765,10 @@ class PostGIS (DataSource):
         try:
             cursor.execute(str(sql)% (self.table, attribute))
             result = [cursor.fetchone()]
-            self.db.commit()
         except:
             pass 
+        if opened:
+            self.rollback()
         
         type = 'string'
         length = ''
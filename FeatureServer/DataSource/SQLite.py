@@ -4,8 +4,12 @@ __license__ = "Clear BSD"
 __version__ = "$Id: SQLite.py 606 2009-04-24 16:25:41Z brentp $"
 
 import re
+import os
 import copy
+import time
 from FeatureServer.DataSource import DataSource
+from FeatureServer.DataSource import Continuation
+from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
 from vectorformats.Feature import Feature
 from vectorformats.Formats import WKT
 import sys
@@ -38,6 +42,10 @@ class SQLite (DataSource):
         self.db         = None
         self.dsn        = args.get("dsn") or args.get("file")
         self.writable   = writable
+        # pages are continued by feature id
+        self.keys       = [('t.feature_id', False)]
+        if self.writable and self.dsn and os.path.exists(self.dsn):
+            self.migrate()
 
     def begin (self):
         self.db = sqlite3.connect(self.dsn)
@@ -50,11 +58,45 @@ class SQLite (DataSource):
             c.executescript(self.schema())
             self.db.commit()
 
+    def migrate(self):
+        """Adds what the schema gained since the table was created. Run once
+           when the datasource is built, not in every transaction."""
+        self.begin()
+        try:
+            if not "%s_date_modified_idx" % self.table in self.indexes():
+                self.db.execute("CREATE INDEX IF NOT EXISTS %s_date_modified_idx ON %s (date_modified)" % (self.table, self.table))
+        finally:
+            self.commit()
+
+    def getLastModified(self):
+        """Latest date_modified of the layer. Deleted features are not
+           reflected, those are only seen through the cache generation."""
+        self.begin()
+        try:
+            # answered from the date_modified index
+            modified = self.db.execute("SELECT MAX(date_modified) FROM \"%s\"" % self.table).fetchone()[0]
+        finally:
+            self.commit()
+        if modified is None:
+            return None
+        # the triggers store local time
+        return time.mktime(time.strptime(modified[:19], "%Y-%m-%d %H:%M:%S"))
+
+    def getContinuation(self, feature):
+        if self.order:
+            return None
+        return Continuation.encode(self.keys, feature, 't.feature_id')
+
     def tables(self):
         c = self.db.cursor()
         res = c.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
         return [r[0] for r in res]
 
+    def indexes(self):
+        c = self.db.cursor()
+        res = c.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()
+        return [r[0] for r in res]
+
     def schema(self):
         return """\
 CREATE TABLE '%s' (
@@ -76,6 +118,7 @@ CREATE TABLE '%s_attrs' (
 CREATE INDEX %s_xy_idx ON %s (xmin, xmax, ymin, ymax);
 CREATE INDEX %s_attrs_feature_id on %s_attrs (feature_id);
 CREATE INDEX %s_attrs_%s_key on %s_attrs (key);
+CREATE INDEX %s_date_modified_idx ON %s (date_modified);
 
 /* automatic timestamp, but dont override if one is sent in */
 CREATE TRIGGER %s_insert_date_trigger 
@@ -95,7 +138,7 @@ BEGIN
                 WHERE feature_id = NEW.feature_id;
 END; 
 
-""" % tuple([self.table, self.geom_col] + list((self.table,) * 15))
+""" % tuple([self.table, self.geom_col] + list((self.table,) * 17))
 
     def commit (self):
         if self.writable:
@@ -189,6 +232,66 @@ END;
         return []
 
 
+    def from_sql (self, action):
+        """FROM clause of a select action, with the attribute table joined,
+           its bind parameters and whether it has a WHERE clause."""
+        match = Feature(props = action.attributes)
+        filters = match.properties.items()
+        
+        sql = " FROM \"%s\" t LEFT JOIN \"%s_attrs\" a ON a.feature_id =\
+        t.feature_id " % ( self.table, self.table )
+        select_dict = {}
+        if filters:
+            sql += "WHERE 1 "
+            for ii, (key, value) in enumerate(filters):
+                if isinstance(value, dict):
+
+                    select_dict['key%i' % ii] = value['column']
+                    select_dict['value%i' % ii] = value['value']
+                    sql += (" AND a.key = :key%i AND a.value " + self.query_action_sql[value['type']] + " :value%i") % (ii, ii)
+
+
+                else:
+                    select_dict['key%i' % ii] = key
+                    select_dict['value%i' % ii] = value
+                    sql += " AND a.key = :key%i AND a.value = :value%i" % (ii, ii)
+
+        if action.wfsrequest:
+            # there are no stylesheets for SQLite, filters are always compiled
+            filter_sql, filter_params = action.wfsrequest.compile(self)
+            if filters:
+                sql += " AND " + filter_sql
+            else:
+                sql += "WHERE " + filter_sql
+            select_dict.update(filter_params)
+
+        where = bool(filters or action.wfsrequest)
+        bbox = '' 
+        if action.bbox:
+            # begins the WHERE clause if there is none yet, in the ON
+            # clause of the join it would not filter anything
+            bbox = (where and " AND" or " WHERE") + " :fs_maxx > t.xmin \
+                 AND t.xmax > :fs_minx \
+                 AND :fs_maxy > t.ymin \
+                 AND t.ymax > :fs_miny "
+            select_dict.update({'fs_minx': float(action.bbox[0]), 'fs_miny': float(action.bbox[1]),
+                                'fs_maxx': float(action.bbox[2]), 'fs_maxy': float(action.bbox[3])})
+            where = True
+
+        sql += bbox
+        return sql, select_dict, where
+
+    def count (self, action):
+        """Number of features matched by a select action, counted by
+           SQLite without reading the features and their attributes."""
+        cursor = self.db.cursor()
+        if action.id is not None:
+            sql = "SELECT count(*) FROM \"%s\" WHERE %s = ?" % ( self.table,  self.fid_col)
+            return int(cursor.execute(str(sql), (action.id,)).fetchone()[0])
+        from_sql, select_dict, where = self.from_sql(action)
+        sql = "SELECT count(DISTINCT t.feature_id)" + from_sql
+        return int(cursor.execute(str(sql), select_dict).fetchone()[0])
+
     def select (self, action):
         cursor = self.db.cursor()
         features = []
@@ -201,43 +304,30 @@ END;
             results = [ cursor.fetchone() ]
 
         else:
-            match = Feature(props = action.attributes)
-            filters = match.properties.items()
-            
             sql = "SELECT DISTINCT(t.feature_id) as feature_id, t.%s as %s,\
-            t.%s as %s FROM \"%s\" t LEFT JOIN \"%s_attrs\" a ON a.feature_id =\
-            t.feature_id " % ( self.geom_col, self.geom_col, self.fid_col, self.fid_col,  self.table, self.table )
-            select_dict = {}
-            if filters:
-                sql += "WHERE 1 "
-                for ii, (key, value) in enumerate(filters):
-                    if isinstance(value, dict):
-
-                        select_dict['key%i' % ii] = value['column']
-                        select_dict['value%i' % ii] = value['value']
-                        sql += (" AND a.key = :key%i AND a.value " + self.query_action_sql[value['type']] + " :value%i") % (ii, ii)
-
-
-                    else:
-                        select_dict['key%i' % ii] = key
-                        select_dict['value%i' % ii] = value
-                        sql += " AND a.key = :key%i AND a.value = :value%i" % (ii, ii)
-
-            bbox = '' 
-            if action.bbox:
-                # skip sql interpolation as these are from calculation.
-                bbox = " AND %f   > t.xmin \
-                     AND t.xmax > %f \
-                     AND %f   > t.ymin \
-                     AND t.ymax >  %f "\
-                     % (action.bbox[2], action.bbox[0], action.bbox[3], action.bbox[1])
-
-            sql += bbox
-            sql += self.order or ''
-            sql += " LIMIT %d" % (action.maxfeatures or 1000, )
-
-            if action.startfeature:
-                sql += " OFFSET %d" % action.startfeature
+            t.%s as %s" % ( self.geom_col, self.geom_col, self.fid_col, self.fid_col )
+            from_sql, select_dict, where = self.from_sql(action)
+            sql += from_sql
+            if action.continuation:
+                if self.order:
+                    raise InvalidValueException(**{'dump':"Layers with an order can not be continued.", 'layer':self.name, 'locator':'continuation'})
+                seek_sql, seek_params = Continuation.seek(self.keys, Continuation.decode(action.continuation, self.keys, self.name), ":%s")
+                if where:
+                    sql += " AND " + seek_sql
+                else:
+                    sql += " WHERE " + seek_sql
+                select_dict.update(seek_params)
+            if self.order:
+                sql += self.order
+            elif action.maxfeatures or action.continuation:
+                # pages are ordered by the feature id, so they can be continued
+                sql += " ORDER BY " + Continuation.order_by(self.keys, 'sqlite')
+            sql += " LIMIT :fs_limit"
+            select_dict['fs_limit'] = int(action.maxfeatures or 1000)
+
+            if action.startfeature and not action.continuation:
+                sql += " OFFSET :fs_offset"
+                select_dict['fs_offset'] = int(action.startfeature)
             cursor.execute(str(sql), select_dict)
             results = cursor.fetchall()
 
@@ -5,10 +5,14 @@ Created on Oct 22, 2012
 '''
 
 import os
+import threading
 
 from FeatureServer.DataSource import DataSource
+from FeatureServer.DataSource import Continuation
+from FeatureServer.DataSource import Columns
 from vectorformats.Feature import Feature
 from vectorformats.Formats import WKT
+from vectorformats.Formats import WKB
 
 from FeatureServer.WebFeatureService.Response.InsertResult import InsertResult
 from FeatureServer.WebFeatureService.Response.UpdateResult import UpdateResult
@@ -31,7 +35,7 @@ class SpatialLite (DataSource):
         'ilike': 'ilike', 'like':'like',
         'gte': '>=', 'lte': '<='}
 
-    def __init__(self, name, file, fid = "gid", geometry = "geometry", fe_attributes = 'true', order = "", srid = 4326, srid_out = 4326, encoding = "utf-8", writable = True, attribute_cols = "*", **kwargs):
+    def __init__(self, name, file, fid = "gid", geometry = "geometry", fe_attributes = 'true', order = "", srid = 4326, srid_out = 4326, encoding = "utf-8", writable = True, attribute_cols = "*", wkb = 'false', filter_encoding = 'xslt', bbox_mode = 'exact', **kwargs):
         DataSource.__init__(self, name, **kwargs)
         self.file           = file
         self.table          = kwargs["layer"]
@@ -47,6 +51,20 @@ class SpatialLite (DataSource):
         self.fe_attributes = True
         if fe_attributes.lower() == 'false':
             self.fe_attributes  = False
+
+        self.wkb = False
+        if str(wkb).lower() == 'true':
+            self.wkb = True
+
+        # filter_encoding=xslt inlines OGC filters with the stylesheets,
+        # python compiles them to bind parameters
+        self.filter_encoding = str(filter_encoding).lower()
+
+        # bbox_mode=fast only compares bounding boxes, which is exact for
+        # point layers
+        self.bbox_mode = str(bbox_mode).lower()
+
+        self.build_templates()
     
 
     def column_names (self, feature):
@@ -58,10 +76,10 @@ class SpatialLite (DataSource):
         for key, val in feature.properties.items():
             valtype = type(val).__name__
             if valtype == "dict":
-                val['pred'] = "%%(%s)s" % (key,)
+                val['pred'] = ":%s" % (key,)
                 values.append(val)
             else:
-                fmt     = "%%(%s)s" % (key, )
+                fmt     = ":%s" % (key, )
                 values.append(fmt)
         return values
     
@@ -87,24 +105,58 @@ class SpatialLite (DataSource):
         return predicates
 
     
+    def local(self):
+        """State of the request served by the current thread. One
+           datasource instance serves all threads, each request needs a
+           connection and transaction of its own."""
+        return self.__dict__.setdefault('_local', threading.local())
+
+    def getConnection(self):
+        return getattr(self.local(), 'connection', None)
+
+    def setConnection(self, connection):
+        self.local().connection = connection
+
+    # connection of the current thread's request
+    _connection = property(getConnection, setConnection)
+
     def begin(self):
+        if self._connection is not None:
+            return
         if not os.path.exists(self.file):
             raise ConnectionException(**{'layer':self.name,'locator':'SpatialLite'})
-        self._connection = db.connect(self.file, check_same_thread = False)
+        # the transaction is begun explicitly, pysqlite would otherwise
+        # commit it before every SAVEPOINT statement
+        self._connection = db.connect(self.file, check_same_thread = False, isolation_level = None)
+        self._connection.execute("BEGIN")
     
     def close(self):
-        self._connection.close()
+        connection, self._connection = self._connection, None
+        connection.close()
 
     def commit(self):
+        if self._connection is None:
+            return
         if self.writable:
             self._connection.commit()
         self.close()
 
     def rollback(self):
+        if self._connection is None:
+            return
         if self.writable:
             self._connection.rollback()
         self.close()
 
+    def savepoint(self, name):
+        self._connection.execute("SAVEPOINT %s" % name)
+
+    def release_savepoint(self, name):
+        self._connection.execute("RELEASE SAVEPOINT %s" % name)
+
+    def rollback_savepoint(self, name):
+        self._connection.execute("ROLLBACK TO SAVEPOINT %s" % name)
+
     def insert(self, action):
         self.begin()
         if action.feature != None:
@@ -117,9 +169,7 @@ class SpatialLite (DataSource):
 
             cursor = self._connection.cursor()
             cursor.execute(str(sql), self.feature_values(feature))
-    
-            cursor.execute("SELECT last_insert_rowid()")
-            action.id = cursor.fetchone()[0]
+            action.id = cursor.lastrowid
     
             return InsertResult(action.id, "")
             
@@ -129,9 +179,7 @@ class SpatialLite (DataSource):
             
             cursor = self._connection.cursor()
             cursor.execute(str(sql))
-            
-            cursor.execute("SELECT last_insert_rowid()")
-            action.id =  cursor.fetchone()[0]
+            action.id = cursor.lastrowid
             
             return InsertResult(action.id, "")
             
@@ -188,88 +236,38 @@ class SpatialLite (DataSource):
         cursor = self._connection.cursor()
         
         if action.id is not None:
-            sql = "SELECT AsText(Transform(%s, %d)) as fs_text_geom, " % (self.geom_col, int(self.srid_out))
-
-            if hasattr(self, 'version'):
-                sql += "%s as version, " % self.version
-            if hasattr(self, 'ele'):
-                sql += "%s as ele, " % self.ele
-            
-            sql += "\"%s\"" % self.fid_col
-        
-            if len(self.attribute_cols) > 0:
-                sql += ", %s" % self.attribute_cols
-
-            if hasattr(self, "additional_cols"):
-                cols = self.additional_cols.split(';')
-                additional_col = ",".join(cols)
-                sql += ", %s" % additional_col
-            
-            sql += " FROM \"%s\" WHERE %s = :%s" % (self.table, self.fid_col, self.fid_col)
+            sql = self.select_sql(properties = action.properties, geometry = action.geometry) + self.id_filter
             cursor.execute(str(sql), {self.fid_col: str(action.id)})
             
             result = [cursor.fetchone()]
             
         else:
-            filters = []
-            attrs = []
-            if action.attributes:
-                match = Feature(props = action.attributes)
-                filters = self.feature_predicates(match)
-                for key, value in action.attributes.items():
-                    if isinstance(value, dict):
-                        attrs[key] = value['value']
-                    else:
-                        attrs[key] = value
-            if action.bbox:
-                filters.append("Intersects(Transform(BuildMBR(%f, %f, %f, %f, %s), %s), geometry)" % (tuple(action.bbox) + (self.srid_out,) + (self.srid,)))
-
-
-            sql = "SELECT AsText(Transform(%s, %d)) as fs_text_geom, " % (self.geom_col, int(self.srid_out))
-            if hasattr(self, 'ele'):
-                sql += "%s as ele, " % self.ele
-            if hasattr(self, 'version'):
-                sql += "%s as version, " % self.version
-            sql += "\"%s\"" % self.fid_col
-                
-            if len(self.attribute_cols) > 0:
-                sql += ", %s" % self.attribute_cols
-                        
+            where, attrs = self.where_sql(action)
+            keys = Continuation.sort_keys(self.order, self.fid_col)
+            if action.continuation:
+                seek_sql, seek_params = Continuation.seek(keys, Continuation.decode(action.continuation, keys, self.name), ":%s")
+                where += (where and " AND " or " WHERE ") + seek_sql
+                attrs.update(seek_params)
+
             # check OGC FE attributes
+            fe_cols = []
             if self.fe_attributes and action.wfsrequest:
-                fe_cols = action.wfsrequest.getAttributes()
-                ad_cols = self.getColumns()    
-                
-                fe_cols = filter(lambda x: x not in ad_cols, fe_cols)
-                
-                if len(fe_cols) > 0:
-                    sql += ", %s" % ",".join(fe_cols)
-                
-            if hasattr(self, "additional_cols"):
-                cols = self.additional_cols.split(';')
-                additional_col = ",".join(cols)
-                sql += ", %s" % additional_col
-
-            
-            sql += " FROM \"%s\"" % (self.table)
+                fe_cols = [col for col in action.wfsrequest.getAttributes() if col not in self.column_set]
+            sql = self.select_sql(fe_cols, action.properties, action.geometry) + where
             
-            if filters:
-                sql += " WHERE " + " AND ".join(filters)
-            if action.wfsrequest:
-                if filters:
-                    sql += " AND "
-                else:
-                    sql += " WHERE "
-                sql += action.wfsrequest.render(self)
-            
-            if self.order:
+            if action.maxfeatures or action.continuation:
+                # pages are ordered by the fid as well, so they can be continued
+                sql += " ORDER BY " + Continuation.order_by(keys, 'sqlite')
+            elif self.order:
                 sql += " ORDER BY " + self.order
             if action.maxfeatures:
-                sql += " LIMIT %d" % action.maxfeatures
+                sql += " LIMIT :fs_limit"
+                attrs['fs_limit'] = int(action.maxfeatures)
             #else:
             #    sql += " LIMIT 1000"
-            if action.startfeature:
-                sql += " OFFSET %d" % action.startfeature
+            if action.startfeature and not action.continuation:
+                sql += " OFFSET :fs_offset"
+                attrs['fs_offset'] = int(action.startfeature)
             
             cursor.execute(str(sql), attrs)
 
@@ -280,13 +278,21 @@ class SpatialLite (DataSource):
         
         for row in result:
             props = dict(zip(columns, row))
-            if not props['fs_text_geom']: continue
-            geom  = WKT.from_wkt(props['fs_text_geom'])
+            geom = None
+            if action.geometry is False:
+                pass
+            elif self.wkb:
+                geom_data = props.pop('fs_binary_geom')
+                if not geom_data: continue
+                geom = WKB.from_wkb(geom_data)
+            else:
+                geom_data = props.pop('fs_text_geom')
+                if not geom_data: continue
+                geom = WKT.from_wkt(geom_data)
             id = props[self.fid_col]
             del props[self.fid_col]
             if self.attribute_cols == '*':
-                del props[self.geom_col]
-            del props['fs_text_geom']
+                props.pop(self.geom_col, None)
             for key, value in props.items():
                 if isinstance(value, str):
                     props[key] = unicode(value, self.encoding)
@@ -300,28 +306,149 @@ class SpatialLite (DataSource):
                 except:
                     pass
 
-            if (geom):
+            if geom or action.geometry is False:
                 features.append( Feature( id, geom, self.geom_col, self.srid_out, props ) )
         return features
 
-    def getColumns(self):
-        cols = []
+    def where_sql(self, action):
+        """WHERE clause of the attribute, bbox and OGC filters of a select
+           action, with its bind parameters."""
+        filters = []
+        attrs = {}
+        if action.attributes:
+            match = Feature(props = action.attributes)
+            filters = self.feature_predicates(match)
+            for key, value in action.attributes.items():
+                if isinstance(value, dict):
+                    attrs[key] = value['value']
+                else:
+                    attrs[key] = value
+        if action.bbox:
+            filters.append(self.bbox_filter)
+            attrs.update({'fs_minx': float(action.bbox[0]), 'fs_miny': float(action.bbox[1]),
+                          'fs_maxx': float(action.bbox[2]), 'fs_maxy': float(action.bbox[3])})
+
+        sql = ""
+        if filters:
+            sql += " WHERE " + " AND ".join(filters)
+        if action.wfsrequest:
+            if filters:
+                sql += " AND "
+            else:
+                sql += " WHERE "
+            if self.filter_encoding == 'python':
+                filter_sql, filter_params = action.wfsrequest.compile(self)
+                sql += filter_sql
+                attrs.update(filter_params)
+            else:
+                sql += action.wfsrequest.render(self)
+        return sql, attrs
 
-        if hasattr(self, 'attribute_cols'):
-            cols = self.attribute_cols.split(",")
-        
-        cols.append(self.geom_col)
-        cols.append(self.fid_col)
-        
+    def count(self, action):
+        """Number of features matched by a select action, counted by
+           SQLite without reading any geometries."""
+        self.begin()
+        if action.id is not None:
+            where, attrs = self.id_filter, {self.fid_col: str(action.id)}
+        else:
+            where, attrs = self.where_sql(action)
+        cursor = self._connection.cursor()
+        cursor.execute(str("SELECT count(*) FROM \"%s\"%s" % (self.table, where)), attrs)
+        return int(cursor.fetchone()[0])
+
+    def getContinuation(self, feature):
+        return Continuation.encode(Continuation.sort_keys(self.order, self.fid_col), feature, self.fid_col)
+
+    def geometry_select (self):
+        """Select expression for the output geometry, binary WKB if the
+           layer is configured with wkb=true."""
+        geometry = self.transform(self.geom_col, self.srid, self.srid_out)
+        if self.wkb:
+            return "AsBinary(%s) as fs_binary_geom" % geometry
+        return "AsText(%s) as fs_text_geom" % geometry
+
+    def transform (self, expression, srid, to_srid):
+        """expression reprojected from srid to to_srid, or as it is if both
+           are the same."""
+        if int(srid) == int(to_srid):
+            return expression
+        return "Transform(%s, %d)" % (expression, int(to_srid))
+
+    def select_sql (self, fe_cols = None, properties = None, geometry = True):
+        """SELECT ... FROM table with the additional OGC FE columns fe_cols.
+           If properties are named only their columns are selected, with
+           geometry=False the geometry is not selected at all."""
+        columns = [self.key_columns]
+        tail = self.select_tail
+        if properties is not None:
+            # only the columns of the properties asked for
+            columns += self.projection(properties)
+            tail = " FROM \"%s\"" % self.table
+        elif len(self.attribute_cols) > 0:
+            columns.append(self.attribute_cols)
+        if geometry:
+            columns.insert(0, self.geometry_select())
+        if fe_cols:
+            columns.append(",".join(fe_cols))
+        return "SELECT " + ", ".join(columns) + tail
+
+    def projection (self, names):
+        """SELECT expressions of the attribute and additional columns
+           named in names, and of the order columns which continuation
+           tokens are made of."""
+        names = set(names)
+        for column, descending in Continuation.sort_keys(self.order, self.fid_col):
+            names.add(Continuation.property_name(column))
+        names.discard(self.fid_col)
+        names.discard(self.geom_col)
+        if self.attribute_cols == '*':
+            columns = ["\"%s\"" % name for name in sorted(names) if '"' not in name]
+        else:
+            columns = [expression for name, expression in self.attribute_list if name in names]
+        return columns + [expression for name, expression in self.additional_list if name in names]
+
+    def build_templates (self):
+        """Precomputes the parts of the SELECT statements which only depend
+           on the layer configuration."""
+        columns = []
+        if hasattr(self, 'ele'):
+            columns.append("%s as ele" % self.ele)
         if hasattr(self, 'version'):
-            cols.append(self.version)
+            columns.append("%s as version" % self.version)
+        columns.append("\"%s\"" % self.fid_col)
+        # always selected, whichever properties are asked for
+        self.key_columns = ", ".join(columns)
+
+        self.attribute_list = Columns.named(self.attribute_cols)
+        self.additional_list = []
+        if hasattr(self, "additional_cols"):
+            self.additional_list = Columns.named(self.additional_cols, ';')
+
+        self.select_tail = ""
+        if hasattr(self, "additional_cols"):
+            self.select_tail += ", %s" % ",".join(self.additional_cols.split(';'))
+        self.select_tail += " FROM \"%s\"" % self.table
+
+        self.id_filter = " WHERE %s = :%s" % (self.fid_col, self.fid_col)
+        envelope = self.transform("BuildMBR(:fs_minx, :fs_miny, :fs_maxx, :fs_maxy, %d)" % int(self.srid_out), self.srid_out, self.srid)
+        if self.bbox_mode == 'fast':
+            self.bbox_filter = "MbrIntersects(%s, %s)" % (envelope, self.geom_col)
+        else:
+            self.bbox_filter = "Intersects(%s, %s)" % (envelope, self.geom_col)
+
+        self.columns = self.attribute_cols.split(",") + [self.geom_col, self.fid_col]
+        if hasattr(self, 'version'):
+            self.columns.append(self.version)
         if hasattr(self, 'ele'):
-            cols.append(self.ele)
-        
-        return cols
+            self.columns.append(self.ele)
+        self.column_set = set(self.columns)
+
+    def getColumns(self):
+        return list(self.columns)
         
     
     def getAttributeDescription(self, attribute):
+        opened = self._connection is None
         self.begin()
         cursor = self._connection.cursor()
         result = []
@@ -331,9 +458,10 @@ class SpatialLite (DataSource):
         try:
             cursor.execute(sql % self.table)
             result = cursor.fetchall()
-            self.commit()
         except:
             pass
+        if opened:
+            self.rollback()
         
     
         type = 'string'
@@ -0,0 +1,84 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+import re
+from collections import OrderedDict
+
+import psycopg2
+
+placeholder = re.compile(r'%\((\w+)\)s|%%')
+
+class StatementCache (object):
+    """Server-side prepared statements of one PostgreSQL connection, keyed
+       by the SQL text with its pyformat placeholders. Since literals are
+       passed as parameters, all requests of the same shape share one
+       statement and its plan.
+
+       The least recently used statements are deallocated once there are
+       more than size of them. SQL that PostgreSQL refuses to prepare
+       (e.g. because a parameter type can not be inferred) is remembered
+       and executed as is from then on."""
+
+    def __init__ (self, size = 100):
+        self.size       = int(size)
+        self.statements = OrderedDict() # sql -> (name, parameter names)
+        self.failed     = set()
+        self.count      = 0
+
+    def execute (self, cursor, sql, params):
+        entry = self.statements.pop(sql, None)
+        if entry is None:
+            if sql in self.failed:
+                cursor.execute(sql, params)
+                return
+            entry = self.prepare(cursor, sql)
+            if entry is None:
+                cursor.execute(sql, params)
+                return
+        self.statements[sql] = entry
+
+        name, keys = entry
+        if len(keys) > 0:
+            cursor.execute("EXECUTE %s (%s)" % (name, ", ".join(["%s"] * len(keys))), [params[key] for key in keys])
+        else:
+            cursor.execute("EXECUTE %s" % name)
+
+    def prepare (self, cursor, sql):
+        keys = []
+        def number (match):
+            if match.group(1) is None:
+                return '%'
+            if match.group(1) not in keys:
+                keys.append(match.group(1))
+            return "$%d" % (keys.index(match.group(1)) + 1)
+        statement = placeholder.sub(number, sql)
+
+        self.count += 1
+        name = "fs_statement_%d" % self.count
+
+        # a failed PREPARE must not abort the request's transaction
+        cursor.execute("SAVEPOINT fs_prepare")
+        try:
+            cursor.execute("PREPARE %s AS %s" % (name, statement))
+        except psycopg2.Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT fs_prepare")
+            if len(self.failed) > self.size:
+                self.failed.clear()
+            self.failed.add(sql)
+            return None
+        cursor.execute("RELEASE SAVEPOINT fs_prepare")
+
+        while len(self.statements) >= self.size:
+            old_sql, (old_name, old_keys) = self.statements.popitem(last = False)
+            cursor.execute("DEALLOCATE %s" % old_name)
+        return (name, keys)
+
+
+class Connection (psycopg2.extensions.connection):
+    """psycopg2 connection carrying the StatementCache of its session."""
+
+    def __init__ (self, *args, **kwargs):
+        psycopg2.extensions.connection.__init__(self, *args, **kwargs)
+        self.statement_cache = StatementCache()
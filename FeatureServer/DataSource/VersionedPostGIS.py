@@ -19,7 +19,7 @@ class VersionedPostGIS (PostGIS):
     """A proof of concept for versioned PostGIS-powered geo-database support.
        Allows 'open tagging', and creates transaction logs for looking through
        historical changes to the datastore."""
-    def __init__(self, name, srid = 4326, srid_out = 4326, fid = "id", geometry = "shape", order = "", **args):
+    def __init__(self, name, srid = 4326, srid_out = 4326, fid = "id", geometry = "shape", order = "", encoding = "utf-8", pool = 'true', pool_min = 1, pool_max = 10, pool_idle = 300, pool_check = 30, **args):
         DataSource.__init__(self, name, **args)
         self.db         = None
         self.table      = "feature" 
@@ -29,23 +29,39 @@ class VersionedPostGIS (PostGIS):
         self.srid       = srid
         self.srid_out   = srid_out
         self.dsn        = args["dsn"]
+        self.setEncoding(encoding)
+        self.setPool(pool, pool_min, pool_max, pool_idle, pool_check)
     
     def begin (self):
+        # one txn row per transaction, begin is called again by the actions
+        if self.db is not None:
+            return
         PostGIS.begin(self)
-        self.txn_uuid = uuid.uuid1().hex
+        self.local().txn_uuid = uuid.uuid1().hex
         sql = """INSERT INTO txn (uuid, actor, message, commit_time)
-                        VALUES ('%s', 1, 'message', now());""" % self.txn_uuid
+                        VALUES ('%s', 1, 'message', now());""" % self.local().txn_uuid
         cursor = self.db.cursor()
         cursor.execute(str(sql))
         
     def commit (self):
         sql = """update txn set bbox = envelope(collect(shape)) from history
                     where history.txn_id = txn.uuid and txn.uuid = '%s'""" \
-                    % self.txn_uuid
+                    % self.local().txn_uuid
         cursor = self.db.cursor()
         cursor.execute(str(sql))
         PostGIS.commit(self)
 
+    # versioned features are inserted one by one
+    insert_many = None
+
+    def getContinuation (self, feature):
+        # pages of versioned layers are still selected with OFFSET
+        return None
+
+    def count (self, action):
+        # the table holds every version of a feature
+        return DataSource.count(self, action)
+
     def insert (self, action):
         feature = action.feature
         values = {'geom' : WKT.to_wkt(feature.geometry),
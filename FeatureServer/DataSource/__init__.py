@@ -5,6 +5,7 @@ __version__ = "$Id: __init__.py 498 2008-05-18 13:10:43Z crschmidt $"
 
 import sys
 import os
+import copy
 import warnings
 import time
 
@@ -27,14 +28,41 @@ class DataSource (object):
         raise NotImplementedError
     def select (self, params):
         pass
+    def count (self, action):
+        """Number of features matched by a select action, for
+           resultType=hits. Datasources which can count without reading
+           the features override this."""
+        action = copy.copy(action)
+        action.maxfeatures = None
+        action.startfeature = 0
+        action.continuation = None
+        features = self.select(action) or []
+        return len(list(features))
     def begin (self):
         pass
     def commit (self):
         pass
     def rollback (self):
         pass
+    def savepoint (self, name):
+        """Marks a point in the transaction of the request which
+           rollback_savepoint returns to, so a single failed action can be
+           undone without the others."""
+        pass
+    def release_savepoint (self, name):
+        pass
+    def rollback_savepoint (self, name):
+        pass
     def getBBOX(self):
         return '0 0 0 0'
+    def getLastModified(self):
+        """Unix time of the last change to the layer, if the datasource
+           keeps track of it. Used as Last-Modified of responses."""
+        return None
+    def getContinuation(self, feature):
+        """Token which continues a paged select after feature, for
+           datasources which can seek to it instead of skipping rows."""
+        return None
     def getAttributeDescription(self, name): pass
 
 class Lock (object):
@@ -81,3 +109,9 @@ class Lock (object):
             warnings.warn("unlock %s failed: %s" % (self.lockfile, str(E)))
 
     __del__ = unlock
+
+from FeatureServer.Registry import Registry
+
+# datasource types of the type option of layer sections
+datasources = Registry("FeatureServer.DataSource", ["PostGIS", "VersionedPostGIS", "SpatialLite", "SQLite", "OGR", "WFS", "DBM",
+                                                    "OSM", "Flickr", "Twitter", "GeoAlchemy", "AppEngine", "AppEngineGeoModel"])
@@ -6,7 +6,11 @@ Created on October 15, 2012
 
 class ExceptionReport():
     index = 0
-    exceptions = []
+    
+    def __init__(self):
+        # one list per report, a failed request must not leave its
+        # exceptions to the following ones
+        self.exceptions = []
     
     def add(self, exception):
         self.exceptions.append(exception)
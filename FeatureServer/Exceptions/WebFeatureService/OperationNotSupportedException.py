@@ -0,0 +1,9 @@
+'''
+Created on Oct 18, 2026
+
+'''
+from FeatureServer.Exceptions.WebFeatureService.WFSException import WFSException
+
+class OperationNotSupportedException(WFSException):
+    def __init__(self, operation, **kwargs):
+        super(OperationNotSupportedException, self).__init__(code="OperationNotSupported", message="Filter operator '%s' is not supported by this layer." % operation, **kwargs)
@@ -0,0 +1,59 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+def load (path):
+    """Imports the class of a dotted path, e.g. mypackage.module.Class."""
+    module_name, class_name = path.rsplit(".", 1)
+    module = __import__(module_name, globals(), locals(), [class_name])
+    return getattr(module, class_name)
+
+class Registry (object):
+    """Classes by name, e.g. the services or datasource types. Names are
+       registered with the dotted path of their class, which is imported
+       once on first use, so optional dependencies of unused classes are
+       never imported. Plugins add their classes with register()."""
+
+    def __init__ (self, package, names = ()):
+        self.package = package
+        self.paths   = {}
+        self.classes = {}
+        for name in names:
+            self.register(name)
+
+    def register (self, name, cls = None):
+        """Registers cls, a class or the dotted path of one, under name.
+           Without cls the class of the same name in the module of the
+           same name in the package is registered."""
+        if cls is None:
+            cls = "%s.%s.%s" % (self.package, name, name)
+        if isinstance(cls, basestring):
+            self.paths[name] = cls
+            self.classes.pop(name, None)
+        else:
+            self.classes[name] = cls
+
+    def get (self, name):
+        """The class registered as name, or else the class of the same name
+           in the package. Names come from requests, so they can not point
+           outside the package. Raises ImportError if there is no such
+           class."""
+        cls = self.classes.get(name)
+        if cls is None:
+            path = self.paths.get(name)
+            if path is None:
+                if not name or "." in name:
+                    raise ImportError("No %s named %r" % (self.package, name))
+                path = "%s.%s.%s" % (self.package, name, name)
+            try:
+                cls = load(path)
+            except AttributeError, E:
+                raise ImportError(str(E))
+            self.classes[name] = cls
+        return cls
+
+    def names (self):
+        names = set(self.paths.keys())
+        names.update(self.classes.keys())
+        return sorted(names)
@@ -7,6 +7,8 @@ __version__ = "$Id: Server.py 607 2009-04-27 15:53:15Z crschmidt $"
 import sys
 import time
 import os
+import types
+import itertools
 import traceback
 import ConfigParser
 from web_request.handlers import wsgi, mod_python, cgi
@@ -20,13 +22,20 @@ from FeatureServer.WebFeatureService.Response.ActionResult import ActionResult
 from FeatureServer.Workspace.FileHandler import FileHandler
 
 from FeatureServer.Exceptions.ExceptionReport import ExceptionReport
+from FeatureServer.Exceptions.WebFeatureService.WFSException import WFSException
 from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
+from FeatureServer.Exceptions.WebFeatureService.OperationNotSupportedException import OperationNotSupportedException
 from FeatureServer.Exceptions.ConnectionException import ConnectionException
 from FeatureServer.Exceptions.LayerNotFoundException import LayerNotFoundException
 
 
 import FeatureServer.Processing 
-from web_request.response import Response
+from FeatureServer.Service import services, content_types
+from FeatureServer.DataSource import datasources as datasource_types
+from FeatureServer.Cache import caches
+from FeatureServer.Registry import load
+from FeatureServer.WebFeatureService.RequestContext import RequestContext
+from web_request.response import Response, StreamingResponse, NotModifiedResponse, ClosingIterator, validator_headers, not_modified, negotiate_coding, compression_wbits
 
 # First, check explicit FS_CONFIG env var
 if 'FS_CONFIG' in os.environ:
@@ -42,6 +51,124 @@ else:
         cfgfiles = ("featureserver.cfg", os.path.join("..", "featureserver.cfg"), "/etc/featureserver.cfg")
 
 
+class PageToken (object):
+    """Continuation token of a streamed page, taken from the page's last
+       feature as it passes through, before the properties of the feature
+       are projected. Called by the encoder once the features were
+       written, it returns None unless the page was full."""
+
+    def __init__ (self, datasource, maxfeatures):
+        self.datasource  = datasource
+        self.maxfeatures = maxfeatures
+        self.count       = 0
+        self.token       = None
+
+    def add (self, feature):
+        self.count += 1
+        if self.count == self.maxfeatures:
+            self.token = self.datasource.getContinuation(feature)
+
+    def __call__ (self):
+        return self.token
+
+class FinishingStream (object):
+    """Chunks of a streamed response, which end the datasource transaction
+       once all features have been sent. If encoding fails or the server
+       closes the response early, even before asking for the first chunk,
+       the transaction is rolled back."""
+
+    def __init__ (self, chunks, datasource):
+        self.chunks     = chunks
+        self.datasource = datasource
+        self.ended      = False
+
+    def __iter__ (self):
+        return self
+
+    def next (self):
+        try:
+            return self.chunks.next()
+        except StopIteration:
+            self.end(True)
+            raise
+        except:
+            self.end(False)
+            raise
+
+    def close (self):
+        try:
+            if hasattr(self.chunks, 'close'):
+                self.chunks.close()
+        finally:
+            self.end(False)
+
+    def end (self, finished):
+        if self.ended:
+            return
+        self.ended = True
+        if finished:
+            self.datasource.commit()
+        else:
+            self.datasource.rollback()
+
+class CachingStream (object):
+    """Chunks of a streamed response, whose complete body is cached once
+       the last chunk was sent, unless it grew larger than the max_entry
+       size of the cache. If the request leads the single flight of key,
+       waiting requests are released once the body is cached, turned out
+       too large or the response was closed, whether or not it was
+       started."""
+
+    def __init__ (self, cache, chunks, key, layer, generation, response, ttl, leading = False):
+        self.cache      = cache
+        self.chunks     = chunks
+        self.key        = key
+        self.layer      = layer
+        self.generation = generation
+        # mime, headers and encoding of the cached entry
+        self.response   = response
+        self.ttl        = ttl
+        self.leading    = leading
+        self.body       = []
+        self.size       = 0
+
+    def __iter__ (self):
+        return self
+
+    def next (self):
+        try:
+            chunk = self.chunks.next()
+        except StopIteration:
+            if self.body is not None:
+                mime, headers, encoding = self.response
+                self.cache.set(self.key, self.layer, self.generation, (mime, "".join(self.body), headers, encoding), self.ttl)
+                self.body = None
+            self.land()
+            raise
+        except:
+            self.land()
+            raise
+        if self.body is not None:
+            self.size += len(chunk)
+            if self.size > self.cache.max_entry:
+                self.body = None
+                self.land()
+            else:
+                self.body.append(chunk)
+        return chunk
+
+    def close (self):
+        try:
+            if hasattr(self.chunks, 'close'):
+                self.chunks.close()
+        finally:
+            self.land()
+
+    def land (self):
+        if self.leading:
+            self.leading = False
+            self.cache.land(self.key)
+
 class Server (object):
     """The server manages the datasource list, and does the management of
        request input/output.  Handlers convert their specific internal
@@ -55,16 +182,30 @@ class Server (object):
        to load datasources from a config file, which is the typical lightweight
        configuration method, but does use some amount of time at script startup.
        """ 
+
+    # datasource methods which do not change the layer
+    read_methods = ("select", "count")
        
-    def __init__ (self, datasources, metadata = {}, processes = {}):
+    def __init__ (self, datasources, metadata = {}, processes = {}, cache = None):
         self.datasources   = datasources
         self.metadata      = metadata
         self.processes     = processes 
+        self.cache         = cache
+
+        # content codings offered to clients, e.g. compression=gzip,deflate
+        self.compression = [coding.strip().lower() for coding in metadata.get('compression', '').split(',') if coding.strip().lower() in compression_wbits]
+        self.compression_level = int(metadata.get('compression_level', 6))
+        self.compression_min_size = int(metadata.get('compression_min_size', 1024))
     
+    registries = {'DataSource': datasource_types, 'Cache': caches}
+
     def _loadFromSection (cls, config, section, module_type, **objargs):
         type  = config.get(section, "type")
-        module = __import__("%s.%s" % (module_type, type), globals(), locals(), type)
-        objclass = getattr(module, type)
+        if "." in type:
+            # a plugin class, e.g. type=mypackage.module.Class
+            objclass = load(type)
+        else:
+            objclass = cls.registries[module_type].get(type)
         for opt in config.options(section):
             objargs[opt] = config.get(section, opt)
         if module_type is 'DataSource':
@@ -84,10 +225,14 @@ class Server (object):
             for key in config.options("metadata"):
                 metadata[key] = config.get("metadata", key)
 
+        cache = None
+        if config.has_section("cache"):
+            cache = cls.loadFromSection(config, "cache", 'Cache')
+
         processes = {}
         datasources = {}
         for section in config.sections():
-            if section == "metadata": continue
+            if section == "metadata" or section == "cache": continue
             if section.startswith("process_"):
                 try:
                     processes[section[8:]] = FeatureServer.Processing.loadFromSection(config, section)
@@ -96,38 +241,30 @@ class Server (object):
             else:     
                 datasources[section] = cls.loadFromSection(config, section, 'DataSource')
 
-        return cls(datasources, metadata, processes)
+        return cls(datasources, metadata, processes, cache)
     load = classmethod(_load)
 
 
-    def dispatchRequest (self, base_path="", path_info="/", params={}, request_method = "GET", post_data = None,  accepts = ""):
+    def dispatchRequest (self, base_path="", path_info="/", params={}, request_method = "GET", post_data = None,  accepts = "", request_headers = None):
         """Read in request data, and return a (content-type, response string) tuple. May
-           raise an exception, which should be returned as a 500 error to the user."""
+           raise an exception, which should be returned as a 500 error to the user.
+           request_headers are the HTTP headers of the request, used for
+           conditional GET requests."""
+        flights = []
+        try:
+            return self.dispatchFeatureRequest(base_path, path_info, params, request_method, post_data, accepts, request_headers, flights)
+        except:
+            # identical requests waiting for this one go on by themselves
+            for key in flights:
+                self.cache.land(key)
+            raise
+
+    def dispatchFeatureRequest (self, base_path, path_info, params, request_method, post_data, accepts, request_headers, flights):
+        """Does the work of dispatchRequest. Keys of the single flights this
+           request leads are added to flights."""
         response_code = "200 OK"
         host = base_path
         request = None
-        content_types = {
-          'application/vnd.google-earth.kml+xml': 'KML',
-          'application/json': 'GeoJSON',
-          'text/javascript': 'GeoJSON',
-          'application/rss+xml': 'GeoRSS',
-          'text/html': 'HTML',
-          'osm': 'OSM',
-          'gml': 'WFS',
-          'wfs': 'WFS',
-          'kml': 'KML',
-          'json': 'GeoJSON',
-          'georss': 'GeoRSS',
-          'atom': 'GeoRSS',
-          'html': 'HTML',
-          'geojson':'GeoJSON',
-          'shp': 'SHP',
-          'csv': 'CSV',
-          'gpx': 'GPX',
-          'ov2': 'OV2',
-          'sqlite': 'SQLite',
-          'dxf' : 'DXF'
-        }
         
         exceptionReport = ExceptionReport()
         
@@ -151,25 +288,20 @@ class Server (object):
                     format = content_types[format.lower()]
                     found = True
         
-        if not found and not params.has_key("service") and post_data:
-            try:
-                dom = etree.XML(post_data)
-                params['service'] = dom.get('service')
-            except etree.ParseError: pass
-
-        if not found and not params.has_key("version") and post_data:
-            try:
-                dom = etree.XML(post_data)
-                params['version'] = dom.get('version')
-            except etree.ParseError: pass
-            
-        if not found and not params.has_key("typename") and post_data:
-            try:
-                dom = etree.XML(post_data)
+        context = None
+        if post_data:
+            context = RequestContext(post_data)
+
+        if not found and post_data and context.getRoot() is not None:
+            root = context.getRoot()
+            if not params.has_key("service"):
+                params['service'] = root.get('service')
+            if not params.has_key("version"):
+                params['version'] = root.get('version')
+            if not params.has_key("typename"):
                 for key, value in cgimod.parse_qsl(post_data, keep_blank_values=True):
                     if key.lower() == 'typename':
                         params['typename'] = value
-            except etree.ParseError: pass
 
         if not found and params.has_key("service"):
             format = params['service']
@@ -196,22 +328,33 @@ class Server (object):
         #       | Request | <|------- | WFS |
         #       -----------           -------
         #===============================================================================
-        service_module = __import__("Service.%s" % format, globals(), locals(), format)
-        service = getattr(service_module, format)
+        service = services.get(format)
         request = service(self)
+        request.context = context
         
         response = []
+        streams = []
+        cache_key = None
+        validators = {}
+        stored = False
+        written = False
+        coding = None
+        if self.compression and request_headers:
+            coding = negotiate_coding(request_headers.get('Accept-Encoding'), self.compression)
+        if self.cache is not None and request_method == "GET":
+            # the services may add to params while parsing
+            cache_params = dict(params)
         
         try:
             request.parse(params, path_info, host, post_data, request_method)
             
             # short circuit datasource where the first action is a metadata request. 
-            if len(request.actions) and request.actions[0].method == "metadata": 
+            if request.actions and request.actions[0].method == "metadata": 
                 return request.encode_metadata(request.actions[0])
 
             # short circuit datasource where a OGC WFS request is set
             # processing by service
-            if len(request.actions) > 0 and hasattr(request.actions[0], 'request') and request.actions[0].request is not None:
+            if request.actions and hasattr(request.actions[0], 'request') and request.actions[0].request is not None:
                 version = '1.0.0'
                 if hasattr(request.actions[0], 'version') and len(request.actions[0].version) > 0:
                     version = request.actions[0].version
@@ -226,11 +369,53 @@ class Server (object):
             if request_method != "GET" and hasattr(datasource, 'processes'):
                 raise Exception("You can't post data to a processed layer.")
 
+            if self.cache is not None and request_method == "GET" and len(request.actions) > 0 and \
+                    len([action for action in request.actions if action.method not in self.read_methods]) == 0:
+                signature = self.cache.signature(datasource.name, format, host, path_info, cache_params)
+                cache_generation = self.cache.generation(datasource.name)
+                if self.cache.conditional:
+                    last_modified = datasource.getLastModified()
+                    etag = self.cache.entityTag(signature, cache_generation, last_modified)
+                    if coding is not None:
+                        # each content coding is a representation of its own
+                        etag = "%s-%s" % (etag, coding)
+                    if not_modified(request_headers, etag, last_modified):
+                        response = NotModifiedResponse(etag, last_modified)
+                        if self.compression:
+                            response.extra_headers['Vary'] = 'Accept-Encoding'
+                        return response
+                    validators = validator_headers(etag, last_modified)
+
+                cache_ttl = self.cache.getTTL(datasource)
+                if cache_ttl > 0:
+                    cache_key = signature
+                    if coding is not None:
+                        cached = self.cache.get("%s:%s" % (cache_key, coding))
+                        if cached is not None:
+                            mime, data, headers, encoding = cached
+                            headers = dict(headers or {})
+                            headers.update(validators)
+                            return Response(data=data, content_type=mime, headers=headers, status_code=response_code, encoding=encoding)
+                    cached = self.cache.get(cache_key)
+                    if cached is None and self.cache.coalesce:
+                        if self.cache.lead(cache_key):
+                            flights.append(cache_key)
+                        else:
+                            # an identical request was in flight and has
+                            # cached its response meanwhile
+                            cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        mime, data, headers, encoding = cached
+                        headers = dict(headers or {})
+                        headers.update(validators)
+                        return self.compressResponse(Response(data=data, content_type=mime, headers=headers, status_code=response_code, encoding=encoding),
+                                                     coding, cache_key, datasource.name, cache_generation, cache_ttl)
+
         
             try:
                 datasource.begin()
 
-                if len(request.actions) > 0 and hasattr(request.actions[0], 'request') and request.actions[0].request is not None:
+                if request.actions and hasattr(request.actions[0], 'request') and request.actions[0].request is not None:
                     if request.actions[0].request.lower() == "getfeature":
                         ''' '''
 
@@ -238,22 +423,88 @@ class Server (object):
                     transactionResponse = TransactionResponse()
                     transactionResponse.setSummary(TransactionSummary())
                     
-                    for action in request.actions:
-                        method = getattr(datasource, action.method)
+                    # all actions of a request share one transaction. It is
+                    # atomic unless the layer has savepoints=true, then each
+                    # action of a writing request is undone on its own if it
+                    # fails, and the writes which succeeded are kept
+                    savepoints = str(getattr(datasource, 'savepoints', 'false')).lower() == 'true' and \
+                        len([action for action in request.actions if action.method not in self.read_methods]) > 0
+                    failed = False
+                    for index, (method_name, action) in enumerate(self.batchActions(request.actions, datasource)):
+                        savepoint = None
+                        if method_name not in self.read_methods:
+                            written = True
+                        if savepoints:
+                            # reads as well, a failed query would abort the
+                            # transaction of the writes
+                            savepoint = "fs_action_%d" % index
+                            datasource.savepoint(savepoint)
+                        method = getattr(datasource, method_name)
                         try:
                             result = method(action)
-                            if isinstance(result, ActionResult):
+                            if savepoint is not None:
+                                datasource.release_savepoint(savepoint)
+                            if method_name == "select" and action.maxfeatures and len(set(request.datasources)) == 1:
+                                if isinstance(result, types.GeneratorType) and request.streaming and request.late_continuation and not hasattr(datasource, 'processes'):
+                                    # the token is taken from the last feature
+                                    # of the page as it is streamed
+                                    request.continuation = PageToken(datasource, int(action.maxfeatures))
+                                    result = self.pageStream(result, request.continuation)
+                                elif isinstance(result, types.GeneratorType):
+                                    # the service writes the token before the
+                                    # features, the page is read at once
+                                    result = list(result)
+                                if isinstance(result, list) and len(result) >= int(action.maxfeatures):
+                                    request.continuation = datasource.getContinuation(result[-1])
+                            if method_name == "select" and (action.properties is not None or action.geometry is False):
+                                result = self.projectFeatures(result, action.properties, action.geometry)
+                            if method_name == "count":
+                                # resultType=hits, only the number is encoded
+                                request.hits = (request.hits or 0) + result
+                            elif method_name == "insert_many":
+                                # one result per insert action of the batch
+                                for insert in result:
+                                    if isinstance(insert, ActionResult):
+                                        transactionResponse.addResult(insert)
+                            elif isinstance(result, ActionResult):
                                 transactionResponse.addResult(result)
+                            elif isinstance(result, types.GeneratorType) and request.streaming and not hasattr(datasource, 'processes'):
+                                # features are read while encoding, so the
+                                # datasource is committed after request.encode
+                                streams.append(result)
+                                continue
                             elif result is not None:
                                 response += result
-                        except InvalidValueException as e:
+                        except (InvalidValueException, OperationNotSupportedException) as e:
+                            if savepoint is not None:
+                                datasource.rollback_savepoint(savepoint)
+                            else:
+                                failed = True
                             exceptionReport.add(e)
-    
-                        datasource.commit()
+                        except Exception as e:
+                            if savepoint is None:
+                                raise
+                            datasource.rollback_savepoint(savepoint)
+                            exceptionReport.add(WFSException(locator=datasource.__class__.__name__, layer=datasource.name, code="OperationProcessingFailed",
+                                                             message="Action '%s' failed and was rolled back." % method_name, dump=str(e)))
+
+                    if len(streams) == 0:
+                        if failed:
+                            datasource.rollback()
+                        else:
+                            datasource.commit()
                 except:
                     datasource.rollback()
                     raise
 
+                if self.cache is not None and written:
+                    # once per request and only after the commit, so a read
+                    # which started before it cannot store the old rows
+                    self.cache.invalidate(datasource.name)
+
+                if len(streams) > 0:
+                    response = itertools.chain(response, *streams)
+
                 if hasattr(datasource, 'processes'):
                     for process in datasource.processes.split(","):
                         if not self.processes.has_key(process):
@@ -269,9 +520,10 @@ class Server (object):
             exceptionReport.add(e)
 
         if len(exceptionReport) > 0:
+            if len(streams) > 0:
+                datasource.rollback()
             if self.metadata.has_key("default_exception"):
-                service_module = __import__("Service.%s" % self.metadata['default_exception'], globals(), locals(), self.metadata['default_exception'])
-                service = getattr(service_module, self.metadata['default_exception'])
+                service = services.get(self.metadata['default_exception'])
                 default_exception = service(self)
                 
                 if hasattr(default_exception, "default_exception"):
@@ -284,8 +536,7 @@ class Server (object):
                     mime, data, headers, encoding = request.encode_exception_report(exceptionReport)
                 else:
                     # get default service and instantiate
-                    service_module = __import__("Service.%s" % self.metadata['default_service'], globals(), locals(), self.metadata['default_service'])
-                    service = getattr(service_module, self.metadata['default_service'])
+                    service = services.get(self.metadata['default_service'])
                     default_service = service(self)
                 
                     if hasattr(default_service, "encode_exception_report"):
@@ -298,11 +549,157 @@ class Server (object):
 
         
         else:
-            mime, data, headers, encoding = request.encode(response)
-
-        return Response(data=data, content_type=mime, headers=headers, status_code=response_code, encoding=encoding)     
-
-    def dispatchWorkspaceRequest (self, base_path="", path_info="/", params={}, request_method = "GET", post_data = None,  accepts = ""):        
+            try:
+                mime, data, headers, encoding = request.encode(response)
+            except:
+                if len(streams) > 0:
+                    datasource.rollback()
+                raise
+            if validators:
+                headers = dict(headers or {})
+                headers.update(validators)
+            if isinstance(data, types.GeneratorType):
+                if len(streams) > 0:
+                    data = self.finishStream(data, datasource)
+                if cache_key is not None:
+                    data = self.cacheStream(data, cache_key, datasource.name, cache_generation, mime, headers, encoding, cache_ttl, cache_key in flights)
+                return self.compressStream(StreamingResponse(data=data, content_type=mime, headers=headers, status_code=response_code, encoding=encoding), coding)
+            if len(streams) > 0:
+                datasource.commit()
+            if cache_key is not None and isinstance(data, basestring):
+                self.cache.set(cache_key, datasource.name, cache_generation, (mime, data, headers, encoding), cache_ttl)
+                stored = True
+
+        for key in flights:
+            self.cache.land(key)
+
+        response = Response(data=data, content_type=mime, headers=headers, status_code=response_code, encoding=encoding)
+        if stored:
+            return self.compressResponse(response, coding, cache_key, datasource.name, cache_generation, cache_ttl)
+        return self.compressResponse(response, coding)
+
+    def pageStream (self, features, token):
+        """Passes the features of a streamed page through, handing each
+           one to token."""
+        try:
+            for feature in features:
+                token.add(feature)
+                yield feature
+        finally:
+            features.close()
+
+    def projectFeatures (self, features, names, geometry = True):
+        """Drops the properties which were not asked for with propertyName
+           from the selected features, e.g. columns a datasource reads for
+           filters or continuation tokens, and the geometries of a
+           geometry=false request. Lists stay lists, so only streamed
+           features are projected lazily."""
+        if names is not None:
+            names = set(names)
+        if isinstance(features, list):
+            for feature in features:
+                self.projectFeature(feature, names, geometry)
+        elif isinstance(features, types.GeneratorType):
+            return self.projectStream(features, names, geometry)
+        return features
+
+    def projectStream (self, features, names, geometry = True):
+        try:
+            for feature in features:
+                yield self.projectFeature(feature, names, geometry)
+        finally:
+            features.close()
+
+    def projectFeature (self, feature, names, geometry = True):
+        if names is not None:
+            for key in feature.properties.keys():
+                if key not in names:
+                    del feature.properties[key]
+        if not geometry:
+            feature.geometry = None
+        return feature
+
+    def batchActions (self, actions, datasource):
+        """Yields the datasource method and argument for every action.
+           Datasources with an insert_many method get up to insert_batch
+           consecutive insert actions at once."""
+        if getattr(datasource, 'insert_many', None) is None:
+            for action in actions:
+                yield action.method, action
+            return
+        
+        size = int(getattr(datasource, 'insert_batch', 1000))
+        batch = []
+        for action in actions:
+            if action.method == "insert":
+                if action.wfsrequest is not None:
+                    # rendered right away, streamed transactions drop their
+                    # elements once the next action is read
+                    action.wfsrequest.getStatement(datasource)
+                batch.append(action)
+                if len(batch) < size:
+                    continue
+                yield "insert_many", batch
+                batch = []
+                continue
+            if len(batch) > 0:
+                yield "insert_many", batch
+                batch = []
+            yield action.method, action
+        if len(batch) > 0:
+            yield "insert_many", batch
+
+    def compressResponse (self, response, coding, cache_key = None, layer = None, generation = None, ttl = None):
+        """Compresses the body of response with the negotiated coding if it
+           has at least compression_min_size bytes. With a cache_key the
+           compressed body is cached next to the plain one, so it is only
+           compressed once."""
+        if coding is not None:
+            compressed = response.compress(coding, self.compression_level, self.compression_min_size)
+            if compressed is not response:
+                if cache_key is not None:
+                    self.cache.set("%s:%s" % (cache_key, coding), layer, generation, (compressed.content_type, compressed.data, compressed.extra_headers, ''), ttl)
+                return compressed
+        if self.compression:
+            response.extra_headers = dict(response.extra_headers or {})
+            response.extra_headers['Vary'] = 'Accept-Encoding'
+        return response
+
+    def compressStream (self, response, coding):
+        """Compresses a streamed response with the negotiated coding. The
+           first compression_min_size bytes are read ahead to tell short
+           responses, which are sent as they are."""
+        if coding is None:
+            return self.compressResponse(response, coding)
+        head = []
+        size = 0
+        chunks = response.data
+        try:
+            while size < self.compression_min_size:
+                chunk = chunks.next()
+                head.append(chunk)
+                size += len(chunk)
+        except StopIteration:
+            response.data = head
+            return self.compressResponse(response, None)
+        response.data = self.resumeStream(head, chunks)
+        return response.compress(coding, self.compression_level)
+
+    def resumeStream (self, head, chunks):
+        """Iterates over the chunks read ahead, then the rest of the stream."""
+        return ClosingIterator(itertools.chain(head, chunks), chunks)
+
+    def finishStream (self, chunks, datasource):
+        """Passes the chunks of a streamed response through and ends the
+           datasource transaction once all features have been sent."""
+        return FinishingStream(chunks, datasource)
+
+    def cacheStream (self, chunks, key, layer, generation, mime, headers, encoding, ttl, leading = False):
+        """Passes the chunks of a streamed response through and caches the
+           complete body once the last chunk was sent."""
+        return CachingStream(self.cache, chunks, key, layer, generation, (mime, headers, encoding), ttl, leading)
+
+    def dispatchWorkspaceRequest (self, base_path="", path_info="/", params={}, request_method = "GET", post_data = None,  accepts = "", request_headers = None):        
         handler = FileHandler('workspace.db')
         handler.removeExpired()
         
@@ -348,7 +745,7 @@ class Server (object):
                             if post_data == None:
                                 params['filter'] = data[3]
                     
-                    return self.dispatchRequest(base_path, path_info, params, request_method, post_data, accepts)
+                    return self.dispatchRequest(base_path, path_info, params, request_method, post_data, accepts, request_headers)
         
         # check workspace by id
         elif params.has_key('skey'):
@@ -10,8 +10,42 @@ class Action (object):
         self.bbox           = None
         self.maxfeatures    = None
         self.startfeature   = 0
+        self.continuation   = None
+        self.properties     = None
+        self.geometry       = True
         self.attributes     = {}
         self.metadata       = None
         self.wfsrequest     = None
         self.version        = ''
         self.request        = None
+        self.geometry_format = None
+
+class ActionStream (object):
+    """Actions which are created while they are executed, e.g. from a WFS-T
+       document parsed as it is read. The first action is read ahead, so
+       the stream can be tested and its first action looked at like a list
+       of actions, but it can only be iterated once."""
+    def __init__ (self, actions):
+        self.actions = iter(actions)
+        self.first   = None
+        self.started = False
+        for action in self.actions:
+            self.first = action
+            break
+
+    def __nonzero__ (self):
+        return self.first is not None
+
+    def __getitem__ (self, index):
+        if index != 0 or self.first is None:
+            raise IndexError(index)
+        return self.first
+
+    def __iter__ (self):
+        if self.started:
+            raise RuntimeError("Actions of a stream can only be read once")
+        self.started = True
+        if self.first is not None:
+            yield self.first
+            for action in self.actions:
+                yield action
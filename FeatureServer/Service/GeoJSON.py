@@ -14,6 +14,10 @@ except Exception, E:
     raise Exception("simplejson is required for using the JSON service. (Import failed: %s)" % E)
 
 class GeoJSON(Request):
+    streaming = True
+    late_continuation = True
+    geometry_format = 'geojson'
+
     def __init__(self, service):
         Request.__init__(self, service)
         self.callback = None
@@ -45,16 +49,24 @@ class GeoJSON(Request):
     
     def encode(self, result):
         g = vectorformats.Formats.GeoJSON.GeoJSON()
-        result = g.encode(result)
+        result = self.chunked(g.encode_stream(result, continuation=self.continuation, hits=self.hits), result)
         
         if self.datasources[0]:
             datasource = self.service.datasources[self.datasources[0]]
         
         if self.callback and datasource and hasattr(datasource, 'gaping_security_hole'):
+            if not isinstance(result, basestring):
+                return ("text/plain", self.callback_stream(result), None, 'utf-8')
             return ("text/plain", "%s(%s);" % (self.callback, result), None, 'utf-8')
         else:    
             return ("text/plain", result, None, 'utf-8')
 
+    def callback_stream(self, chunks):
+        yield "%s(" % self.callback
+        for chunk in chunks:
+            yield chunk
+        yield ");"
+
     def encode_exception_report(self, exceptionReport):
         geojson = vectorformats.Formats.GeoJSON.GeoJSON()
         return ("text/plain", geojson.encode_exception_report(exceptionReport), None, 'utf-8')
@@ -7,6 +7,8 @@ from FeatureServer.Service.Request import Request
 import vectorformats.Formats.GeoRSS
 
 class GeoRSS(Request):
+    streaming = True
+
     def encode_metadata(self, action):
         layers = self.service.datasources
         layer_text = []
@@ -25,7 +27,7 @@ class GeoRSS(Request):
     
     def encode(self, result):
         atom = vectorformats.Formats.GeoRSS.GeoRSS(url=self.host, feedname=self.datasources[0]) 
-        results = atom.encode(result)
+        results = self.chunked(atom.encode_stream(result), result)
         return ("application/atom+xml", results, None, 'utf-8')
     
     def parse(self, params, path_info, host, post_data, request_method):
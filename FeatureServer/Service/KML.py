@@ -8,10 +8,11 @@ import vectorformats.Formats.KML
 
 class KML(Request):
     mime_type = "application/vnd.google-earth.kml+xml"
+    streaming = True
 
     def encode(self, result):
         kml = vectorformats.Formats.KML.KML(url=self.host, layername=self.datasources[0]) 
-        results = kml.encode(result)
+        results = self.chunked(kml.encode_stream(result), result)
         return ("application/vnd.google-earth.kml+xml", results, None, 'utf-8')        
     
     def parse(self, params, path_info, host, post_data, request_method):
@@ -1,6 +1,7 @@
 
+import types
 import FeatureServer
-from FeatureServer.Service.Action import Action
+from FeatureServer.Service.Action import Action, ActionStream
 from FeatureServer.WebFeatureService.WFSRequest import WFSRequest
 from web_request.handlers import ApplicationException
 from FeatureServer.Exceptions.LayerNotFoundException import LayerNotFoundException
@@ -10,6 +11,27 @@ class Request (object):
     
     query_action_types = []
     
+    # set by services whose encode() reads the features exactly once,
+    # in order. Those accept a lazy feature iterator from the datasource.
+    streaming = False
+
+    # output geometry encoding the service can take pre-serialised from
+    # the datasource, passed on as action.geometry_format.
+    geometry_format = None
+    
+    # RequestContext of the POSTed body, set by the server before parse
+    context = None
+
+    # token continuing a paged select, set by the server for encode. With
+    # late_continuation it may be a callable, which returns the token once
+    # the streamed features were encoded
+    continuation = None
+    late_continuation = False
+
+    # number of matched features of a count action (resultType=hits), set
+    # by the server for encode
+    hits = None
+    
     def __init__ (self, service):
         self.service     = service
         #self.datasource  = None
@@ -71,6 +93,9 @@ class Request (object):
 
         elif request_method == "POST" or request_method == "PUT" or (request_method == "OPTIONS" and len(post_data) > 0):
             actions = self.handle_post(params, path_info, host, post_data, request_method, format_obj = format_obj)
+            if isinstance(actions, ActionStream):
+                self.actions = actions
+                return
             for action in actions:
                 self.actions.append(action)
             
@@ -100,13 +125,21 @@ class Request (object):
     def get_select_action(self, path_info, params):
         """Generate a select action from a URL. Used unmodified by most
             subclasses. Handles attribute query by following the rules passed in
-            the DS or in the request, bbox, maxfeatures, and startfeature by
-            looking for the parameters in the params. """
+            the DS or in the request, bbox, maxfeatures, startfeature,
+            continuation, propertyName, geometry and resultType by looking for the
+            parameters in the params. A resultType of hits or a count segment after the layer makes
+            it a count action. """
         action = Action()
         action.method = "select"
+        action.geometry_format = self.geometry_format
         
         id = self.get_id_from_path_info(path_info)
         
+        # only a segment after the layer name, a layer may be called count
+        path = path_info.split("/")
+        if len(path) > 2 and path[-1].split(".")[0] == "count":
+            action.method = "count"
+        
         if id is not False:
             action.id = id
         
@@ -129,6 +162,18 @@ class Request (object):
                         action.maxfeatures = int(value)
                     elif key == "startfeature":
                         action.startfeature = int(value)
+                    elif key == "continuation":
+                        action.continuation = value
+                    elif key == "propertyname" or key == "properties":
+                        # WFS property names may be prefixed or grouped per typename
+                        names = value.replace("(", ",").replace(")", ",").split(",")
+                        action.properties = [name.split(":")[-1].strip() for name in names if name.strip()]
+                    elif key == "geometry":
+                        # geometry=false selects the attributes only
+                        action.geometry = str(value).lower() != 'false'
+                    elif key == "resulttype":
+                        if value.lower() == "hits":
+                            action.method = "count"
                     elif key == "request":
                         action.request = value
                     elif key == "version":
@@ -199,17 +244,23 @@ class Request (object):
                     format_obj.parse(post_data)
                     
                     transactions = format_obj.getActions()
+                    if isinstance(transactions, types.GeneratorType):
+                        return ActionStream(self.transaction_actions(transactions))
                     if transactions is not None:
-                        for transaction in transactions:
-                            action = Action()
-                            action.method = transaction.__class__.__name__.lower()
-                            action.wfsrequest = transaction
-                            actions.append(action)
+                        actions.extend(self.transaction_actions(transactions))
             
             return actions
         else:
             raise Exception("Service type does not support adding features.")
 
+    def transaction_actions(self, transactions):
+        """Yields an action for every WFS-T transaction."""
+        for transaction in transactions:
+            action = Action()
+            action.method = transaction.__class__.__name__.lower()
+            action.wfsrequest = transaction
+            yield action
+
     def encode(self, result):
         """Accepts a list of lists of features. Each list is generated by one datasource
             method call. Must return a (content-type, string) tuple."""
@@ -224,6 +275,15 @@ class Request (object):
         
         return ("text/plain", "\n".join(results), None)
     
+    def chunked(self, chunks, result):
+        """Accepts the chunk generator of a streaming encoder. If the features
+            are still being read from the datasource the generator is returned
+            as the response body, so the response is sent while it is encoded;
+            otherwise the chunks are joined into one string."""
+        if isinstance(result, list):
+            return "".join(chunks)
+        return chunks
+    
     def getcapabilities(self, version): pass
     def describefeaturetype(self, version): pass
 
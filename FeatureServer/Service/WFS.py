@@ -12,13 +12,15 @@ from FeatureServer.WebFeatureService.WFSRequest import WFSRequest
 from FeatureServer.WebFeatureService.Response.TransactionResponse import TransactionResponse
 
 class WFS(Request):
+    streaming = True
+
     def encode(self, results):
         wfs = vectorformats.Formats.WFS.WFS(layername=self.datasources[0])
         
         if isinstance(results, TransactionResponse):
             return ("text/xml", wfs.encode_transaction(results), None, 'utf-8')
         
-        output = wfs.encode(results)
+        output = self.chunked(wfs.encode_stream(results, continuation=self.continuation, hits=self.hits), results)
         return ("text/xml", output, None, 'utf-8')
     
     def encode_exception_report(self, exceptionReport):
@@ -46,7 +48,12 @@ class WFS(Request):
             self.actions.append(a)
             return
         
-        wfsrequest = WFSRequest()
+        # WFS-T documents of layers with stream_transactions are executed
+        # while they are parsed
+        stream = False
+        if len(self.datasources) == 1 and self.service.datasources.has_key(self.datasources[0]):
+            stream = str(getattr(self.service.datasources[self.datasources[0]], 'stream_transactions', 'false')).lower() == 'true'
+        wfsrequest = WFSRequest(self.context, stream)
         try:
             Request.parse(self, params, path_info, host, post_data, request_method, format_obj=wfsrequest)
         except:
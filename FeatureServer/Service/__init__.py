@@ -0,0 +1,39 @@
+'''
+Created on Oct 18, 2026
+
+'''
+
+from FeatureServer.Registry import Registry
+
+services = Registry("FeatureServer.Service", ["WFS", "GeoJSON", "KML", "GeoRSS", "HTML", "OSM", "SHP", "CSV", "GPX", "OV2", "SQLite", "DXF"])
+
+# lower case format parameters, extensions and content types of the services
+content_types = {
+  'application/vnd.google-earth.kml+xml': 'KML',
+  'application/json': 'GeoJSON',
+  'text/javascript': 'GeoJSON',
+  'application/rss+xml': 'GeoRSS',
+  'text/html': 'HTML',
+  'osm': 'OSM',
+  'gml': 'WFS',
+  'wfs': 'WFS',
+  'kml': 'KML',
+  'json': 'GeoJSON',
+  'georss': 'GeoRSS',
+  'atom': 'GeoRSS',
+  'html': 'HTML',
+  'geojson':'GeoJSON',
+  'shp': 'SHP',
+  'csv': 'CSV',
+  'gpx': 'GPX',
+  'ov2': 'OV2',
+  'sqlite': 'SQLite',
+  'dxf' : 'DXF'
+}
+
+def register (name, cls = None, types = ()):
+    """Registers a service, e.g. of a plugin, together with the format
+       names, extensions and content types it is requested with."""
+    services.register(name, cls)
+    for type in types:
+        content_types[type.lower()] = name
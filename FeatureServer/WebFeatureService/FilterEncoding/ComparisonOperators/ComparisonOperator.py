@@ -3,8 +3,7 @@ Created on Apr 5, 2011
 
 @author: michel
 '''
-import os
-from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 from FeatureServer.WebFeatureService.FilterEncoding.Operator import Operator
 
 class ComparisonOperator(Operator):
@@ -16,8 +15,7 @@ class ComparisonOperator(Operator):
     def getPropertyName(self): return str(self.node.PropertyName)
     def getLiteral(self): return str(self.node.Literal)
     def createStatement(self, datasource):
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../../resources/filterencoding/comparison_operators.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("filterencoding/comparison_operators.xsl")
         
         if hasattr(datasource, 'hstore'):
             result = transform(self.node, datasource="'"+datasource.type+"'", operationType="'"+str(self.node.xpath('local-name()'))+"'", hstore="'"+str(datasource.hstore).lower()+"'", hstoreAttribute="'"+datasource.hstoreAttribute+"'")
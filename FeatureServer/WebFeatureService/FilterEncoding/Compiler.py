@@ -0,0 +1,301 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import re
+from lxml import etree
+from FeatureServer.Exceptions.WebFeatureService.OperationNotSupportedException import OperationNotSupportedException
+
+def localname(node):
+    return node.tag.rsplit('}', 1)[-1]
+
+class Compiler(object):
+    """Compiles a parsed Filter Encoding tree straight to a SQL fragment and
+       a dict of bind parameters, without running the stylesheets in
+       resources/filterencoding. The dialect follows datasource.type; the
+       PostGIS, SpatialLite and SQLite datasources are supported.
+
+       Literals are never written into the SQL. Placeholders use the
+       paramstyle of the datasource driver and are named prefix0,
+       prefix1, ... so they can be merged with other parameters."""
+
+    placeholders = {'PostGIS'     : '%%(%s)s',
+                    'SpatialLite' : ':%s',
+                    'SQLite'      : ':%s'}
+
+    comparison_operators = {'PropertyIsEqualTo'              : '=',
+                            'PropertyIsNotEqualTo'           : '!=',
+                            'PropertyIsLessThan'             : '<',
+                            'PropertyIsGreaterThan'          : '>',
+                            'PropertyIsLessThanOrEqualTo'    : '<=',
+                            'PropertyIsGreaterThanOrEqualTo' : '>='}
+
+    logical_operators = {'And' : ' AND ', 'Or' : ' OR '}
+
+    spatial_functions = {'PostGIS'     : {'Equals'     : 'ST_Equals',
+                                          'Disjoint'   : 'ST_Disjoint',
+                                          'Touches'    : 'ST_Touches',
+                                          'Within'     : 'ST_Within',
+                                          'Overlaps'   : 'ST_Overlaps',
+                                          'Crosses'    : 'ST_Crosses',
+                                          'Intersects' : 'ST_Intersects',
+                                          'Contains'   : 'ST_Contains'},
+                         'SpatialLite' : {'Equals'     : 'Equals',
+                                          'Disjoint'   : 'Disjoint',
+                                          'Touches'    : 'Touches',
+                                          'Within'     : 'Within',
+                                          'Overlaps'   : 'Overlaps',
+                                          'Crosses'    : 'Crosses',
+                                          'Intersects' : 'Intersects',
+                                          'Contains'   : 'Contains'},
+                         'SQLite'      : {}}
+
+    identifiers = {'ResourceId' : 'rid', 'FeatureId' : 'fid'}
+
+    srs_number = re.compile(r'(\d+)\s*$')
+
+    def __init__(self, datasource, prefix = 'fe'):
+        self.datasource = datasource
+        self.dialect    = getattr(datasource, 'type', datasource.__class__.__name__)
+        if not self.placeholders.has_key(self.dialect):
+            raise OperationNotSupportedException('Filter', locator='FilterEncoding', layer=datasource.name)
+        self.hstore     = self.dialect == 'PostGIS' and getattr(datasource, 'hstore', False)
+        self.prefix     = prefix
+        self.params     = {}
+
+    def compile(self, node):
+        """Returns a (sql, params) tuple for a Filter element or a single
+           operator element."""
+        self.params = {}
+        if localname(node) == 'Filter':
+            operators = self.elements(node)
+        else:
+            operators = [node]
+
+        if len(operators) > 1 and len([op for op in operators if self.identifiers.has_key(localname(op))]) == len(operators):
+            sql = self.compileIdentifiers(operators)
+        else:
+            sql = " AND ".join([self.compileOperator(op) for op in operators])
+        return sql, self.params
+
+    def compileOperator(self, node):
+        name = localname(node)
+        if self.comparison_operators.has_key(name):
+            return self.predicate(self.property(node), self.comparison_operators[name], self.bind(self.literal(node)))
+        elif name == 'PropertyIsLike':
+            return self.compileLike(node)
+        elif name == 'PropertyIsBetween':
+            return self.predicate(self.property(node), 'BETWEEN', "%s AND %s" % (self.bind(self.boundary(node, 'LowerBoundary')),
+                                                                              self.bind(self.boundary(node, 'UpperBoundary'))))
+        elif name == 'PropertyIsNull':
+            return self.predicate(self.property(node), 'IS NULL')
+        elif name == 'PropertyIsNil':
+            return self.predicate(self.property(node), '=', self.bind(''))
+        elif self.logical_operators.has_key(name):
+            return "(%s)" % self.logical_operators[name].join([self.compileOperator(child) for child in self.elements(node)])
+        elif name == 'Not':
+            return "NOT %s" % self.compileOperator(self.elements(node)[0])
+        elif self.identifiers.has_key(name):
+            return self.compileIdentifiers([node])
+        elif name == 'BBOX':
+            return self.compileBBOX(node)
+        elif name in ('DWithin', 'Beyond'):
+            return self.compileDistance(node, name)
+        elif self.spatial_functions[self.dialect].has_key(name):
+            return "%s(%s, %s)" % (self.spatial_functions[self.dialect][name], self.column(self.geometryProperty(node)), self.geometry(node))
+        raise OperationNotSupportedException(name, locator='FilterEncoding', layer=self.datasource.name)
+
+    def compileLike(self, node):
+        wildcard = self.attribute(node, 'wildCard', '*')
+        single = self.attribute(node, 'singleChar', '?')
+        escape = self.attribute(node, 'escapeChar', '\\')
+
+        value = self.literal(node)
+        pattern = []
+        i = 0
+        while i < len(value):
+            char = value[i]
+            if char == escape and i + 1 < len(value):
+                i += 1
+                pattern.append(self.escapeLike(value[i]))
+            elif char == wildcard:
+                pattern.append('%')
+            elif char == single:
+                pattern.append('_')
+            else:
+                pattern.append(self.escapeLike(char))
+            i += 1
+
+        operator = 'LIKE'
+        if self.dialect == 'PostGIS' and str(node.get('matchCase', 'true')).lower() == 'false':
+            operator = 'ILIKE'
+        value = self.bind("".join(pattern))
+        if self.dialect != 'PostGIS':
+            # sqlite has no default escape character
+            value += " ESCAPE '\\'"
+        return self.predicate(self.property(node), operator, value)
+
+    def compileIdentifiers(self, nodes):
+        ids = [self.bind(node.get(self.identifiers[localname(node)])) for node in nodes]
+        if self.dialect == 'SQLite':
+            column = "t.feature_id"
+        else:
+            column = self.column(self.datasource.fid_col)
+        if len(ids) == 1:
+            return "%s = %s" % (column, ids[0])
+        return "%s IN (%s)" % (column, ", ".join(ids))
+
+    def compileBBOX(self, node):
+        envelope = None
+        for child in node.iterdescendants():
+            if isinstance(child.tag, basestring) and localname(child) in ('Envelope', 'Box'):
+                envelope = child
+                break
+        if envelope is None:
+            raise OperationNotSupportedException('BBOX', locator='FilterEncoding', layer=self.datasource.name)
+
+        corners = {}
+        for child in self.elements(envelope):
+            corners[localname(child)] = child.text.strip()
+        if corners.has_key('coordinates'):
+            # GML 2 gml:Box
+            lower, upper = [corner.split(',') for corner in corners['coordinates'].split()]
+        else:
+            lower, upper = corners['lowerCorner'].split(), corners['upperCorner'].split()
+        minx, miny = map(float, lower[:2])
+        maxx, maxy = map(float, upper[:2])
+
+        srs = int(self.datasource.srid)
+        match = self.srs_number.search(envelope.get('srsName') or '')
+        if match:
+            srs = int(match.group(1))
+
+        if self.dialect == 'SQLite':
+            return "(t.xmin < %s AND t.xmax > %s AND t.ymin < %s AND t.ymax > %s)" % (self.bind(maxx), self.bind(minx), self.bind(maxy), self.bind(miny))
+
+        box = ", ".join([self.bind(value) for value in (minx, miny, maxx, maxy, srs)])
+        if self.dialect == 'SpatialLite':
+            envelope = "BuildMBR(%s)" % box
+            if srs != int(self.datasource.srid):
+                envelope = "Transform(%s, %d)" % (envelope, int(self.datasource.srid))
+            return "Intersects(%s, %s)" % (envelope, self.column(self.datasource.geom_col))
+        envelope = "ST_MakeEnvelope(%s)" % box
+        if srs != int(self.datasource.srid):
+            envelope = "ST_Transform(%s, %d)" % (envelope, int(self.datasource.srid))
+        return "ST_Intersects(%s, %s)" % (self.column(self.datasource.geom_col), envelope)
+
+    def compileDistance(self, node, name):
+        distance = None
+        for child in self.elements(node):
+            if localname(child) == 'Distance':
+                distance = self.bind(float(child.text))
+        if distance is None or self.dialect == 'SQLite':
+            raise OperationNotSupportedException(name, locator='FilterEncoding', layer=self.datasource.name)
+
+        column = self.column(self.geometryProperty(node))
+        if self.dialect == 'SpatialLite':
+            return "Distance(%s, %s) %s %s" % (column, self.geometry(node), name == 'DWithin' and '<=' or '>', distance)
+        sql = "ST_DWithin(%s, %s, %s)" % (column, self.geometry(node), distance)
+        if name == 'Beyond':
+            return "NOT " + sql
+        return sql
+
+    def predicate(self, name, operator, value = None):
+        """SQL comparing the property name to an already bound value. Unary
+           operators (IS NULL) pass no value."""
+        if self.dialect == 'SQLite':
+            # properties live in the key/value table of the layer
+            exists = "EXISTS (SELECT 1 FROM \"%s_attrs\" a WHERE a.feature_id = t.feature_id AND a.key = %s" % (self.datasource.table, self.bind(name))
+            if value is None:
+                return "NOT " + exists + ")"
+            return "%s AND a.value %s %s)" % (exists, operator, value)
+
+        if self.hstore:
+            if operator == '=':
+                return "\"%s\" @> hstore(%s,%s)" % (self.datasource.hstoreAttribute, self.bind(name), value)
+            target = "hstore(\"%s\")->%s" % (self.datasource.hstoreAttribute, self.bind(name))
+            if name == 'ele' and operator in ('<', '>', '<=', '>='):
+                target = "cast(regexp_replace(%s, '[^0-9\.]', '', 'g') as real)" % target
+        else:
+            target = self.column(name)
+
+        if value is None:
+            return "%s %s" % (target, operator)
+        return "%s %s %s" % (target, operator, value)
+
+    def bind(self, value):
+        name = "%s%d" % (self.prefix, len(self.params))
+        self.params[name] = value
+        return self.placeholders[self.dialect] % name
+
+    def column(self, name):
+        return "\"%s\"" % name.replace('"', '""')
+
+    def elements(self, node):
+        return [child for child in node.iterchildren() if isinstance(child.tag, basestring)]
+
+    def child(self, node, *names):
+        for name in names:
+            for child in self.elements(node):
+                if localname(child) == name:
+                    return child
+        return None
+
+    def property(self, node):
+        child = self.child(node, 'ValueReference', 'PropertyName')
+        if child is None or not child.text:
+            raise OperationNotSupportedException(localname(node), locator='FilterEncoding', layer=self.datasource.name)
+        return child.text.strip()
+
+    def geometryProperty(self, node):
+        child = self.child(node, 'ValueReference', 'PropertyName')
+        if child is None or not child.text:
+            return self.datasource.geom_col
+        return child.text.strip()
+
+    def literal(self, node):
+        child = self.child(node, 'Literal')
+        if child is None or child.text is None:
+            return ''
+        return child.text
+
+    def boundary(self, node, name):
+        child = self.child(node, name)
+        if child is None:
+            return ''
+        literal = self.child(child, 'Literal')
+        if literal is not None:
+            child = literal
+        return child.text or ''
+
+    def attribute(self, node, name, default):
+        value = node.get(name, default)
+        # FilterEncoding escapes regex characters for the stylesheets
+        if len(value) == 2 and value[0] == '\\':
+            value = value[1]
+        return value
+
+    def geometry(self, node):
+        """Binds the GML geometry of a spatial operator, either wrapped in
+           a Literal (FE 2.0) or given directly (FE 1.x)."""
+        geometry = None
+        literal = self.child(node, 'Literal')
+        if literal is not None:
+            children = self.elements(literal)
+            if len(children) > 0:
+                geometry = children[0]
+        else:
+            for child in self.elements(node):
+                if localname(child) not in ('ValueReference', 'PropertyName', 'Distance'):
+                    geometry = child
+                    break
+        if geometry is None:
+            raise OperationNotSupportedException(localname(node), locator='FilterEncoding', layer=self.datasource.name)
+
+        function = self.dialect == 'PostGIS' and 'ST_GeomFromGML' or 'GeomFromGML'
+        return "%s(%s)" % (function, self.bind(etree.tostring(geometry)))
+
+    def escapeLike(self, char):
+        if char in ('%', '_', '\\'):
+            return '\\' + char
+        return char
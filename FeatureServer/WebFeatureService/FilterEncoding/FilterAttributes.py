@@ -4,8 +4,7 @@ Created on Nov 3, 2012
 @author: michel
 '''
 
-import os
-from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 
 class FilterAttributes(object):
     
@@ -15,8 +14,7 @@ class FilterAttributes(object):
         self.node = node
     
     def render(self):
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../resources/filterencoding/filter_attributes.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("filterencoding/filter_attributes.xsl")
         result = transform(self.node)
         
         elements = result.xpath("//Attributes")
@@ -19,6 +19,13 @@ class FilterEncoding (object):
     
     def __init__(self, xml):
         self.parser = objectify.makeparser(remove_blank_text=True, ns_clean=True)
+        if not isinstance(xml, basestring):
+            # an element of an already parsed request
+            self.dom = xml
+            self.escape(self.dom)
+            self.xml = None
+            return
+        
         xml = xml.replace('wildCard="*"', 'wildCard="\*"')
         xml = xml.replace('wildCard="?"', 'wildCard="\?"')
         xml = xml.replace('wildCard="."', 'wildCard="\."')
@@ -40,6 +47,16 @@ class FilterEncoding (object):
         
         self.dom = etree.XML(self.xml, parser=self.parser)
     
+    def escape(self, node):
+        '''
+        Escapes the regex characters of the PropertyIsLike attributes for
+        the stylesheets, like the replacements on the text do
+        '''
+        for element in node.iter(tag=etree.Element):
+            for attribute in ('wildCard', 'singleChar', 'escapeChar'):
+                if element.get(attribute) in ('*', '?', '.'):
+                    element.set(attribute, '\\' + element.get(attribute))
+    
     def parse(self, node = None, operator = None):
         if node == None:
             node = self.dom
@@ -103,6 +120,12 @@ class FilterEncoding (object):
         if node.type != 'LogicalOperator':
             node.createStatement(datasource)
 
+    def compile(self, datasource):
+        """Compiles the filter to SQL without the XSLT stylesheets.
+           Returns a (sql, params) tuple, see Compiler."""
+        from Compiler import Compiler
+        return Compiler(datasource).compile(self.dom)
+
     def getAttributes(self):
         from FilterAttributes import FilterAttributes
         filter = FilterAttributes(self.dom)
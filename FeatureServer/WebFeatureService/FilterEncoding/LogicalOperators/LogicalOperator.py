@@ -3,8 +3,8 @@ Created on Apr 20, 2011
 
 @author: michel
 '''
-import os
 from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 from FeatureServer.WebFeatureService.FilterEncoding.Operator import Operator
 
 class LogicalOperator(Operator):
@@ -15,8 +15,7 @@ class LogicalOperator(Operator):
     def createStatement(self, datasource, operatorList):
         logical = self.addOperators(operatorList)
                 
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../../resources/filterencoding/logical_operators.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("filterencoding/logical_operators.xsl")
         result = transform(logical, datasource="'"+datasource.type+"'", operationType="'"+str(self.node.xpath('local-name()'))+"'")
         elements = result.xpath("//Statement")
         if len(elements) > 0:
@@ -3,8 +3,7 @@ Created on Apr 20, 2011
 
 @author: michel
 '''
-import os
-from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 from FeatureServer.WebFeatureService.FilterEncoding.Operator import Operator
 
 class ObjectIdentifier(Operator):
@@ -14,8 +13,7 @@ class ObjectIdentifier(Operator):
     
     def getResourceId(self): return str(self.node.attrib('rid'))
     def createStatement(self, datasource):
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../../resources/filterencoding/object_identifiers.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("filterencoding/object_identifiers.xsl")
         result = transform(self.node, datasource="'"+datasource.type+"'", operationType="'"+str(self.node.xpath('local-name()'))+"'", attributeIdName="'"+datasource.fid_col+"'")
         elements = result.xpath("//Statement")
         if len(elements) > 0:
@@ -4,6 +4,7 @@ Created on Dec 10, 2011
 @author: michel
 '''
 from FeatureServer.WebFeatureService.FilterEncoding.FilterEncoding import FilterEncoding
+from FeatureServer.WebFeatureService.FilterEncoding.Compiler import Compiler
 
 class Select(object):
     
@@ -18,6 +19,9 @@ class Select(object):
     def render(self, datasource):
         return self.filter.render(datasource)
 
+    def compile(self, datasource):
+        return Compiler(datasource).compile(self.filter.dom)
+
     def getAttributes(self):
         return self.filter.getAttributes()
         
@@ -3,8 +3,8 @@ Created on Apr 5, 2011
 
 @author: michel
 '''
-import os
 from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 from FeatureServer.WebFeatureService.FilterEncoding.Operator import Operator
 
 class SpatialOperator(Operator):
@@ -15,8 +15,7 @@ class SpatialOperator(Operator):
     def getValueReference(self): return str(self.node.ValueReference)
     def getLiteral(self): return str(self.node.Literal)
     def createStatement(self, datasource):
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../../resources/filterencoding/spatial_operators.xsl")
-        transform = etree.XSLT(xslt_input=xslt)
+        transform = Stylesheets.getTransform("filterencoding/spatial_operators.xsl")
         result = transform(self.node, datasource="'"+datasource.type+"'", operationType="'"+str(self.node.xpath('local-name()'))+"'", geometryName="'"+datasource.geom_col+"'", srs="'"+str(datasource.srid)+"'")
         
         stmtTxt = ''
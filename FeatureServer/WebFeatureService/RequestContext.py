@@ -0,0 +1,49 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import StringIO
+from lxml import etree
+from lxml import objectify
+
+class RequestContext(object):
+    '''
+    Body of a POST request, parsed as XML at most once and shared by the
+    server, the services, WFSRequest, Transaction and FilterEncoding.
+    '''
+    data    = ""
+    
+    def __init__(self, data):
+        self.data = data
+        self.parsed = False
+        self.dom = None
+        self.root = None
+    
+    def getDOM(self):
+        '''
+        Returns the root element of the body, or None if it is not XML
+        '''
+        if not self.parsed:
+            self.parsed = True
+            try:
+                parser = objectify.makeparser(remove_blank_text=True, ns_clean=True)
+                self.dom = etree.XML(self.data, parser=parser)
+            except (etree.XMLSyntaxError, ValueError):
+                self.dom = None
+        return self.dom
+    
+    def getRoot(self):
+        '''
+        Returns the root element with its attributes, or None if the body is
+        not XML. Unless the DOM is already there only the start tag is read.
+        '''
+        if self.parsed:
+            return self.dom
+        if self.root is None:
+            try:
+                for event, element in etree.iterparse(StringIO.StringIO(self.data), events=('start',)):
+                    self.root = element
+                    break
+            except (etree.XMLSyntaxError, ValueError):
+                self.parsed = True
+        return self.root
@@ -19,6 +19,12 @@ class TransactionResponse(object):
     deleteResults = []
     version = '2.0.0'
     
+    def __init__(self):
+        self.insertResults = []
+        self.updateResults = []
+        self.replaceResults = []
+        self.deleteResults = []
+    
     def setSummary(self, summary):
         self.summary = summary
     
@@ -0,0 +1,62 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import time
+import threading
+from lxml import etree
+
+resources = os.path.normpath(os.path.dirname(os.path.abspath(__file__))+"/../../resources")
+
+class Stylesheets(object):
+    """Process-wide registry of compiled XSLT transforms. Each stylesheet
+       is parsed and compiled on first use and kept until its file changes
+       on disk. The modification time is checked at most once every
+       check_interval seconds."""
+
+    def __init__(self, root, check_interval = 1.0):
+        self.root           = root
+        self.check_interval = check_interval
+        self.transforms     = {} # path -> [transform, mtime, last check]
+        self.lock           = threading.Lock()
+
+    def getTransform(self, name):
+        """Returns the compiled transform for name, a path relative to the
+           resources directory, e.g. 'filterencoding/comparison_operators.xsl'."""
+        entry = self.transforms.get(name)
+        now = time.time()
+        if entry is not None:
+            if now - entry[2] < self.check_interval:
+                return entry[0]
+            entry[2] = now
+            if os.stat(self.getPath(name)).st_mtime == entry[1]:
+                return entry[0]
+
+        self.lock.acquire()
+        try:
+            path = self.getPath(name)
+            mtime = os.stat(path).st_mtime
+            entry = self.transforms.get(name)
+            if entry is None or entry[1] != mtime:
+                entry = [etree.XSLT(etree.parse(path)), mtime, now]
+                self.transforms[name] = entry
+            return entry[0]
+        finally:
+            self.lock.release()
+
+    def getPath(self, name):
+        return os.path.join(self.root, name)
+
+    def clear(self):
+        self.lock.acquire()
+        try:
+            self.transforms = {}
+        finally:
+            self.lock.release()
+
+
+stylesheets = Stylesheets(resources)
+
+def getTransform(name):
+    return stylesheets.getTransform(name)
@@ -3,9 +3,8 @@ Created on Oct 16, 2011
 
 @author: michel
 '''
-import os
 from FeatureServer.WebFeatureService.Transaction.TransactionAction import TransactionAction
-from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 import re
 
 class Delete(TransactionAction):
@@ -15,8 +14,7 @@ class Delete(TransactionAction):
         self.type = 'delete'
         
     def createStatement(self, datasource):
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../resources/transaction/transactions.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("transaction/transactions.xsl")
         
         result = transform(self.node,
                            datasource="'"+datasource.type+"'",
@@ -6,6 +6,7 @@ Created on Oct 16, 2011
 import os, re
 from FeatureServer.WebFeatureService.Transaction.TransactionAction import TransactionAction
 from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 
 class Insert(TransactionAction):
     
@@ -17,10 +18,9 @@ class Insert(TransactionAction):
     def createStatement(self, datasource):
         self.removeAdditionalColumns(datasource)
         
-        geom = self.node.xpath("//*[local-name() = '"+datasource.geom_col+"']/*")
+        geom = self.node.xpath(".//*[local-name() = '"+datasource.geom_col+"']/*")
         geomData = etree.tostring(geom[0], pretty_print=True)
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../resources/transaction/transactions.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("transaction/transactions.xsl")
         
         result = transform(self.node,
                            datasource="'"+datasource.type+"'",
@@ -5,9 +5,9 @@ Created on Oct 16, 2011
 '''
 import os
 import sys
+import StringIO
 from lxml import etree
 from lxml import objectify
-from copy import deepcopy
 from FeatureServer.WebFeatureService.Transaction.TransactionAction import TransactionAction
 
 class Transaction(object):
@@ -20,9 +20,14 @@ class Transaction(object):
         return self.tree
 
     def parse(self, xml):
-        self.parser = objectify.makeparser(remove_blank_text=True, ns_clean=True)
-        
-        self.dom = etree.XML(xml, parser=self.parser)
+        '''
+        Parses a Transaction document, either its text or its root element
+        '''
+        if isinstance(xml, basestring):
+            self.parser = objectify.makeparser(remove_blank_text=True, ns_clean=True)
+            self.dom = etree.XML(xml, parser=self.parser)
+        else:
+            self.dom = xml
         self.parseDOM()
         
     def parseDOM(self, node = None, transaction = None):
@@ -38,15 +43,43 @@ class Transaction(object):
         for trans in node.iterchildren():
             if str(trans.xpath('local-name()')) == 'Insert':
                 for child in trans.iterchildren():
-                    transaction_class = self.getTransactionInstance(str(trans.xpath('local-name()')), deepcopy(child))
+                    transaction_class = self.getTransactionInstance(str(trans.xpath('local-name()')), child)
                     transaction.appendChild(transaction_class)
             elif str(trans.xpath('local-name()')) == 'Update' or str(trans.xpath('local-name()')) == 'Delete':
-                transaction_class = self.getTransactionInstance(str(trans.xpath('local-name()')), deepcopy(trans))
+                transaction_class = self.getTransactionInstance(str(trans.xpath('local-name()')), trans)
                 transaction.appendChild(transaction_class)
             
                     
         self.tree = transaction
             
+    def iterparse(self, xml):
+        '''
+        Yields the transaction of every Insert feature, Update and Delete
+        element as soon as it is read, without building the document. The
+        elements of a transaction are removed once the next one is asked
+        for, so a bulk insert is never held in memory as a whole.
+        '''
+        depth = 0
+        elements = etree.iterparse(StringIO.StringIO(xml), events=('start', 'end'), remove_blank_text=True)
+        # objectify elements, as parse() creates them
+        elements.set_element_class_lookup(objectify.ObjectifyElementClassLookup())
+        for event, element in elements:
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            name = etree.QName(element).localname
+            if depth == 2 and etree.QName(element.getparent()).localname == 'Insert':
+                yield self.getTransactionInstance('Insert', element)
+            elif depth == 1 and name in ('Update', 'Delete'):
+                yield self.getTransactionInstance(name, element)
+            elif depth != 1:
+                continue
+            # the transaction has been executed, drop the elements read so far
+            element.clear()
+            while element.getprevious() is not None:
+                element.getparent().remove(element.getprevious())
+
     def getTransactionInstance(self, transaction, node):
         try:
             sys.path.append(os.path.dirname(os.path.abspath(__file__)))
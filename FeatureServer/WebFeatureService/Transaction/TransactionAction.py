@@ -64,7 +64,7 @@ class TransactionAction(object):
                 if matches:
                     name = matches.group(0)
                 
-                nodes = self.node.xpath("//*[local-name()='"+name+"']")
+                nodes = self.node.xpath(".//*[local-name()='"+name+"']")
                 if len(nodes) > 0:
                     for node in nodes:
                         self.node.remove(node)
@@ -3,9 +3,9 @@ Created on Oct 16, 2011
 
 @author: michel
 '''
-import os
 from FeatureServer.WebFeatureService.Transaction.TransactionAction import TransactionAction
 from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
 import re
 
 class Update(TransactionAction):
@@ -17,12 +17,11 @@ class Update(TransactionAction):
     def createStatement(self, datasource):
         self.removeAdditionalColumns(datasource)
         
-        geom = self.node.xpath("//*[local-name() = 'Name' and text()='"+datasource.geom_col+"']/following-sibling::*[1]/*")
+        geom = self.node.xpath(".//*[local-name() = 'Name' and text()='"+datasource.geom_col+"']/following-sibling::*[1]/*")
         geomData = ''
         if len(geom) > 0:
             geomData = etree.tostring(geom[0], pretty_print=True)
-        xslt = etree.parse(os.path.dirname(os.path.abspath(__file__))+"/../../../resources/transaction/transactions.xsl")
-        transform = etree.XSLT(xslt)
+        transform = Stylesheets.getTransform("transaction/transactions.xsl")
         
         result = transform(self.node,
                            datasource="'"+datasource.type+"'",
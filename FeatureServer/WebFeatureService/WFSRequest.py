@@ -6,9 +6,9 @@ Created on Dec 10, 2011
 from lxml import etree
 from lxml import objectify
 from FeatureServer.WebFeatureService.FilterEncoding.FilterEncoding import FilterEncoding
+from FeatureServer.WebFeatureService.FilterEncoding.Compiler import Compiler
 from FeatureServer.WebFeatureService.Transaction.Transaction import Transaction
 from FeatureServer.WebFeatureService.FilterEncoding.Select import Select
-from copy import deepcopy
 
 class WFSRequest(object):
     dom     = None
@@ -18,8 +18,11 @@ class WFSRequest(object):
     transaction = None
     filter = None
     
-    def __init__(self):
+    def __init__(self, context = None, stream = False):
         self.parser = objectify.makeparser(remove_blank_text=True, ns_clean=True)
+        self.context = context
+        self.stream = stream
+        self.streamed = False
 
     def parse(self, data):
         self.data = data
@@ -28,6 +31,16 @@ class WFSRequest(object):
         #self.data = self.data.replace('singleChar="*"', 'singleChar="\*"')
         #self.data = self.data.replace('singleChar="?"', 'singleChar="\?"')
 
+        if self.context is not None and self.context.data is data:
+            root = self.context.getRoot()
+            if self.stream and root is not None and etree.QName(root).localname == 'Transaction':
+                # parsed while the transactions are executed, see getActions
+                self.streamed = True
+                return
+            # the POSTed body, already parsed by the server
+            self.dom = self.context.getDOM()
+            return
+        
         try:
             self.dom = etree.XML(self.data, parser=self.parser)
         except Exception as e:
@@ -41,28 +54,47 @@ class WFSRequest(object):
         query = self.dom.xpath("//*[local-name() = 'Query']")
         if len(query) > 0:
             #query - return a dummy select object
-            self.filter = FilterEncoding(deepcopy(query[0]).getchildren()[0])
+            self.filter = FilterEncoding(query[0].getchildren()[0])
         else:
             self.filter = FilterEncoding(self.data)
 
         self.filter.parse()
         return self.filter.render(datasource)
     
+    def compile(self, datasource):
+        '''
+        Compiles a FilterEncoding to SQL and its bind parameters
+        without the XSLT stylesheets
+        '''
+        if self.dom is None:
+            # e.g. undeclared gml prefix, FilterEncoding adds the namespaces
+            return FilterEncoding(self.data).compile(datasource)
+        
+        query = self.dom.xpath("//*[local-name() = 'Query']")
+        if len(query) > 0:
+            return Compiler(datasource).compile(query[0].getchildren()[0])
+        return Compiler(datasource).compile(self.dom)
+    
     def getActions(self):
         '''
-        Returns all WFS-T transactions
+        Returns all WFS-T transactions, as a generator if the document is
+        streamed
         '''
+        if self.streamed:
+            self.transaction = Transaction()
+            return self.transaction.iterparse(self.data)
+        
         if self.dom is None:
             return None
         
         query = self.dom.xpath("//*[local-name() = 'Query']")
         if len(query) > 0:
             #query - return a dummy select object
-            return [Select(etree.tostring(deepcopy(query[0]).getchildren()[0]))]
+            return [Select(query[0].getchildren()[0])]
         else:
             # returning all transaction objects in a array 
             self.transaction = Transaction()
-            self.transaction.parse(self.data)
+            self.transaction.parse(self.dom)
             return self.transaction.getActions()
         
         return None
@@ -0,0 +1,75 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import time
+import unittest
+from FeatureServer.Cache.Memory import Memory
+
+class MemoryTestCase(unittest.TestCase):
+
+    def response(self, size):
+        return ('application/json', 'x' * size, {}, 'utf-8')
+
+    def testGetSet(self):
+        cache = Memory()
+        self.assertEqual(None, cache.get('a'))
+        cache.set('a', 'points', 0, self.response(3), 60)
+        self.assertEqual(self.response(3), cache.get('a'))
+        self.assertEqual({'entries': 1, 'bytes': 3, 'hits': 1, 'misses': 1}, cache.stats())
+
+    def testSignature(self):
+        cache = Memory()
+        self.assertEqual(cache.signature('points', 'GeoJSON', '', '/points/all', {'bbox': '1,2,3,4', 'maxfeatures': '10'}),
+                         cache.signature('points', 'GeoJSON', '', '/points/all', {'maxfeatures': '10', 'bbox': '1,2,3,4'}))
+        self.assertNotEqual(cache.signature('points', 'GeoJSON', '', '/points/all', {'maxfeatures': '10'}),
+                            cache.signature('points', 'KML', '', '/points/all', {'maxfeatures': '10'}))
+
+    def testLeastRecentlyUsed(self):
+        cache = Memory(size = 10)
+        cache.set('a', 'points', 0, self.response(4), 60)
+        cache.set('b', 'points', 0, self.response(4), 60)
+        cache.get('a')
+        cache.set('c', 'points', 0, self.response(4), 60)
+        self.assertEqual(None, cache.get('b'))
+        self.assertNotEqual(None, cache.get('a'))
+        self.assertNotEqual(None, cache.get('c'))
+        self.assertEqual(8, cache.bytes)
+
+    def testMaxEntry(self):
+        cache = Memory(size = 100, max_entry = 5)
+        cache.set('a', 'points', 0, self.response(6), 60)
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual(0, cache.bytes)
+
+    def testExpired(self):
+        cache = Memory()
+        cache.set('a', 'points', 0, self.response(3), -1)
+        self.assertEqual(None, cache.get('a'))
+        self.assertEqual(0, cache.bytes)
+
+    def testInvalidate(self):
+        cache = Memory()
+        cache.set('a', 'points', 0, self.response(3), 60)
+        cache.set('b', 'lines', 0, self.response(3), 60)
+        generation = cache.generation('points')
+        cache.invalidate('points')
+        self.assertEqual(None, cache.get('a'))
+        self.assertNotEqual(None, cache.get('b'))
+        self.assertEqual(3, cache.bytes)
+
+        # responses read before the invalidation are not stored
+        cache.set('a', 'points', generation, self.response(3), 60)
+        self.assertEqual(None, cache.get('a'))
+        cache.set('a', 'points', cache.generation('points'), self.response(3), 60)
+        self.assertNotEqual(None, cache.get('a'))
+
+    def testEntityTags(self):
+        # the counters are per process, ETags have to be enabled
+        self.assertFalse(Memory().conditional)
+        self.assertTrue(Memory(conditional = 'true').conditional)
+        # and a restarted process does not repeat the ETags of the last one
+        self.assertNotEqual(Memory().entityTag('a', 0), Memory().entityTag('a', 0))
+
+if __name__ == "__main__":
+    unittest.main()
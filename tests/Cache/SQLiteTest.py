@@ -0,0 +1,103 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import time
+import shutil
+import multiprocessing
+import tempfile
+import unittest
+from FeatureServer.Cache.SQLite import SQLite
+
+class SQLiteTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def response(self, data):
+        return ('application/json', data, {'Access-Control-Allow-Origin': '*'}, 'utf-8')
+
+    def testGetSet(self):
+        cache = SQLite(self.file)
+        self.assertEqual(None, cache.get('a'))
+        cache.set('a', 'points', 0, self.response(u'{"caf\xe9": 1}'), 60)
+        cache.set('b', 'points', 0, self.response('\x1f\x8b binary'), 60)
+        self.assertEqual(self.response(u'{"caf\xe9": 1}'), cache.get('a'))
+        self.assertEqual(self.response('\x1f\x8b binary'), cache.get('b'))
+        self.assertTrue(isinstance(cache.get('b')[1], str))
+
+    def testSharedBetweenWorkers(self):
+        first = SQLite(self.file)
+        second = SQLite(self.file)
+        first.set('a', 'points', first.generation('points'), self.response('data'), 60)
+        self.assertEqual('data', second.get('a')[1])
+
+        generation = first.generation('points')
+        second.invalidate('points')
+        self.assertEqual(None, first.get('a'))
+        self.assertEqual(generation + 1, first.generation('points'))
+
+        # a response read before the invalidation is not stored
+        first.set('a', 'points', generation, self.response('old'), 60)
+        self.assertEqual(None, second.get('a'))
+
+    def testEntityTags(self):
+        first = SQLite(self.file)
+        self.assertTrue(first.conditional)
+        self.assertEqual(first.entityTag('a', 0), SQLite(self.file).entityTag('a', 0))
+        # counters of a new file start at 0 again
+        self.assertNotEqual(first.entityTag('a', 0), SQLite(os.path.join(self.dir, 'new.db')).entityTag('a', 0))
+
+    def testEviction(self):
+        cache = SQLite(self.file, size = 10, touch_interval = 0)
+        cache.set('a', 'points', 0, self.response('x' * 4), 60)
+        cache.set('b', 'points', 0, self.response('x' * 4), 60)
+        cache.get('a')
+        cache.set('c', 'points', 0, self.response('x' * 4), 60)
+        self.assertEqual(None, cache.get('b'))
+        self.assertNotEqual(None, cache.get('a'))
+        self.assertNotEqual(None, cache.get('c'))
+        self.assertEqual({'entries': 2, 'bytes': 8}, cache.stats())
+
+    def testExpired(self):
+        cache = SQLite(self.file)
+        cache.set('a', 'points', 0, self.response('data'), -1)
+        self.assertEqual(None, cache.get('a'))
+
+def lead_in_worker(file, started):
+    cache = SQLite(file)
+    cache.lead('a')
+    started.set()
+    time.sleep(0.3)
+    cache.set('a', 'points', 0, ('text/plain', 'shared', {}, ''), 60)
+    cache.land('a')
+
+class SQLiteFlightTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'cache.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def testAcrossProcesses(self):
+        SQLite(self.file)
+        started = multiprocessing.Event()
+        worker = multiprocessing.Process(target = lead_in_worker, args = (self.file, started))
+        worker.start()
+        started.wait(5)
+        cache = SQLite(self.file)
+        self.assertFalse(cache.lead('a'))
+        self.assertEqual('shared', cache.get('a')[1])
+        worker.join()
+        self.assertTrue(cache.lead('a'))
+        cache.land('a')
+
+if __name__ == "__main__":
+    unittest.main()
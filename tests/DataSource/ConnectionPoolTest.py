@@ -0,0 +1,88 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import warnings
+from FeatureServer.DataSource import ConnectionPool as ConnectionPoolModule
+from FeatureServer.DataSource.ConnectionPool import ConnectionPool, PoolExhaustedException
+
+class DummyCursor(object):
+    def __init__(self, connection):
+        self.connection = connection
+    def execute(self, sql, params = None):
+        if self.connection.broken:
+            raise Exception("server closed the connection unexpectedly")
+    def fetchone(self):
+        return (1,)
+
+class DummyConnection(object):
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.rollbacks = 0
+    def cursor(self):
+        return DummyCursor(self)
+    def rollback(self):
+        self.rollbacks += 1
+    def close(self):
+        self.closed = 1
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ConnectionPool(DummyConnection, minconn = 1, maxconn = 2, idle_timeout = 300, check_interval = 0, wait_timeout = 0.1)
+
+    def tearDown(self):
+        self.pool.closeall()
+        self.pool = None
+
+    def testReuse(self):
+        self.pool.check_interval = 300
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+        self.assertTrue(conn is self.pool.getconn())
+        self.assertEqual(1, self.pool.stats()['created'])
+        self.assertEqual(2, self.pool.stats()['checkouts'])
+        self.assertEqual(1, conn.rollbacks)
+
+    def testMaxSize(self):
+        self.pool.getconn()
+        self.pool.getconn()
+        self.assertRaises(PoolExhaustedException, self.pool.getconn)
+        self.assertEqual(2, self.pool.stats()['used'])
+
+    def testHealthCheck(self):
+        conn = self.pool.getconn()
+        self.pool.putconn(conn)
+        conn.broken = True
+        other = self.pool.getconn()
+        self.assertFalse(conn is other)
+        self.assertEqual(1, conn.closed)
+        self.assertEqual(1, self.pool.stats()['failed_checks'])
+
+    def testIdleReaping(self):
+        self.pool.idle_timeout = 0
+        first = self.pool.getconn()
+        second = self.pool.getconn()
+        self.pool.putconn(first)
+        self.pool.putconn(second)
+        stats = self.pool.stats()
+        self.assertEqual(1, stats['idle'])
+        self.assertEqual(1, stats['closed'])
+
+    def testConflictingSettings(self):
+        first = ConnectionPoolModule.getPool('conflict-test', DummyConnection, maxconn = 5, idle_timeout = 60)
+        try:
+            with warnings.catch_warnings(record = True) as caught:
+                warnings.simplefilter('always')
+                self.assertTrue(first is ConnectionPoolModule.getPool('conflict-test', DummyConnection, maxconn = '5', idle_timeout = '60'))
+                self.assertEqual([], caught)
+                self.assertTrue(first is ConnectionPoolModule.getPool('conflict-test', DummyConnection, maxconn = 20, idle_timeout = 60))
+        finally:
+            del ConnectionPoolModule.pools['conflict-test']
+        self.assertEqual(1, len(caught))
+        self.assertTrue('maxconn=5' in str(caught[0].message))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,418 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import types
+import unittest
+import threading
+import datetime
+import decimal
+from binascii import unhexlify
+from FeatureServer.DataSource.PostGIS import PostGIS
+from FeatureServer.DataSource.VersionedPostGIS import VersionedPostGIS
+from FeatureServer.DataSource.StatementCache import StatementCache
+from FeatureServer.Service.Action import Action
+from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
+from vectorformats.Formats.GeoJSON import GeoJSON
+from vectorformats.Feature import Feature
+
+class RecordingCursor(object):
+    def __init__(self, connection, name = None):
+        self.connection = connection
+        self.name = name
+        self.description = None
+        self.itersize = 2000
+        self.rows = []
+        self.fetches = []
+    def execute(self, sql, params = None):
+        self.connection.statements.append((self.name, sql, params))
+        if self.connection.error is not None:
+            raise self.connection.error
+        self.rows = list(self.connection.rows)
+        self.description = [(column, self.connection.types.get(column)) for column in self.connection.columns]
+    def fetchone(self):
+        return self.rows.pop(0)
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+    def close(self):
+        pass
+
+class DatabaseError(Exception):
+    def __init__(self, pgcode):
+        Exception.__init__(self, pgcode)
+        self.pgcode = pgcode
+        self.pgerror = "ERROR: %s" % pgcode
+
+class RecordingConnection(object):
+    columns = ['fs_text_geom', 'gid', 'name']
+    encoding = 'UTF8'
+    error = None
+    def __init__(self, rows, columns = None, types = None):
+        self.rows = rows
+        if columns:
+            self.columns = columns
+        self.types = types or {}
+        self.statements = []
+        self.cursors = []
+    def set_client_encoding(self, encoding):
+        self.statements.append((None, 'SET client_encoding TO %s' % encoding, None))
+        self.encoding = encoding
+    def cursor(self, name = None):
+        cursor = RecordingCursor(self, name)
+        self.cursors.append(cursor)
+        return cursor
+
+class PostGISTestCase(unittest.TestCase):
+    params = {'type': 'PostGIS',
+              'dsn' : 'host=localhost dbname=test user=test',
+              'layer' : 'points',
+              'attribute_cols' : 'name',
+              'pool' : 'false'}
+    rows = [('POINT(1 2)', 1, 'a'), ('POINT(3 4)', 2, 'b'), (None, 3, 'c'), ('POINT(5 6)', 4, 'd')]
+
+    def createDatasource(self, **kwargs):
+        params = dict(self.params)
+        params.update(kwargs)
+        datasource = PostGIS('points', **params)
+        datasource.db = RecordingConnection(self.rows)
+        return datasource
+
+    def testConnectionPerThread(self):
+        datasource = self.createDatasource()
+        datasource.db = None
+        connections = []
+        def connect():
+            connection = RecordingConnection([])
+            connection.commit = connection.close = lambda: None
+            connections.append(connection)
+            return connection
+        datasource.connect = connect
+
+        datasource.begin()
+        other = []
+        def request():
+            # a concurrent request gets a connection of its own
+            datasource.begin()
+            other.append(datasource.db)
+            datasource.commit()
+            other.append(datasource.db)
+        thread = threading.Thread(target = request)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(2, len(connections))
+        self.assertTrue(other[0] is connections[1])
+        self.assertEqual(None, other[1])
+        self.assertTrue(datasource.db is connections[0])
+
+    def testClientEncoding(self):
+        for encoding, statements in [('utf-8', []), ('latin1', ['SET client_encoding TO LATIN1']), ('cp1252', ['SET client_encoding TO WIN1252'])]:
+            datasource = self.createDatasource(encoding = encoding)
+            datasource.db = None
+            connection = RecordingConnection([])
+            datasource.connect = lambda: connection
+            datasource.begin()
+            self.assertEqual(statements, [sql for name, sql, params in connection.statements])
+            # once set it is kept
+            datasource.db = None
+            datasource.begin()
+            self.assertEqual(statements, [sql for name, sql, params in connection.statements])
+
+    def testSelect(self):
+        datasource = self.createDatasource()
+        action = Action()
+        action.method = 'select'
+        features = datasource.select(action)
+        self.assertTrue(isinstance(features, list))
+        self.assertEqual([1, 2, 4], [feature.id for feature in features])
+        self.assertEqual({'type': 'Point', 'coordinates': [1.0, 2.0]}, features[0].geometry)
+        self.assertEqual({'name': u'a'}, features[0].properties)
+
+    def testStreamingSelect(self):
+        datasource = self.createDatasource(stream='true', fetch_size='2')
+        action = Action()
+        action.method = 'select'
+        features = datasource.select(action)
+        self.assertTrue(isinstance(features, types.GeneratorType))
+        cursor = datasource.db.cursors[-1]
+        self.assertTrue(cursor.name is not None)
+        self.assertEqual([], cursor.fetches)
+        self.assertEqual([1, 2, 4], [feature.id for feature in features])
+        self.assertEqual([2, 2, 2], cursor.fetches)
+
+    def testWKBSelect(self):
+        datasource = self.createDatasource(wkb='true')
+        datasource.db = RecordingConnection([(buffer(unhexlify('0101000000000000000000F03F0000000000000040')), 1, 'a')],
+                                            ['fs_binary_geom', 'gid', 'name'])
+        action = Action()
+        action.method = 'select'
+        features = datasource.select(action)
+        self.assertTrue('ST_AsBinary(the_geom)' in datasource.db.statements[0][1])
+        self.assertEqual({'type': 'Point', 'coordinates': [1.0, 2.0]}, features[0].geometry)
+        self.assertEqual({'name': u'a'}, features[0].properties)
+
+    def testGeoJSONSelect(self):
+        datasource = self.createDatasource(geojson='true', geojson_precision='6')
+        fragment = '{"type":"Point","coordinates":[1.5,2]}'
+        datasource.db = RecordingConnection([(fragment, 1, 'a')],
+                                            ['fs_geojson_geom', 'gid', 'name'])
+        action = Action()
+        action.method = 'select'
+        action.geometry_format = 'geojson'
+        features = datasource.select(action)
+        self.assertTrue('ST_AsGeoJSON(the_geom, 6)' in datasource.db.statements[0][1])
+        result = GeoJSON().encode(features)
+        self.assertTrue(('"geometry": %s' % fragment) in result)
+        self.assertEqual({'type': 'Point', 'coordinates': [1.5, 2]},
+                         GeoJSON().decode(result)[0].geometry)
+
+    def testGeoJSONSelectOtherFormat(self):
+        datasource = self.createDatasource(geojson='true')
+        action = Action()
+        action.method = 'select'
+        features = datasource.select(action)
+        self.assertTrue('ST_AsText(' in datasource.db.statements[0][1])
+        self.assertEqual({'type': 'Point', 'coordinates': [1.0, 2.0]}, features[0].geometry)
+
+    def testBBoxSelect(self):
+        datasource = self.createDatasource(srid='26910')
+        action = Action()
+        action.method = 'select'
+        action.bbox = [1.5, 2.5, 3.5, 4.5]
+        action.maxfeatures = 10
+        datasource.select(action)
+        name, sql, params = datasource.db.statements[0]
+        self.assertTrue('ST_MakeEnvelope(%(fs_minx)s, %(fs_miny)s, %(fs_maxx)s, %(fs_maxy)s, 4326), 26910)' in sql)
+        self.assertTrue('LIMIT %(fs_limit)s' in sql)
+        self.assertFalse('1.5' in sql)
+        self.assertEqual({'fs_minx': 1.5, 'fs_miny': 2.5, 'fs_maxx': 3.5, 'fs_maxy': 4.5, 'fs_limit': 10}, params)
+
+        action.bbox = [10, 20, 30, 40]
+        action.maxfeatures = 5
+        datasource.select(action)
+        self.assertEqual(sql, datasource.db.statements[1][1])
+
+    def testTransform(self):
+        datasource = self.createDatasource(srid = '26910')
+        action = Action()
+        action.method = 'select'
+        action.bbox = [1, 2, 3, 4]
+        datasource.select(action)
+        sql = datasource.db.statements[0][1]
+        self.assertTrue(sql.startswith('SELECT ST_AsText(ST_Transform(the_geom, 4326)) as fs_text_geom'))
+        self.assertEqual(1, sql.count('ST_MakeEnvelope('))
+
+        # served in the SRID of the table, nothing is transformed
+        datasource = self.createDatasource(srid = '3857', srid_out = '3857')
+        datasource.select(action)
+        sql = datasource.db.statements[0][1]
+        self.assertFalse('ST_Transform' in sql)
+        self.assertTrue(' WHERE ST_Intersects(the_geom, ST_MakeEnvelope(%(fs_minx)s, %(fs_miny)s, %(fs_maxx)s, %(fs_maxy)s, 3857))' in sql)
+
+    def testFastBBox(self):
+        datasource = self.createDatasource(bbox_mode = 'fast')
+        action = Action()
+        action.method = 'select'
+        action.bbox = [1, 2, 3, 4]
+        datasource.select(action)
+        sql = datasource.db.statements[0][1]
+        self.assertTrue(sql.endswith(' WHERE the_geom && ST_MakeEnvelope(%(fs_minx)s, %(fs_miny)s, %(fs_maxx)s, %(fs_maxy)s, 4326)'))
+
+    def testContinuation(self):
+        datasource = self.createDatasource(order='name')
+        action = Action()
+        action.method = 'select'
+        action.maxfeatures = 2
+        features = datasource.select(action)
+        self.assertTrue(datasource.db.statements[0][1].endswith(' ORDER BY name NULLS LAST, gid LIMIT %(fs_limit)s'))
+
+        action.continuation = datasource.getContinuation(features[-1])
+        datasource.select(action)
+        name, sql, params = datasource.db.statements[1]
+        self.assertTrue(' WHERE ((name, gid) > (%(fs_seek_0)s, %(fs_seek_1)s) OR name IS NULL) ORDER BY name NULLS LAST, gid' in sql)
+        self.assertFalse('OFFSET' in sql)
+        self.assertEqual({'fs_seek_0': 'd', 'fs_seek_1': 4, 'fs_limit': 2}, params)
+
+        # the token already skips the previous pages
+        action.startfeature = 2
+        datasource.select(action)
+        self.assertFalse('OFFSET' in datasource.db.statements[2][1])
+
+    def testCount(self):
+        datasource = self.createDatasource()
+        datasource.db = RecordingConnection([(3,)], ['count'])
+        action = Action()
+        action.method = 'count'
+        action.bbox = [1, 2, 3, 4]
+        action.maxfeatures = 2
+        self.assertEqual(3, datasource.count(action))
+        name, sql, params = datasource.db.statements[0]
+        self.assertTrue(sql.startswith('SELECT count(*) FROM "points" WHERE ST_Intersects(the_geom, '))
+        self.assertFalse('LIMIT' in sql)
+        self.assertEqual({'fs_minx': 1.0, 'fs_miny': 2.0, 'fs_maxx': 3.0, 'fs_maxy': 4.0}, params)
+
+    def testSelectErrors(self):
+        action = Action()
+        action.method = 'select'
+        for error, raised in [(DatabaseError('42601'), InvalidValueException), (DatabaseError('57014'), DatabaseError),
+                              (DatabaseError(None), DatabaseError), (ValueError('no connection'), ValueError)]:
+            datasource = self.createDatasource()
+            datasource.db.error = error
+            self.assertRaises(raised, datasource.select, action)
+
+    def testEstimatedCount(self):
+        datasource = self.createDatasource(hits='estimate')
+        datasource.db = RecordingConnection([('[{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 1200}}]',)], ['QUERY PLAN'])
+        action = Action()
+        action.method = 'count'
+        self.assertEqual(1200, datasource.count(action))
+        self.assertEqual('EXPLAIN (FORMAT JSON) SELECT 1 FROM "points"', datasource.db.statements[0][1])
+
+    def testProjection(self):
+        datasource = self.createDatasource(attribute_cols = 'name, hstore(tags)->\'highway\' as "highway", hstore(tags)->\'shop\' as "shop"',
+                                           additional_cols = 'round(ST_Area2d(the_geom)) as sqm')
+        action = Action()
+        action.method = 'select'
+        action.properties = ['highway', 'missing']
+        datasource.select(action)
+        self.assertEqual('SELECT ST_AsText(the_geom) as fs_text_geom, "gid", hstore(tags)->\'highway\' as "highway" FROM "points"',
+                         datasource.db.statements[0][1])
+
+        action.properties = None
+        datasource.select(action)
+        self.assertTrue('"shop", round(ST_Area2d(the_geom)) as sqm FROM' in datasource.db.statements[1][1])
+
+    def testWithoutGeometry(self):
+        datasource = self.createDatasource(srid_out = 3857)
+        datasource.db = RecordingConnection([(1, 'a'), (3, 'c')], ['gid', 'name'])
+        action = Action()
+        action.method = 'select'
+        action.geometry = False
+        features = datasource.select(action)
+        self.assertEqual('SELECT "gid", name FROM "points"', datasource.db.statements[0][1])
+        # rows without a geometry are not dropped
+        self.assertEqual([1, 3], [feature.id for feature in features])
+        self.assertEqual([None, None], [feature.geometry for feature in features])
+        self.assertEqual({'name': 'c'}, features[1].properties)
+
+    def testPreparedSelect(self):
+        datasource = self.createDatasource(prepare='true')
+        datasource.pool = True # only pooled connections prepare statements
+        datasource.db.statement_cache = StatementCache()
+        action = Action()
+        action.method = 'select'
+        action.bbox = [1, 2, 3, 4]
+        datasource.select(action)
+        action.bbox = [5, 6, 7, 8]
+        features = datasource.select(action)
+        self.assertEqual([1, 2, 4], [feature.id for feature in features])
+
+        statements = [sql for name, sql, params in datasource.db.statements]
+        self.assertEqual('SAVEPOINT fs_prepare', statements[0])
+        self.assertTrue(statements[1].startswith('PREPARE fs_statement_1 AS SELECT'))
+        self.assertTrue('ST_MakeEnvelope($1, $2, $3, $4, 4326)' in statements[1])
+        self.assertEqual('RELEASE SAVEPOINT fs_prepare', statements[2])
+        self.assertEqual(('EXECUTE fs_statement_1 (%s, %s, %s, %s)', [5, 6, 7, 8]), datasource.db.statements[4][1:])
+        self.assertEqual(5, len(statements))
+
+    def testSelectTemplates(self):
+        datasource = self.createDatasource(ele='height', version='rev', additional_cols='a+b as c;d', filter_encoding='python')
+        self.assertEqual(['name', 'the_geom', 'gid', 'rev', 'height'], datasource.getColumns())
+        action = Action()
+        action.method = 'select'
+        action.id = 1
+        datasource.select(action)
+        self.assertEqual('SELECT ST_AsText(the_geom) as fs_text_geom, height as ele, rev as version, "gid", name, a+b as c,d FROM "points" WHERE gid = %(gid)s',
+                         datasource.db.statements[0][1])
+
+        class Request(object):
+            def getAttributes(self):
+                return ['name', 'height', 'kind']
+            def compile(self, datasource):
+                return ('"kind" = %(fe0)s', {'fe0': 'x'})
+        action = Action()
+        action.method = 'select'
+        action.wfsrequest = Request()
+        datasource.select(action)
+        self.assertEqual('SELECT ST_AsText(the_geom) as fs_text_geom, height as ele, rev as version, "gid", name, kind, a+b as c,d FROM "points" WHERE "kind" = %(fe0)s',
+                         datasource.db.statements[1][1])
+
+    def testFilterEncoding(self):
+        class Request(object):
+            def getAttributes(self):
+                return ['name']
+            def compile(self, datasource):
+                return ('"name" = %(fe0)s', {'fe0': 'x'})
+            def render(self, datasource):
+                return '"name" = \'x\''
+        for options, sql, params in [({}, 'WHERE "name" = \'x\'', {}),
+                                     ({'filter_encoding': 'xslt'}, 'WHERE "name" = \'x\'', {}),
+                                     ({'filter_encoding': 'python'}, 'WHERE "name" = %(fe0)s', {'fe0': 'x'})]:
+            datasource = self.createDatasource(**options)
+            action = Action()
+            action.method = 'select'
+            action.wfsrequest = Request()
+            datasource.select(action)
+            name, statement, statement_params = datasource.db.statements[0]
+            self.assertTrue(statement.endswith(sql))
+            self.assertEqual(params, statement_params)
+
+    def testColumnConverters(self):
+        datasource = self.createDatasource(attribute_cols='*')
+        row = ('POINT(1 2)', 1, 'geometry', u'caf\xe9', 'caf\xc3\xa9', decimal.Decimal('1.50'),
+               datetime.datetime(2026, 10, 18, 12, 30), 7, None, datetime.date(2026, 1, 2))
+        datasource.db = RecordingConnection([row],
+                                            ['fs_text_geom', 'gid', 'the_geom', 'name', 'raw', 'price', 'created', 'count', 'missing', 'day'],
+                                            {'gid': 23, 'name': 25, 'price': 1700, 'created': 1114, 'count': 23, 'missing': 1043})
+        action = Action()
+        action.method = 'select'
+        features = datasource.select(action)
+        self.assertEqual(1, features[0].id)
+        self.assertEqual({'name': u'caf\xe9', 'raw': u'caf\xe9', 'price': u'1.50', 'created': '2026-10-18 12:30:00',
+                          'count': 7, 'missing': None, 'day': '2026-01-02'}, features[0].properties)
+        self.assertTrue(isinstance(features[0].properties['raw'], unicode))
+
+        geometry, fid, properties = datasource.row_reader(datasource.db.cursors[-1].description)
+        self.assertEqual(('fs_text_geom', 0), geometry)
+        self.assertEqual(1, fid)
+        self.assertEqual(None, dict([(name, converter) for name, index, converter in properties])['count'])
+
+    def testInsertMany(self):
+        datasource = self.createDatasource()
+        datasource.db = RecordingConnection([(1, 12), (0, 11)], ['ordinal', 'gid'])
+        actions = []
+        for name, coordinates in [('a', [1, 2]), ('b', [3, 4])]:
+            action = Action()
+            action.method = 'insert'
+            action.feature = Feature(geometry = {'type': 'Point', 'coordinates': coordinates}, props = {'name': name})
+            actions.append(action)
+        results = datasource.insert_many(actions)
+        self.assertEqual([11, 12], [result.getResourceId() for result in results])
+        self.assertEqual([11, 12], [action.id for action in actions])
+        self.assertEqual(1, len(datasource.db.statements))
+        name, sql, params = datasource.db.statements[0]
+        self.assertEqual('WITH fs_insert_0 AS (INSERT INTO "points" (name, the_geom) VALUES (%(fs_0_name)s, ST_SetSRID(%(fs_0_fs_geometry)s::geometry, 4326)) RETURNING gid), '
+                         'fs_insert_1 AS (INSERT INTO "points" (name, the_geom) VALUES (%(fs_1_name)s, ST_SetSRID(%(fs_1_fs_geometry)s::geometry, 4326)) RETURNING gid) '
+                         'SELECT 0, gid FROM fs_insert_0 UNION ALL SELECT 1, gid FROM fs_insert_1', sql)
+        self.assertEqual({'fs_0_name': 'a', 'fs_0_fs_geometry': 'POINT(1.000000 2.000000)', 'fs_1_name': 'b', 'fs_1_fs_geometry': 'POINT(3.000000 4.000000)'}, params)
+
+class VersionedPostGISTestCase(unittest.TestCase):
+    def testBegin(self):
+        datasource = VersionedPostGIS('versioned', dsn = 'host=localhost dbname=test user=test', pool = 'false', encoding = 'latin1')
+        connection = RecordingConnection([])
+        datasource.connect = lambda: connection
+        datasource.begin()
+        datasource.begin()
+        self.assertTrue(datasource.db is connection)
+        statements = [sql for name, sql, params in connection.statements]
+        self.assertEqual('SET client_encoding TO LATIN1', statements[0])
+        self.assertTrue('INSERT INTO txn' in statements[1])
+        self.assertEqual(2, len(statements))
+
+if __name__ == "__main__":
+    unittest.main()
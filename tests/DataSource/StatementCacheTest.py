@@ -0,0 +1,62 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import psycopg2
+from FeatureServer.DataSource.StatementCache import StatementCache
+
+class RecordingCursor(object):
+    def __init__(self, refuse = ()):
+        self.statements = []
+        self.refuse = refuse
+    def execute(self, sql, params = None):
+        self.statements.append((sql, params))
+        for text in self.refuse:
+            if sql.startswith('PREPARE') and text in sql:
+                raise psycopg2.ProgrammingError("could not determine data type of parameter $1")
+
+class StatementCacheTestCase(unittest.TestCase):
+
+    def testPrepareOnce(self):
+        cache = StatementCache()
+        cursor = RecordingCursor()
+        sql = "SELECT * FROM t WHERE a = %(a)s AND b LIKE 'x%%' AND c > %(b)s AND d < %(a)s"
+        cache.execute(cursor, sql, {'a': 1, 'b': 'two'})
+        cache.execute(cursor, sql, {'a': 3, 'b': 'four'})
+        self.assertEqual([('SAVEPOINT fs_prepare', None),
+                          ("PREPARE fs_statement_1 AS SELECT * FROM t WHERE a = $1 AND b LIKE 'x%' AND c > $2 AND d < $1", None),
+                          ('RELEASE SAVEPOINT fs_prepare', None),
+                          ('EXECUTE fs_statement_1 (%s, %s)', [1, 'two']),
+                          ('EXECUTE fs_statement_1 (%s, %s)', [3, 'four'])], cursor.statements)
+
+    def testWithoutParameters(self):
+        cache = StatementCache()
+        cursor = RecordingCursor()
+        cache.execute(cursor, "SELECT 1", {})
+        self.assertEqual(('EXECUTE fs_statement_1', None), cursor.statements[-1])
+
+    def testEviction(self):
+        cache = StatementCache(size = 2)
+        cursor = RecordingCursor()
+        cache.execute(cursor, "SELECT 1", {})
+        cache.execute(cursor, "SELECT 2", {})
+        cache.execute(cursor, "SELECT 1", {})
+        cache.execute(cursor, "SELECT 3", {})
+        self.assertTrue(('DEALLOCATE fs_statement_2', None) in cursor.statements)
+        self.assertEqual(["SELECT 1", "SELECT 3"], cache.statements.keys())
+
+    def testRefusedStatement(self):
+        cache = StatementCache()
+        cursor = RecordingCursor(refuse = ['$1'])
+        sql = "SELECT %(a)s"
+        cache.execute(cursor, sql, {'a': 1})
+        cache.execute(cursor, sql, {'a': 2})
+        self.assertEqual([('SAVEPOINT fs_prepare', None),
+                          ('PREPARE fs_statement_1 AS SELECT $1', None),
+                          ('ROLLBACK TO SAVEPOINT fs_prepare', None),
+                          (sql, {'a': 1}),
+                          (sql, {'a': 2})], cursor.statements)
+
+if __name__ == "__main__":
+    unittest.main()
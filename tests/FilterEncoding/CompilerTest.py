@@ -0,0 +1,162 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from psycopg2.extensions import adapt
+import FeatureServer.WebFeatureService.FilterEncoding.FilterEncoding as fe
+from FeatureServer.WebFeatureService.WFSRequest import WFSRequest
+from FeatureServer.DataSource.PostGIS import PostGIS
+from FeatureServer.DataSource.SQLite import SQLite
+from FeatureServer.Service.Action import Action
+from FeatureServer.Exceptions.WebFeatureService.OperationNotSupportedException import OperationNotSupportedException
+from vectorformats.Feature import Feature
+
+class CompilerTestCase(unittest.TestCase):
+    params = {'type': 'PostGIS',
+              'dsn' : 'host=localhost dbname=osm_pg_ch user=gisuser password=gisuser',
+              'layer' : 'planet_osm_point',
+              'fid': 'osm_id',
+              'geometry': 'way',
+              'srid' : '4326',
+              'attribute_cols' : 'name,amenity,operator,highway',
+              'pool' : 'false'}
+
+    # filters the stylesheets and the compiler both translate correctly
+    filters = [
+        "<Filter><PropertyIsEqualTo><ValueReference>highway</ValueReference><Literal>bus_stop</Literal></PropertyIsEqualTo></Filter>",
+        "<Filter><PropertyIsNotEqualTo><ValueReference>operator</ValueReference><Literal>UBS</Literal></PropertyIsNotEqualTo></Filter>",
+        "<Filter><PropertyIsLessThan><ValueReference>osm_id</ValueReference><Literal>500000</Literal></PropertyIsLessThan></Filter>",
+        "<Filter><PropertyIsGreaterThan><ValueReference>osm_id</ValueReference><Literal>500000</Literal></PropertyIsGreaterThan></Filter>",
+        "<Filter><PropertyIsLessThanOrEqualTo><PropertyName>osm_id</PropertyName><Literal>500000</Literal></PropertyIsLessThanOrEqualTo></Filter>",
+        "<Filter><PropertyIsGreaterThanOrEqualTo><ValueReference>osm_id</ValueReference><Literal>500000</Literal></PropertyIsGreaterThanOrEqualTo></Filter>",
+        "<Filter><PropertyIsBetween><ValueReference>osm_id</ValueReference><LowerBoundary><Literal>1</Literal></LowerBoundary><UpperBoundary><Literal>500000</Literal></UpperBoundary></PropertyIsBetween></Filter>",
+        '<Filter><PropertyIsLike wildCard="*" singleChar="?" escapeChar="!"><ValueReference>highway</ValueReference><Literal>b?s*stop</Literal></PropertyIsLike></Filter>',
+        "<Filter><PropertyIsNil><ValueReference>name</ValueReference></PropertyIsNil></Filter>",
+        "<Filter><Not><PropertyIsEqualTo><ValueReference>amenity</ValueReference><Literal>bench</Literal></PropertyIsEqualTo></Not></Filter>",
+        "<Filter><Or><And><PropertyIsEqualTo><ValueReference>operator</ValueReference><Literal>VBZ</Literal></PropertyIsEqualTo>" +
+            "<PropertyIsEqualTo><ValueReference>highway</ValueReference><Literal>bus_stop</Literal></PropertyIsEqualTo></And>" +
+            "<PropertyIsEqualTo><ValueReference>operator</ValueReference><Literal>BVB</Literal></PropertyIsEqualTo></Or></Filter>",
+        '<Filter><ResourceId rid="12"/></Filter>',
+        '<Filter><FeatureId fid="12"/></Filter>',
+        '<Filter><Equals><ValueReference>way</ValueReference><Literal><gml:Point srsName="EPSG:4326"><gml:coordinates>5.9,46.1</gml:coordinates></gml:Point></Literal></Equals></Filter>'
+    ]
+
+    def createDatasource(self, **kwargs):
+        params = dict(self.params)
+        params.update(kwargs)
+        return PostGIS('all', **params)
+
+    def inline(self, sql, params):
+        return sql % dict([(key, adapt(value).getquoted()) for key, value in params.items()])
+
+    def xslt(self, fil, datasource):
+        filterEncoding = fe.FilterEncoding(fil)
+        filterEncoding.parse()
+        return filterEncoding.render(datasource) % {}
+
+    def compile(self, fil, datasource):
+        return fe.FilterEncoding(fil).compile(datasource)
+
+    def testEquivalence(self):
+        datasource = self.createDatasource()
+        for fil in self.filters:
+            sql, params = self.compile(fil, datasource)
+            self.assertEqual(self.xslt(fil, datasource).replace("xmlns:regexp=\"http://exslt.org/regular-expressions\" ", ""),
+                             self.inline(sql, params))
+
+    def testHstoreEquivalence(self):
+        datasource = self.createDatasource(hstore='true', hstore_attr='tags')
+        for fil in self.filters[:6] + self.filters[7:8] + self.filters[9:11]:
+            sql, params = self.compile(fil, datasource)
+            self.assertEqual(self.xslt(fil, datasource), self.inline(sql, params))
+
+    def testBindParameters(self):
+        sql, params = self.compile("<Filter><PropertyIsEqualTo><ValueReference>name</ValueReference><Literal>O'Brien</Literal></PropertyIsEqualTo></Filter>",
+                                   self.createDatasource())
+        self.assertEqual('"name" = %(fe0)s', sql)
+        self.assertEqual({'fe0': "O'Brien"}, params)
+
+    def testLikeEscaping(self):
+        sql, params = self.compile('<Filter><PropertyIsLike wildCard="*" singleChar="?" escapeChar="!"><ValueReference>name</ValueReference><Literal>100!*_*</Literal></PropertyIsLike></Filter>',
+                                   self.createDatasource())
+        self.assertEqual('"name" LIKE %(fe0)s', sql)
+        self.assertEqual({'fe0': '100*\\_%'}, params)
+
+    def testIdentifiers(self):
+        sql, params = self.compile('<Filter><ResourceId rid="12"/><ResourceId rid="13"/></Filter>', self.createDatasource())
+        self.assertEqual('"osm_id" IN (%(fe0)s, %(fe1)s)', sql)
+        self.assertEqual({'fe0': '12', 'fe1': '13'}, params)
+
+    def testBBOX(self):
+        fil = ('<Filter><BBOX><ValueReference>way</ValueReference><gml:Envelope srsName="urn:ogc:def:crs:EPSG::21781">' +
+               '<gml:lowerCorner>5.95 45.75</gml:lowerCorner><gml:upperCorner>10.5 47.8</gml:upperCorner></gml:Envelope></BBOX></Filter>')
+        sql, params = self.compile(fil, self.createDatasource())
+        self.assertEqual('ST_Intersects("way", ST_Transform(ST_MakeEnvelope(%(fe0)s, %(fe1)s, %(fe2)s, %(fe3)s, %(fe4)s), 4326))', sql)
+        self.assertEqual({'fe0': 5.95, 'fe1': 45.75, 'fe2': 10.5, 'fe3': 47.8, 'fe4': 21781}, params)
+
+    def testBBOXInLayerSRS(self):
+        fil = ('<Filter><BBOX><ValueReference>way</ValueReference><gml:Envelope>' +
+               '<gml:lowerCorner>5.95 45.75</gml:lowerCorner><gml:upperCorner>10.5 47.8</gml:upperCorner></gml:Envelope></BBOX></Filter>')
+        sql, params = self.compile(fil, self.createDatasource())
+        self.assertEqual('ST_Intersects("way", ST_MakeEnvelope(%(fe0)s, %(fe1)s, %(fe2)s, %(fe3)s, %(fe4)s))', sql)
+        self.assertEqual(4326, params['fe4'])
+
+    def testDWithin(self):
+        fil = ('<Filter><DWithin><ValueReference>way</ValueReference><Literal><gml:Point><gml:pos>5.9 46.1</gml:pos></gml:Point></Literal>' +
+               '<Distance units="m">10</Distance></DWithin></Filter>')
+        sql, params = self.compile(fil, self.createDatasource())
+        self.assertEqual('ST_DWithin("way", ST_GeomFromGML(%(fe1)s), %(fe0)s)', sql)
+        self.assertEqual(10.0, params['fe0'])
+
+    def testSpatialLite(self):
+        datasource = self.createDatasource(type='SpatialLite')
+        sql, params = self.compile('<Filter><PropertyIsLike wildCard="*" singleChar="?" escapeChar="!"><ValueReference>name</ValueReference><Literal>B*</Literal></PropertyIsLike></Filter>', datasource)
+        self.assertEqual('"name" LIKE :fe0 ESCAPE \'\\\'', sql)
+        self.assertEqual({'fe0': 'B%'}, params)
+
+class SQLiteCompilerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.datasource = SQLite('points', file = os.path.join(self.directory, 'points.sqlite'), type = 'SQLite')
+        self.datasource.begin()
+        for name, amenity, coordinates in [('Bahnhof', 'station', [8.5, 47.3]), ('Bank', 'bank', [8.6, 47.4]), ('Bar', 'pub', [9.5, 46.3])]:
+            action = Action()
+            action.method = 'insert'
+            action.feature = Feature(geometry = {'type': 'Point', 'coordinates': coordinates}, props = {'name': name, 'amenity': amenity})
+            self.datasource.insert(action)
+        self.datasource.commit()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def select(self, fil):
+        action = Action()
+        action.method = 'select'
+        action.wfsrequest = WFSRequest()
+        action.wfsrequest.parse(fil)
+        self.datasource.begin()
+        return sorted([feature.properties['name'] for feature in self.datasource.select(action)])
+
+    def testComparison(self):
+        self.assertEqual(['Bank'], self.select("<Filter><PropertyIsEqualTo><ValueReference>amenity</ValueReference><Literal>bank</Literal></PropertyIsEqualTo></Filter>"))
+        self.assertEqual(['Bahnhof', 'Bank'], self.select('<Filter><PropertyIsLike wildCard="*" singleChar="?" escapeChar="!"><ValueReference>name</ValueReference><Literal>B?*n*</Literal></PropertyIsLike></Filter>'))
+
+    def testLogical(self):
+        self.assertEqual(['Bahnhof', 'Bar'], self.select("<Filter><Or><PropertyIsEqualTo><ValueReference>amenity</ValueReference><Literal>pub</Literal></PropertyIsEqualTo>" +
+                                                         "<PropertyIsEqualTo><ValueReference>amenity</ValueReference><Literal>station</Literal></PropertyIsEqualTo></Or></Filter>"))
+        self.assertEqual(['Bank', 'Bar'], self.select("<Filter><Not><PropertyIsEqualTo><ValueReference>amenity</ValueReference><Literal>station</Literal></PropertyIsEqualTo></Not></Filter>"))
+
+    def testBBOX(self):
+        self.assertEqual(['Bahnhof', 'Bank'], self.select('<Filter><BBOX><ValueReference>geometry</ValueReference><gml:Envelope srsName="EPSG:4326">' +
+                                                          '<gml:lowerCorner>8 47</gml:lowerCorner><gml:upperCorner>9 48</gml:upperCorner></gml:Envelope></BBOX></Filter>'))
+
+    def testUnsupported(self):
+        self.assertRaises(OperationNotSupportedException, self.select,
+                          '<Filter><Intersects><ValueReference>geometry</ValueReference><Literal><gml:Point><gml:pos>8 47</gml:pos></gml:Point></Literal></Intersects></Filter>')
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from lxml import etree
+from FeatureServer.WebFeatureService import Stylesheets
+
+stylesheet = """<xsl:stylesheet version="1.0" xmlns:xsl="http://www.w3.org/1999/XSL/Transform">
+<xsl:template match="/"><Statement>%s</Statement></xsl:template>
+</xsl:stylesheet>"""
+
+class StylesheetsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.writeStylesheet('a')
+        self.stylesheets = Stylesheets.Stylesheets(self.root, check_interval = 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def writeStylesheet(self, text, mtime = 1000000000):
+        path = os.path.join(self.root, 'test.xsl')
+        f = open(path, 'w')
+        f.write(stylesheet % text)
+        f.close()
+        os.utime(path, (mtime, mtime))
+
+    def transform(self):
+        result = self.stylesheets.getTransform('test.xsl')(etree.XML('<a/>'))
+        return str(result.xpath("//Statement")[0].text)
+
+    def testCompiledOnce(self):
+        self.assertTrue(self.stylesheets.getTransform('test.xsl') is self.stylesheets.getTransform('test.xsl'))
+        self.assertEqual('a', self.transform())
+
+    def testReloadOnChange(self):
+        self.assertEqual('a', self.transform())
+        self.writeStylesheet('b', 1000000010)
+        self.assertEqual('b', self.transform())
+
+    def testResources(self):
+        for name in ['filterencoding/comparison_operators.xsl', 'filterencoding/spatial_operators.xsl', 'transaction/transactions.xsl']:
+            self.assertTrue(Stylesheets.getTransform(name) is Stylesheets.getTransform(name))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import time
+import threading
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.Cache.Memory import Memory
+from tests.Server.ResponseCacheTest import CountingDataSource
+
+class SlowDataSource(CountingDataSource):
+    def select(self, action):
+        time.sleep(0.2)
+        return CountingDataSource.select(self, action)
+
+class FailingDataSource(CountingDataSource):
+    def select(self, action):
+        CountingDataSource.select(self, action)
+        raise Exception("no connection")
+
+class CoalescingTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = SlowDataSource('points', cache_ttl = '60')
+        self.server = Server({'points': self.datasource}, cache = Memory())
+
+    def request(self, results):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        results.append(simplejson.loads(response.getData()))
+
+    def concurrent(self, count = 5):
+        results = []
+        threads = [threading.Thread(target = self.request, args = (results,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def testCoalesced(self):
+        results = self.concurrent()
+        self.assertEqual(5, len(results))
+        self.assertEqual(1, self.datasource.selects)
+        self.assertEqual(results[0], results[-1])
+        self.assertEqual({}, self.server.cache.flights)
+
+    def testDisabled(self):
+        self.server.cache.coalesce = False
+        self.concurrent()
+        self.assertEqual(5, self.datasource.selects)
+
+    def testLandedOnError(self):
+        self.server.datasources['points'] = FailingDataSource('points', cache_ttl = '60')
+        self.assertRaises(Exception, self.server.dispatchRequest, path_info = '/points/all.geojson', params = {})
+        self.assertEqual({}, self.server.cache.flights)
+
+    def testLead(self):
+        cache = Memory(flight_timeout = 0.1)
+        self.assertTrue(cache.lead('a'))
+        self.assertFalse(cache.lead('a'))
+        cache.land('a')
+        cache.land('a')
+        self.assertTrue(cache.lead('a'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import zlib
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.Cache.Memory import Memory
+from web_request.response import StreamingResponse, negotiate_coding, compress_chunks
+from tests.Server.ResponseCacheTest import CountingDataSource
+from tests.Server.StreamingResponseTest import StreamingDataSource
+
+def decompress(data, coding):
+    if coding == 'gzip':
+        return zlib.decompress(data, 16 + zlib.MAX_WBITS)
+    return zlib.decompress(data)
+
+class CompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = CountingDataSource('points', cache_ttl = '60')
+        self.server = Server({'points': self.datasource}, {'compression': 'gzip, deflate', 'compression_min_size': '0'}, cache = Memory(conditional = 'true'))
+
+    def get(self, accept_encoding = None):
+        headers = {}
+        if accept_encoding is not None:
+            headers['Accept-Encoding'] = accept_encoding
+        return self.server.dispatchRequest(path_info = '/points/all.geojson', params = {}, request_headers = headers)
+
+    def testNegotiation(self):
+        self.assertEqual('gzip', negotiate_coding('deflate, gzip', ['gzip', 'deflate']))
+        self.assertEqual('deflate', negotiate_coding('gzip;q=0, deflate', ['gzip', 'deflate']))
+        self.assertEqual('gzip', negotiate_coding('*', ['gzip', 'deflate']))
+        self.assertEqual(None, negotiate_coding('identity', ['gzip', 'deflate']))
+        self.assertEqual(None, negotiate_coding('', ['gzip']))
+
+    def testCompressed(self):
+        plain = self.get()
+        self.assertFalse(plain.extra_headers.has_key('Content-Encoding'))
+        self.assertEqual('Accept-Encoding', plain.extra_headers['Vary'])
+        for coding in ('gzip', 'deflate'):
+            response = self.get(coding)
+            self.assertEqual(coding, response.extra_headers['Content-Encoding'])
+            self.assertEqual('Accept-Encoding', response.extra_headers['Vary'])
+            self.assertEqual(plain.getData(), decompress(response.getData(), coding))
+        self.assertEqual(1, self.datasource.selects)
+
+    def testCompressedOnce(self):
+        first = self.get('gzip')
+        keys = [key for key in self.server.cache.entries.keys() if key.endswith(':gzip')]
+        self.assertEqual(1, len(keys))
+        self.assertEqual(first.getData(), self.server.cache.get(keys[0])[1])
+        second = self.get('gzip')
+        self.assertEqual(first.getData(), second.getData())
+        self.assertEqual(first.extra_headers['ETag'], second.extra_headers['ETag'])
+
+    def testEntityTags(self):
+        plain = self.get().extra_headers['ETag']
+        gzip = self.get('gzip').extra_headers['ETag']
+        self.assertNotEqual(plain, gzip)
+        self.assertEqual(plain[:-1] + '-gzip"', gzip)
+
+        # a gzip tag does not validate the plain body
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {}, request_headers = {'If-None-Match': gzip})
+        self.assertEqual("200 OK", response.status_code)
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {}, request_headers = {'If-None-Match': gzip, 'Accept-Encoding': 'gzip'})
+        self.assertEqual("304 Not Modified", response.status_code)
+        self.assertEqual('Accept-Encoding', response.extra_headers['Vary'])
+
+    def testMinSize(self):
+        self.server.compression_min_size = 1000000
+        response = self.get('gzip')
+        self.assertFalse(response.extra_headers.has_key('Content-Encoding'))
+        self.assertEqual(3, len(simplejson.loads(response.getData())['features']))
+
+class StreamCompressionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = StreamingDataSource('points')
+        self.server = Server({'points': self.datasource}, {'compression': 'gzip', 'compression_min_size': '10'})
+
+    def testStreamed(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {},
+                                               request_headers = {'Accept-Encoding': 'gzip'})
+        self.assertTrue(isinstance(response, StreamingResponse))
+        self.assertEqual('gzip', response.extra_headers['Content-Encoding'])
+        data = simplejson.loads(decompress("".join(response.iterData()), 'gzip'))
+        self.assertEqual([0, 1, 2], [feature['id'] for feature in data['features']])
+        self.assertEqual(['begin', 'commit'], self.datasource.calls)
+
+    def testShortStream(self):
+        self.server.compression_min_size = 1000000
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {},
+                                               request_headers = {'Accept-Encoding': 'gzip'})
+        self.assertFalse(response.extra_headers.has_key('Content-Encoding'))
+        self.assertEqual(3, len(simplejson.loads(response.getData())['features']))
+        self.assertEqual(['begin', 'commit'], self.datasource.calls)
+
+    def testChunks(self):
+        chunks = ["chunk %d " % i for i in range(1000)]
+        self.assertEqual("".join(chunks), decompress("".join(compress_chunks(iter(chunks), 'deflate')), 'deflate'))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from email.utils import formatdate
+from FeatureServer.Server import Server
+from FeatureServer.Cache.Memory import Memory
+from FeatureServer.DataSource.SQLite import SQLite
+from FeatureServer.Service.Action import Action
+from vectorformats.Feature import Feature
+from web_request.response import NotModifiedResponse, not_modified
+from tests.Server.ResponseCacheTest import CountingDataSource
+
+class ConditionalRequestTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = CountingDataSource('points')
+        self.server = Server({'points': self.datasource}, cache = Memory(conditional = 'true'))
+
+    def get(self, headers = None, path_info = '/points/all.geojson'):
+        return self.server.dispatchRequest(path_info = path_info, params = {}, request_headers = headers)
+
+    def testNotModified(self):
+        response = self.get()
+        etag = response.extra_headers['ETag']
+        self.assertEqual(1, self.datasource.selects)
+
+        response = self.get({'If-None-Match': etag})
+        self.assertTrue(isinstance(response, NotModifiedResponse))
+        self.assertEqual("304 Not Modified", response.status_code)
+        self.assertEqual(etag, response.extra_headers['ETag'])
+        self.assertEqual('', response.getData())
+        self.assertEqual(1, self.datasource.selects)
+
+        response = self.get({'If-None-Match': etag}, '/points/all.kml')
+        self.assertFalse(isinstance(response, NotModifiedResponse))
+
+    def testModifiedByWrite(self):
+        etag = self.get().extra_headers['ETag']
+        self.server.dispatchRequest(path_info = '/points/1.geojson', params = {}, request_method = 'DELETE')
+        response = self.get({'If-None-Match': etag})
+        self.assertFalse(isinstance(response, NotModifiedResponse))
+        self.assertNotEqual(etag, response.extra_headers['ETag'])
+
+    def testHeaders(self):
+        self.assertTrue(not_modified({'If-None-Match': '"a", W/"b"'}, 'b'))
+        self.assertTrue(not_modified({'If-None-Match': '*'}, 'b'))
+        self.assertFalse(not_modified({'If-None-Match': '"a"'}, 'b', 100))
+        self.assertTrue(not_modified({'If-Modified-Since': formatdate(100, usegmt=True)}, 'b', 100))
+        self.assertFalse(not_modified({'If-Modified-Since': formatdate(99, usegmt=True)}, 'b', 100))
+        self.assertFalse(not_modified({}, 'b', 100))
+
+class SQLiteLastModifiedTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.datasource = SQLite('points', file = os.path.join(self.directory, 'points.sqlite'))
+        self.server = Server({'points': self.datasource}, cache = Memory(conditional = 'true'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def testLastModified(self):
+        self.assertEqual(None, self.datasource.getLastModified())
+        self.datasource.begin()
+        action = Action()
+        action.method = 'insert'
+        action.feature = Feature(geometry = {'type': 'Point', 'coordinates': [1, 2]}, props = {'name': 'a'})
+        self.datasource.insert(action)
+        self.datasource.commit()
+
+        modified = self.datasource.getLastModified()
+        self.assertTrue(abs(time.time() - modified) < 5)
+
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        self.assertEqual(formatdate(modified, usegmt=True), response.extra_headers['Last-Modified'])
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {},
+                                               request_headers = {'If-Modified-Since': response.extra_headers['Last-Modified']})
+        self.assertTrue(isinstance(response, NotModifiedResponse))
+
+    def testDateModifiedIndex(self):
+        # a table created before the index
+        self.datasource.begin()
+        self.datasource.db.execute("DROP INDEX points_date_modified_idx")
+        self.datasource.commit()
+
+        # not in every transaction
+        self.assertEqual(None, self.datasource.getLastModified())
+        self.datasource.begin()
+        self.assertFalse('points_date_modified_idx' in self.datasource.indexes())
+        self.datasource.commit()
+
+        # but when the datasource is built
+        datasource = SQLite('points', file = self.datasource.dsn)
+        datasource.begin()
+        self.assertTrue('points_date_modified_idx' in datasource.indexes())
+        plan = datasource.db.execute("EXPLAIN QUERY PLAN SELECT MAX(date_modified) FROM points").fetchall()
+        datasource.commit()
+        self.assertTrue('points_date_modified_idx' in str([tuple(row) for row in plan]))
+
+if __name__ == "__main__":
+    unittest.main()
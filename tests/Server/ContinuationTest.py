@@ -0,0 +1,107 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import sqlite3
+import tempfile
+import unittest
+import simplejson
+from lxml import etree
+from FeatureServer.Server import Server
+from FeatureServer.DataSource.SQLite import SQLite
+from FeatureServer.DataSource import Continuation
+
+def collection(count):
+    return simplejson.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [i, i]}, 'properties': {'name': 'f%d' % i}} for i in range(count)]})
+
+class ContinuationTestCase(unittest.TestCase):
+    def setUp(self):
+        handle, self.file = tempfile.mkstemp(suffix = '.sqlite')
+        os.close(handle)
+        self.server = Server({'points': SQLite('points', file = self.file)})
+        self.server.dispatchRequest(path_info = '/points/create.geojson', params = {}, request_method = 'POST', post_data = collection(5))
+
+    def tearDown(self):
+        os.remove(self.file)
+
+    def page(self, **params):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = params, request_method = 'GET')
+        return simplejson.loads(response.getData())
+
+    def testPages(self):
+        pages = []
+        result = self.page(maxfeatures = '2')
+        pages.append([feature['id'] for feature in result['features']])
+        while result.has_key('next'):
+            result = self.page(maxfeatures = '2', continuation = result['next'])
+            pages.append([feature['id'] for feature in result['features']])
+        self.assertEqual([[1, 2], [3, 4], [5]], pages)
+
+    def testNoTokenWithoutPaging(self):
+        result = self.page()
+        self.assertEqual(5, len(result['features']))
+        self.assertFalse(result.has_key('next'))
+
+    def testWFS(self):
+        token = self.page(maxfeatures = '2')['next']
+        response = self.server.dispatchRequest(path_info = '/points/all.wfs', params = {'maxfeatures': '2', 'continuation': token}, request_method = 'GET')
+        root = etree.fromstring(response.getData())
+        self.assertEqual(2, len(root.findall('{http://www.opengis.net/gml}featureMember')))
+        self.assertEqual(Continuation.encode([('t.feature_id', False)], type('Feature', (object,), {'id': 4})(), 't.feature_id'),
+                         root.get('{http://featureserver.org/fs}next'))
+
+    def testMalformedToken(self):
+        result = self.page(maxfeatures = '2', continuation = 'not a token')
+        self.assertEqual('continuation', result['ExceptionReport'][0]['Exception']['locator'])
+
+class SeekTestCase(unittest.TestCase):
+    def testSortKeys(self):
+        self.assertEqual([('name', True), ('gid', False)], Continuation.sort_keys('name DESC', 'gid'))
+        self.assertEqual([('gid', True)], Continuation.sort_keys('gid desc', 'gid'))
+        self.assertEqual([('gid', False)], Continuation.sort_keys('', 'gid'))
+
+    def testRowValues(self):
+        keys = Continuation.sort_keys('name', 'gid')
+        sql, params = Continuation.seek(keys, ['b', 2], ':%s', row_values = True)
+        self.assertEqual('((name, gid) > (:fs_seek_0, :fs_seek_1) OR name IS NULL)', sql)
+        self.assertEqual({'fs_seek_0': 'b', 'fs_seek_1': 2}, params)
+
+    def testMixedDirections(self):
+        keys = Continuation.sort_keys('name DESC', 'gid')
+        sql, params = Continuation.seek(keys, ['b', 2], ':%s', row_values = True)
+        self.assertEqual('((name < :fs_seek_0 OR name IS NULL) OR (name = :fs_seek_0 AND gid > :fs_seek_1))', sql)
+
+    def pages(self, order, dialect, row_values):
+        db = sqlite3.connect(':memory:')
+        db.execute("CREATE TABLE t (gid INTEGER PRIMARY KEY, a TEXT, b INTEGER)")
+        rows = [(1, 'x', 1), (2, None, 2), (3, 'y', None), (4, 'x', None), (5, None, None), (6, 'x', 2), (7, 'y', 1)]
+        db.executemany("INSERT INTO t VALUES (?, ?, ?)", rows)
+        keys = Continuation.sort_keys(order, 'gid')
+        order_by = " ORDER BY " + Continuation.order_by(keys, dialect)
+        expected = [row[0] for row in db.execute("SELECT gid FROM t" + order_by)]
+        ids = []
+        where, params = "", {}
+        while True:
+            page = db.execute("SELECT gid, a, b FROM t" + where + order_by + " LIMIT 2", params).fetchall()
+            if not page:
+                break
+            ids += [row[0] for row in page]
+            last = dict(zip(('gid', 'a', 'b'), page[-1]))
+            values = [last[column] for column, descending in keys]
+            where, params = Continuation.seek(keys, values, ':%s', row_values)
+            where = " WHERE " + where
+        self.assertEqual(expected, ids)
+        self.assertEqual(len(rows), len(ids))
+        return ids
+
+    def testNullSortValues(self):
+        for dialect in ('postgresql', 'sqlite'):
+            for row_values in (True, False):
+                self.assertEqual([1, 6, 4, 7, 3, 2, 5], self.pages('a, b', dialect, row_values))
+                self.assertEqual([6, 1, 4, 7, 3, 2, 5], self.pages('a, b DESC', dialect, row_values))
+                self.assertEqual([3, 7, 1, 4, 6, 2, 5], self.pages('a DESC', dialect, row_values))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import tempfile
+import unittest
+import simplejson
+from lxml import etree
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.DataSource.SQLite import SQLite
+
+def collection(count):
+    return simplejson.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [i, i]}, 'properties': {'name': 'f%d' % i}} for i in range(count)]})
+
+class CountingDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.calls = []
+    def select(self, action):
+        self.calls.append('select')
+        return []
+    def count(self, action):
+        self.calls.append(('count', action.bbox))
+        return 42
+
+class HitsTestCase(unittest.TestCase):
+    def setUp(self):
+        handle, self.file = tempfile.mkstemp(suffix = '.sqlite')
+        os.close(handle)
+        self.server = Server({'points': SQLite('points', file = self.file)})
+        self.server.dispatchRequest(path_info = '/points/create.geojson', params = {}, request_method = 'POST', post_data = collection(5))
+
+    def tearDown(self):
+        os.remove(self.file)
+
+    def testGeoJSON(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'resulttype': 'hits', 'maxfeatures': '2'}, request_method = 'GET')
+        result = simplejson.loads(response.getData())
+        self.assertEqual(5, result['numberOfFeatures'])
+        self.assertEqual([], result['features'])
+
+    def testCountPath(self):
+        response = self.server.dispatchRequest(path_info = '/points/count.geojson', params = {'bbox': '-0.5,-0.5,2.5,2.5'}, request_method = 'GET')
+        self.assertEqual(3, simplejson.loads(response.getData())['numberOfFeatures'])
+
+    def testLayerNamedCount(self):
+        datasource = CountingDataSource('count')
+        server = Server({'count': datasource})
+        server.dispatchRequest(path_info = '/count', params = {'format': 'geojson'}, request_method = 'GET')
+        server.dispatchRequest(path_info = '/count/count.geojson', params = {}, request_method = 'GET')
+        self.assertEqual(['select', ('count', None)], datasource.calls)
+
+    def testWFS(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.wfs', params = {'resulttype': 'hits'}, request_method = 'GET')
+        root = etree.fromstring(response.getData())
+        self.assertEqual('5', root.get('numberOfFeatures'))
+        self.assertEqual(0, len(root.findall('{http://www.opengis.net/gml}featureMember')))
+
+    def testNoSelect(self):
+        datasource = CountingDataSource('points')
+        server = Server({'points': datasource})
+        response = server.dispatchRequest(path_info = '/points/all.geojson', params = {'resulttype': 'hits', 'bbox': '1,2,3,4'}, request_method = 'GET')
+        self.assertEqual([('count', [1.0, 2.0, 3.0, 4.0])], datasource.calls)
+        self.assertEqual(42, simplejson.loads(response.getData())['numberOfFeatures'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.WebFeatureService.Response.InsertResult import InsertResult
+from FeatureServer.WebFeatureService.Response.DeleteResult import DeleteResult
+
+class BatchingDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.calls = []
+        self.next_id = 1
+    def insert_many(self, actions):
+        self.calls.append(('insert_many', len(actions)))
+        results = []
+        for action in actions:
+            action.id = self.next_id
+            self.next_id += 1
+            results.append(InsertResult(action.id, ""))
+        return results
+    def delete(self, action):
+        self.calls.append(('delete', action.id))
+        return DeleteResult(action.id, "")
+    def commit(self):
+        self.calls.append('commit')
+
+def collection(count):
+    return simplejson.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [i, i]}, 'properties': {'name': 'f%d' % i}} for i in range(count)]})
+
+class InsertBatchTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = BatchingDataSource('points', insert_batch = '2')
+        self.server = Server({'points': self.datasource})
+
+    def testBatches(self):
+        self.server.dispatchRequest(path_info = '/points/create.geojson', params = {}, request_method = 'POST', post_data = collection(5))
+        self.assertEqual([('insert_many', 2), ('insert_many', 2), ('insert_many', 1), 'commit'], self.datasource.calls)
+        self.assertEqual(6, self.datasource.next_id)
+
+    def testSplitByOtherActions(self):
+        actions = []
+        for method in ['insert', 'insert', 'delete', 'insert']:
+            action = type('Action', (object,), {'method': method, 'wfsrequest': None})()
+            actions.append(action)
+        batches = [(method, isinstance(argument, list) and len(argument)) for method, argument in self.server.batchActions(actions, self.datasource)]
+        self.assertEqual([('insert_many', 2), ('delete', False), ('insert_many', 1)], batches)
+
+if __name__ == "__main__":
+    unittest.main()
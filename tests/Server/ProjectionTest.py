@@ -0,0 +1,65 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.DataSource import Columns
+from vectorformats.Feature import Feature
+
+class WideDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.properties = []
+    def select(self, action):
+        self.properties.append(action.properties)
+        return [Feature(id = 1, geometry = {'type': 'Point', 'coordinates': [1, 2]}, props = {'name': 'a', 'highway': 'bus_stop', 'sqm': 12})]
+
+class ProjectionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = WideDataSource('points')
+        self.server = Server({'points': self.datasource})
+
+    def testProperties(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'properties': 'name,sqm'}, request_method = 'GET')
+        feature = simplejson.loads(response.getData())['features'][0]
+        self.assertEqual({'name': 'a', 'sqm': 12}, feature['properties'])
+        self.assertEqual([['name', 'sqm']], self.datasource.properties)
+
+    def testPropertyName(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'propertyname': '(fs:name)'}, request_method = 'GET')
+        feature = simplejson.loads(response.getData())['features'][0]
+        self.assertEqual({'name': 'a'}, feature['properties'])
+        self.assertEqual({'type': 'Point', 'coordinates': [1, 2]}, feature['geometry'])
+
+    def testAllProperties(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {}, request_method = 'GET')
+        feature = simplejson.loads(response.getData())['features'][0]
+        self.assertEqual(3, len(feature['properties']))
+        self.assertEqual([None], self.datasource.properties)
+
+    def testWithoutGeometry(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'geometry': 'false'}, request_method = 'GET')
+        feature = simplejson.loads(response.getData())['features'][0]
+        self.assertEqual(None, feature['geometry'])
+        self.assertEqual(3, len(feature['properties']))
+
+    def testCSVWithoutGeometry(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.csv', params = {'geometry': 'false', 'properties': 'name'}, request_method = 'GET')
+        self.assertEqual(['id,name,geometry', '1,a,'], response.getData().split())
+
+class ColumnsTestCase(unittest.TestCase):
+    def testNamed(self):
+        columns = 'name, gtype as "geometry_type", hstore(tags)->\'addr:street\' as "street", coalesce(a, b), t."ref"'
+        self.assertEqual([('name', 'name'), ('geometry_type', 'gtype as "geometry_type"'),
+                          ('street', 'hstore(tags)->\'addr:street\' as "street"'), ('coalesce(a, b)', 'coalesce(a, b)'), ('ref', 't."ref"')],
+                         Columns.named(columns))
+
+    def testSeparator(self):
+        self.assertEqual([('sqm', 'round(ST_Area2d(ST_Transform(the_geog, 21781))) as sqm'), ('len', 'length(x) AS len')],
+                         Columns.named('round(ST_Area2d(ST_Transform(the_geog, 21781))) as sqm;length(x) AS len', ';'))
+
+if __name__ == "__main__":
+    unittest.main()
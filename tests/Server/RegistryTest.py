@@ -0,0 +1,61 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from FeatureServer.Server import Server
+from FeatureServer.Registry import Registry
+from FeatureServer.Service import services, content_types, register
+from FeatureServer.Service.GeoJSON import GeoJSON
+from tests.Server.ResponseCacheTest import CountingDataSource
+
+class PluginService(GeoJSON):
+    def encode(self, results):
+        mime, data, headers, encoding = GeoJSON.encode(self, results)
+        return ('application/x-plugin', data, headers, encoding)
+
+class RegistryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = CountingDataSource('points')
+        self.server = Server({'points': self.datasource})
+
+    def tearDown(self):
+        services.classes.pop('Plugin', None)
+        for type in ['plugin', 'application/x-plugin']:
+            content_types.pop(type, None)
+
+    def testLoadedOnce(self):
+        registry = Registry("FeatureServer.Service", ["GeoJSON"])
+        self.assertEqual(['GeoJSON'], registry.names())
+        self.assertTrue(registry.get('GeoJSON') is GeoJSON)
+        self.assertTrue(registry.classes['GeoJSON'] is GeoJSON)
+        self.assertTrue(registry.get('KML') is services.get('KML'))
+
+    def testRequestNames(self):
+        self.assertRaises(ImportError, services.get, 'os.path')
+        self.assertRaises(ImportError, services.get, 'NoSuchService')
+        self.assertRaises(ImportError, self.server.dispatchRequest, path_info = '/points/all', params = {'format': 'os.system'})
+
+    def testPlugin(self):
+        register('Plugin', PluginService, ['plugin', 'application/x-plugin'])
+        response = self.server.dispatchRequest(path_info = '/points/all.plugin', params = {})
+        self.assertEqual('application/x-plugin', response.content_type)
+        response = self.server.dispatchRequest(path_info = '/points/all', params = {}, accepts = 'application/x-plugin')
+        self.assertEqual('application/x-plugin', response.content_type)
+
+    def testPluginDataSource(self):
+        directory = tempfile.mkdtemp()
+        try:
+            config = os.path.join(directory, 'featureserver.cfg')
+            open(config, 'w').write("[points]\ntype=tests.Server.ResponseCacheTest.CountingDataSource\n\n[cache]\ntype=Memory\n")
+            server = Server.load(config)
+            self.assertTrue(isinstance(server.datasources['points'], CountingDataSource))
+            self.assertEqual('Memory', server.cache.__class__.__name__)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.WebFeatureService.RequestContext import RequestContext
+from FeatureServer.WebFeatureService.WFSRequest import WFSRequest
+
+transaction = """<wfs:Transaction version="1.1.0" service="WFS" xmlns="http://featureserver.org/fs" xmlns:gml="http://www.opengis.net/gml" xmlns:ogc="http://www.opengis.net/ogc" xmlns:wfs="http://www.opengis.net/wfs">
+    <wfs:Insert>
+        <points><geometry><gml:Point><gml:coordinates>1,2</gml:coordinates></gml:Point></geometry><name>a</name></points>
+        <points><geometry><gml:Point><gml:coordinates>3,4</gml:coordinates></gml:Point></geometry><name>b</name></points>
+    </wfs:Insert>
+    <wfs:Delete typeName="points"><ogc:Filter><ogc:FeatureId fid="4"/></ogc:Filter></wfs:Delete>
+</wfs:Transaction>"""
+
+class RecordingDataSource(DataSource):
+    type = 'PostGIS'
+    geom_col = 'geometry'
+    layer = 'points'
+    fid_col = 'id'
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.actions = []
+    def insert(self, action):
+        self.actions.append(action)
+    def delete(self, action):
+        self.actions.append(action)
+
+class RequestContextTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = RecordingDataSource('points')
+        self.server = Server({'points': self.datasource})
+
+    def testParsedOnce(self):
+        self.server.dispatchRequest(path_info = '/points', params = {}, request_method = 'POST', post_data = transaction)
+        self.assertEqual(['insert', 'insert', 'delete'], [action.method for action in self.datasource.actions])
+        roots = [action.wfsrequest.node.getroottree().getroot() for action in self.datasource.actions]
+        self.assertTrue(roots[0] is roots[1] and roots[0] is roots[2])
+
+        statements = [action.wfsrequest.getStatement(self.datasource) for action in self.datasource.actions]
+        self.assertTrue("1,2" in statements[0] and "3,4" not in statements[0])
+        self.assertTrue("3,4" in statements[1] and "1,2" not in statements[1])
+        self.assertTrue(statements[2].strip().startswith('DELETE FROM points'))
+
+    def testContext(self):
+        context = RequestContext(transaction)
+        request = WFSRequest(context)
+        request.parse(transaction)
+        self.assertTrue(request.dom is context.getDOM())
+        self.assertEqual('WFS', context.getDOM().get('service'))
+        self.assertEqual(None, RequestContext('{"type": "Feature"}').getDOM())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.Cache.Memory import Memory
+from FeatureServer.WebFeatureService.Response.DeleteResult import DeleteResult
+from vectorformats.Feature import Feature
+
+class CountingDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.selects = 0
+        self.features = [Feature(id, {'type': 'Point', 'coordinates': [id, id]}, props = {'name': 'f%d' % id}) for id in range(3)]
+    def select(self, action):
+        self.selects += 1
+        return list(self.features)
+    def delete(self, action):
+        self.features = [feature for feature in self.features if feature.id != action.id]
+        return DeleteResult(action.id, "")
+
+class ResponseCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = CountingDataSource('points', cache_ttl = '60')
+        self.server = Server({'points': self.datasource}, cache = Memory())
+
+    def get(self, **params):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = params)
+        return simplejson.loads(response.getData())
+
+    def testCached(self):
+        first = self.get(maxfeatures = '10', order = 'name')
+        second = self.get(order = 'name', maxfeatures = '10')
+        self.assertEqual(first, second)
+        self.assertEqual(1, self.datasource.selects)
+        self.get(maxfeatures = '2')
+        self.assertEqual(2, self.datasource.selects)
+
+    def testWithoutTTL(self):
+        self.datasource.cache_ttl = '0'
+        self.get()
+        self.get()
+        self.assertEqual(2, self.datasource.selects)
+
+    def testInvalidatedByDelete(self):
+        self.assertEqual(3, len(self.get()['features']))
+        self.server.dispatchRequest(path_info = '/points/1.geojson', params = {}, request_method = 'DELETE')
+        self.assertEqual(2, len(self.get()['features']))
+        self.assertEqual(2, self.datasource.selects)
+
+    def testInvalidatedOncePerRequest(self):
+        generation = self.server.cache.generation('points')
+        self.server.dispatchRequest(path_info = '/points/1.geojson', params = {}, request_method = 'DELETE')
+        self.assertEqual(generation + 1, self.server.cache.generation('points'))
+
+if __name__ == "__main__":
+    unittest.main()
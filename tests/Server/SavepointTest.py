@@ -0,0 +1,95 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from FeatureServer.Service import services, content_types, register
+from FeatureServer.Service.GeoJSON import GeoJSON
+from FeatureServer.Service.Action import Action
+from FeatureServer.Exceptions.WebFeatureService.InvalidValueException import InvalidValueException
+from FeatureServer.WebFeatureService.Response.InsertResult import InsertResult
+
+class TransactionalDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.calls = []
+    def insert(self, action):
+        name = action.feature.properties['name']
+        if name == 'invalid':
+            raise InvalidValueException(**{'layer':self.name, 'locator':'insert'})
+        if name == 'broken':
+            raise ValueError("constraint violated")
+        self.calls.append(('insert', name))
+        return InsertResult(name, "")
+    def select(self, action):
+        raise InvalidValueException(**{'layer':self.name, 'locator':'select'})
+    def commit(self):
+        self.calls.append('commit')
+    def rollback(self):
+        self.calls.append('rollback')
+    def savepoint(self, name):
+        self.calls.append(('savepoint', name))
+    def release_savepoint(self, name):
+        self.calls.append(('release', name))
+    def rollback_savepoint(self, name):
+        self.calls.append(('rollback to', name))
+
+def collection(*names):
+    return simplejson.dumps({'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [1, 2]}, 'properties': {'name': name}} for name in names]})
+
+class ReadAfterWriteService(GeoJSON):
+    def parse(self, params, path_info, host, post_data, request_method, format_obj = None):
+        GeoJSON.parse(self, params, path_info, host, post_data, request_method, format_obj)
+        action = Action()
+        action.method = 'select'
+        self.actions.append(action)
+
+class TransactionTestCase(unittest.TestCase):
+    def tearDown(self):
+        services.classes.pop('ReadAfterWrite', None)
+        content_types.pop('readafterwrite', None)
+
+    def create(self, datasource, *names):
+        server = Server({'points': datasource})
+        return server.dispatchRequest(path_info = '/points/create.geojson', params = {}, request_method = 'POST', post_data = collection(*names))
+
+    def testSingleCommit(self):
+        datasource = TransactionalDataSource('points')
+        self.create(datasource, 'a', 'b', 'c')
+        self.assertEqual([('insert', 'a'), ('insert', 'b'), ('insert', 'c'), 'commit'], datasource.calls)
+
+    def testAtomic(self):
+        datasource = TransactionalDataSource('points')
+        self.create(datasource, 'a', 'invalid', 'c')
+        self.assertEqual([('insert', 'a'), ('insert', 'c'), 'rollback'], datasource.calls)
+
+    def testAtomicError(self):
+        datasource = TransactionalDataSource('points')
+        self.assertRaises(ValueError, self.create, datasource, 'a', 'broken')
+        self.assertEqual([('insert', 'a'), 'rollback'], datasource.calls)
+
+    def testSavepoints(self):
+        datasource = TransactionalDataSource('points', savepoints = 'true')
+        self.create(datasource, 'a', 'invalid', 'broken', 'd')
+        self.assertEqual([('savepoint', 'fs_action_0'), ('insert', 'a'), ('release', 'fs_action_0'),
+                          ('savepoint', 'fs_action_1'), ('rollback to', 'fs_action_1'),
+                          ('savepoint', 'fs_action_2'), ('rollback to', 'fs_action_2'),
+                          ('savepoint', 'fs_action_3'), ('insert', 'd'), ('release', 'fs_action_3'),
+                          'commit'], datasource.calls)
+
+    def testFailedRead(self):
+        register('ReadAfterWrite', ReadAfterWriteService, ['readafterwrite'])
+        for savepoints, calls in [('false', [('insert', 'a'), 'rollback']),
+                                  ('true', [('savepoint', 'fs_action_0'), ('insert', 'a'), ('release', 'fs_action_0'),
+                                            ('savepoint', 'fs_action_1'), ('rollback to', 'fs_action_1'), 'commit'])]:
+            datasource = TransactionalDataSource('points', savepoints = savepoints)
+            server = Server({'points': datasource})
+            server.dispatchRequest(path_info = '/points/create.readafterwrite', params = {}, request_method = 'POST', post_data = collection('a'))
+            self.assertEqual(calls, datasource.calls)
+
+if __name__ == "__main__":
+    unittest.main()
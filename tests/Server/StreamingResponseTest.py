@@ -0,0 +1,97 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+import simplejson
+from FeatureServer.Server import Server
+from FeatureServer.DataSource import DataSource
+from vectorformats.Feature import Feature
+from web_request.response import StreamingResponse
+from FeatureServer.Cache.Memory import Memory
+
+class StreamingDataSource(DataSource):
+    def __init__(self, name, **kwargs):
+        DataSource.__init__(self, name, **kwargs)
+        self.calls = []
+        self.read = 0
+    def begin(self):
+        self.calls.append('begin')
+    def commit(self):
+        self.calls.append('commit')
+    def rollback(self):
+        self.calls.append('rollback')
+    def select(self, action):
+        return self.features()
+    def features(self):
+        for id in range(3):
+            self.read += 1
+            yield Feature(id, {'type': 'Point', 'coordinates': [id, id]}, props = {'name': 'f%d' % id})
+
+class StreamingResponseTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = StreamingDataSource('points')
+        self.server = Server({'points': self.datasource})
+
+    def testStreamedGeoJSON(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        self.assertTrue(isinstance(response, StreamingResponse))
+        self.assertEqual(0, self.datasource.read)
+        chunks = response.iterData()
+        first = chunks.next()
+        self.assertEqual(['begin'], self.datasource.calls)
+        data = simplejson.loads(first + "".join(chunks))
+        self.assertEqual([0, 1, 2], [feature['id'] for feature in data['features']])
+        self.assertEqual(['begin', 'commit'], self.datasource.calls)
+
+    def testClosedEarly(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        chunks = response.iterData()
+        chunks.next()
+        chunks.close()
+        self.assertEqual(['begin', 'rollback'], self.datasource.calls)
+
+    def testClosedBeforeFirstChunk(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        response.iterData().close()
+        self.assertEqual(['begin', 'rollback'], self.datasource.calls)
+
+    def testClosedAfterLastChunk(self):
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        chunks = response.iterData()
+        list(chunks)
+        chunks.close()
+        self.assertEqual(['begin', 'commit'], self.datasource.calls)
+
+    def testCachedClosedBeforeFirstChunk(self):
+        datasource = StreamingDataSource('points', cache_ttl = '60')
+        server = Server({'points': datasource}, cache = Memory())
+        response = server.dispatchRequest(path_info = '/points/all.geojson', params = {}, request_method = 'GET')
+        self.assertEqual(1, len(server.cache.flights))
+        response.iterData().close()
+        # waiting requests are released and the transaction is ended
+        self.assertEqual({}, server.cache.flights)
+        self.assertEqual(['begin', 'rollback'], datasource.calls)
+
+    def testStreamedPage(self):
+        self.datasource.getContinuation = lambda feature: 'after-%s-%s' % (feature.id, feature.properties.get('name'))
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'maxfeatures': '3', 'properties': 'id'})
+        self.assertTrue(isinstance(response, StreamingResponse))
+        self.assertEqual(0, self.datasource.read)
+        data = simplejson.loads(response.getData())
+        self.assertEqual(3, len(data['features']))
+        # taken before the properties were projected
+        self.assertEqual('after-2-f2', data['next'])
+
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {'maxfeatures': '4'})
+        self.assertTrue(isinstance(response, StreamingResponse))
+        self.assertFalse(simplejson.loads(response.getData()).has_key('next'))
+
+    def testMaterialized(self):
+        self.datasource.select = lambda action: list(self.datasource.features())
+        response = self.server.dispatchRequest(path_info = '/points/all.geojson', params = {})
+        self.assertFalse(isinstance(response, StreamingResponse))
+        self.assertEqual(3, len(simplejson.loads(response.getData())['features']))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+'''
+Created on Oct 18, 2026
+
+'''
+import unittest
+from FeatureServer.Server import Server
+from FeatureServer.Service.Action import ActionStream
+from FeatureServer.WebFeatureService.Transaction.Transaction import Transaction
+from tests.Server.RequestContextTest import RecordingDataSource, transaction
+
+class StreamingDataSource(RecordingDataSource):
+    def __init__(self, name, **kwargs):
+        RecordingDataSource.__init__(self, name, **kwargs)
+        self.statements = []
+    def insert(self, action):
+        # the transactions before are already dropped
+        self.cleared = [len(previous.wfsrequest.node.getchildren()) for previous in self.actions]
+        self.actions.append(action)
+        self.statements.append(action.wfsrequest.getStatement(self))
+    delete = insert
+
+class TransactionStreamTestCase(unittest.TestCase):
+    def setUp(self):
+        self.datasource = StreamingDataSource('points', stream_transactions = 'true')
+        self.server = Server({'points': self.datasource})
+
+    def testStreamed(self):
+        self.server.dispatchRequest(path_info = '/points', params = {}, request_method = 'POST', post_data = transaction)
+        self.assertEqual(['insert', 'insert', 'delete'], [action.method for action in self.datasource.actions])
+        self.assertEqual([0, 0], self.datasource.cleared)
+        self.assertTrue("1,2" in self.datasource.statements[0] and "3,4" not in self.datasource.statements[0])
+        self.assertTrue("3,4" in self.datasource.statements[1])
+        self.assertTrue(self.datasource.statements[2].strip().startswith('DELETE FROM points'))
+
+    def testIterparse(self):
+        names = [action.__class__.__name__ for action in Transaction().iterparse(transaction)]
+        self.assertEqual(['Insert', 'Insert', 'Delete'], names)
+
+    def testActionStream(self):
+        stream = ActionStream(iter(['a', 'b']))
+        self.assertTrue(stream)
+        self.assertEqual('a', stream[0])
+        self.assertEqual(['a', 'b'], list(stream))
+        self.assertRaises(RuntimeError, list, stream)
+        self.assertFalse(ActionStream(iter([])))
+
+if __name__ == "__main__":
+    unittest.main()
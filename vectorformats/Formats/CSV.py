@@ -51,7 +51,9 @@ class CSV (Format):
                 if key == "id":
                     row.append(feature.id)
                 elif key == "geometry":
-                    geom = to_wkt(feature.geometry)
+                    geom = ""
+                    if feature.geometry:
+                        geom = to_wkt(feature.geometry)
                     #geom = ",".join(map(str, feature.geometry['coordinates']))
                     row.append(geom)
                 elif feature.properties.has_key(key):
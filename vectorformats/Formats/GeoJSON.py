@@ -11,6 +11,16 @@ except:
     except Exception, E:
         raise Exception("simplejson is required for using the GeoJSON service. (Import failed: %s)" % E)
 
+class GeometryFragment(object):
+    """A geometry that is already serialised to GeoJSON, e.g. by the
+       database. The encoder writes it into the output verbatim."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data
+
 class GeoJSON(Format):
     """
     The most complete Format in vectorformats library. This class is designed
@@ -36,26 +46,58 @@ class GeoJSON(Format):
         to_string determines whethr it should convert the result to
         a string or leave it as an object to be encoded later
         """
+        if to_string:
+            return "".join(self.encode_stream(features))
+        
         results = []
-        result_data = None
         for feature in features:
-            data = self.encode_feature(feature)
-            for key,value in data['properties'].items():
-                if value and isinstance(value, str): 
-                    data['properties'][key] = unicode(value,"utf-8")
+            data = self.encode_properties(feature)
+            if isinstance(data['geometry'], GeometryFragment):
+                data['geometry'] = json_loads(data['geometry'].data)
             results.append(data)
         
-        result_data = {
-                       'type':'FeatureCollection',
-                       'features': results,
-                       'crs': self.crs
-                      }
-        
-        if to_string:
-            result = json_dumps(result_data) 
-        else:
-            result = result_data
-        return result
+        return {
+                'type':'FeatureCollection',
+                'features': results,
+                'crs': self.crs
+               }
+    
+    def encode_stream(self, features, continuation=None, hits=None, **kwargs):
+        """
+        Generator yielding the FeatureCollection as JSON string chunks, one
+        per feature. Pre-serialised GeometryFragments are spliced into the
+        output as they are. A continuation token of a paged result is
+        written as the "next" member, the number of matched features of a
+        resultType=hits request as "numberOfFeatures". continuation may be a
+        callable returning the token once the features were read.
+        """
+        yield '{"type": "FeatureCollection", "features": ['
+        separator = ''
+        for feature in features:
+            data = self.encode_properties(feature)
+            geometry = data['geometry']
+            if isinstance(geometry, GeometryFragment):
+                del data['geometry']
+                # splice the fragment in front of the other members
+                yield '%s{"geometry": %s, %s' % (separator, geometry.data, json_dumps(data)[1:])
+            else:
+                yield separator + json_dumps(data)
+            separator = ', '
+        members = ''
+        if hits is not None:
+            members += ', "numberOfFeatures": %d' % hits
+        if callable(continuation):
+            continuation = continuation()
+        if continuation is not None:
+            members += ', "next": %s' % json_dumps(continuation)
+        yield '], "crs": %s%s}' % (json_dumps(self.crs), members)
+    
+    def encode_properties(self, feature):
+        data = self.encode_feature(feature)
+        for key,value in data['properties'].items():
+            if value and isinstance(value, str): 
+                data['properties'][key] = unicode(value,"utf-8")
+        return data
     
     def encode_feature(self, feature):
         return {'type':"Feature", 
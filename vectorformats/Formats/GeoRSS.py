@@ -22,22 +22,25 @@ class GeoRSS(Format):
     
     def encode(self, result, **kwargs):
         """Pass a list of Features."""
+        return "".join(self.encode_stream(result, **kwargs))
+    
+    def encode_stream(self, result, **kwargs):
+        """Generator yielding the feed in chunks, one per feature."""
         timestamp = datetime.fromtimestamp(time.time())
         timestamp = str(timestamp.strftime('%Y-%m-%dT%H:%M:%SZ'))
-        results = ["""<feed xmlns="http://www.w3.org/2005/Atom" xmlns:app="http://www.w3.org/2007/app" 
+        yield """<feed xmlns="http://www.w3.org/2005/Atom" xmlns:app="http://www.w3.org/2007/app" 
               xmlns:georss="http://www.georss.org/georss">
               <title>%s</title>
               <id>%s</id>
               <link rel="self" href="%s" />
               <author><name>FeatureServer</name></author>
               <updated>%s</updated>
-              """ % (self.title, self.url, self.url, timestamp) ]
+              """ % (self.title, self.url, self.url, timestamp)
         
         for action in result:
-            results.append( self.encode_feature(action))
+            yield "\n" + self.encode_feature(action)
         
-        results.append("</feed>")  
-        return "\n".join(results)
+        yield "\n</feed>"
     
     def encode_feature(self, feature):
         import xml.dom.minidom as m
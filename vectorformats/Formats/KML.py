@@ -10,8 +10,12 @@ class KML(Format):
     layername = "layer"
     title_property = None
     def encode(self, features, **kwargs):
+        return "".join(self.encode_stream(features, **kwargs))
+    
+    def encode_stream(self, features, **kwargs):
+        """Generator yielding the document in chunks, one per feature."""
         url = "%s/%s/%s-data.kml" % (self.url, self.layername, self.layername)
-        results = ["""<?xml version="1.0" encoding="UTF-8"?>
+        yield """<?xml version="1.0" encoding="UTF-8"?>
 <kml xmlns="http://earth.google.com/kml/2.0" xmlns:fs="http://featureserver.com/ns" xmlns:atom="http://www.w3.org/2005/Atom">
 <Document>
 <atom:link rel="self" href="%s" type="application/vnd.google-earth.kml+xml" /> 
@@ -24,12 +28,11 @@ class KML(Format):
         <color>900099ee</color>
     </PolyStyle>
 </Style>
-        """ % url]
+        """ % url
         for feature in features:
-            results.append( self.encode_feature(feature))
-        results.append("""</Document>
-        </kml>""")
-        return "\n".join(results)        
+            yield "\n" + self.encode_feature(feature)
+        yield """\n</Document>
+        </kml>"""
     
     def encode_feature(self, feature):
         "Take a feature, and return an XML string for that feature."
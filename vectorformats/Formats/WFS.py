@@ -14,19 +14,29 @@ class WFS(Format):
                   'xsi' : 'http://www.w3.org/2001/XMLSchema-instance'}
     
     def encode(self, features, **kwargs):
-        results = ["""<?xml version="1.0" ?><wfs:FeatureCollection
+        return "".join(self.encode_stream(features, **kwargs))
+    
+    def encode_stream(self, features, continuation=None, hits=None, **kwargs):
+        """Generator yielding the FeatureCollection in chunks, one per
+           feature. A continuation token of a paged result is written as
+           the fs:next attribute, the number of matched features of a
+           resultType=hits request as numberOfFeatures."""
+        attributes = ''
+        if hits is not None:
+            attributes += '\n   numberOfFeatures="%d"' % hits
+        if continuation is not None:
+            attributes += '\n   fs:next="%s"' % escape(continuation, {'"': '&quot;'})
+        yield """<?xml version="1.0" ?><wfs:FeatureCollection
    xmlns:fs="http://featureserver.org/fs"
    xmlns:wfs="http://www.opengis.net/wfs"
    xmlns:gml="http://www.opengis.net/gml"
    xmlns:ogc="http://www.opengis.net/ogc"
    xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"
-   xsi:schemaLocation="http://www.opengis.net/wfs http://schemas.opengeospatial.net//wfs/1.0.0/WFS-basic.xsd">
-        """]
+   xsi:schemaLocation="http://www.opengis.net/wfs http://schemas.opengeospatial.net//wfs/1.0.0/WFS-basic.xsd"%s>
+        """ % attributes
         for feature in features:
-            results.append( self.encode_feature(feature))
-        results.append("""</wfs:FeatureCollection>""")
-        
-        return "\n".join(results)        
+            yield "\n" + self.encode_feature(feature)
+        yield "\n</wfs:FeatureCollection>"
     
     def encode_feature(self, feature):
         layername = re.sub(r'\W', '_', self.layername)
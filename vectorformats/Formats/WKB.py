@@ -0,0 +1,136 @@
+from vectorformats.Feature import Feature
+from vectorformats.Formats.Format import Format
+
+import sys
+import struct
+import array
+import binascii
+
+class WKB(Format):
+    """Converts a single chunk of WKB to a list of 1 feature."""
+
+    def from_wkb(self, geom):
+        return from_wkb(geom)
+
+    def decode(self, data):
+        features = [
+            Feature(1, self.from_wkb(data))
+        ]
+
+        return features
+
+
+geometry_types = {
+    1 : "Point",
+    2 : "LineString",
+    3 : "Polygon",
+    4 : "MultiPoint",
+    5 : "MultiLineString",
+    6 : "MultiPolygon",
+    7 : "GeometryCollection"
+}
+
+# EWKB (PostGIS) flags stored in the high bits of the type
+ewkb_z      = 0x80000000
+ewkb_m      = 0x40000000
+ewkb_srid   = 0x20000000
+
+native_byteorder = sys.byteorder == 'little' and 1 or 0
+
+uint32 = (struct.Struct(">I"), struct.Struct("<I"))
+
+def from_wkb (geom):
+    """wkb helper: converts from (E)WKB to a GeoJSON-like geometry. Accepts
+       a binary string or buffer as well as hex encoded WKB. 2D, Z, M and ZM
+       geometries in ISO or EWKB notation are supported; M values are
+       dropped."""
+    if isinstance(geom, basestring) and geom[:2] in ('00', '01'):
+        geom = binascii.unhexlify(geom)
+    result, offset = _read_geometry(geom, 0)
+    return result
+
+def _read_geometry (data, offset):
+    byteorder = ord(data[offset])
+    geomtype = uint32[byteorder].unpack_from(data, offset + 1)[0]
+    offset += 5
+
+    dims = 2
+    has_m = False
+    if geomtype & (ewkb_z | ewkb_m | ewkb_srid):
+        if geomtype & ewkb_z:
+            dims = 3
+        if geomtype & ewkb_m:
+            has_m = True
+        if geomtype & ewkb_srid:
+            offset += 4
+        geomtype &= 0x0fffffff
+    elif geomtype > 1000:
+        # ISO WKB: 1000 = Z, 2000 = M, 3000 = ZM
+        flavour = geomtype // 1000
+        if flavour == 1 or flavour == 3:
+            dims = 3
+        if flavour == 2 or flavour == 3:
+            has_m = True
+        geomtype %= 1000
+
+    if not geometry_types.has_key(geomtype):
+        raise Exception("Unsupported geometry type %s" % geomtype)
+
+    stride = dims + (has_m and 1 or 0)
+    geomname = geometry_types[geomtype]
+
+    if geomtype == 1:
+        coords, offset = _read_points(data, offset, byteorder, 1, stride, dims)
+        return {"type": geomname, "coordinates": coords[0]}, offset
+
+    elif geomtype == 2:
+        coords, offset = _read_linestring(data, offset, byteorder, stride, dims)
+        return {"type": geomname, "coordinates": coords}, offset
+
+    elif geomtype == 3:
+        coords, offset = _read_polygon(data, offset, byteorder, stride, dims)
+        return {"type": geomname, "coordinates": coords}, offset
+
+    count = uint32[byteorder].unpack_from(data, offset)[0]
+    offset += 4
+
+    if geomtype == 7:
+        geometries = []
+        for i in xrange(count):
+            part, offset = _read_geometry(data, offset)
+            geometries.append(part)
+        return {"type": geomname, "geometries": geometries}, offset
+
+    coords = []
+    for i in xrange(count):
+        part, offset = _read_geometry(data, offset)
+        coords.append(part['coordinates'])
+    return {"type": geomname, "coordinates": coords}, offset
+
+def _read_polygon (data, offset, byteorder, stride, dims):
+    count = uint32[byteorder].unpack_from(data, offset)[0]
+    offset += 4
+    rings = []
+    for i in xrange(count):
+        ring, offset = _read_linestring(data, offset, byteorder, stride, dims)
+        rings.append(ring)
+    return rings, offset
+
+def _read_linestring (data, offset, byteorder, stride, dims):
+    count = uint32[byteorder].unpack_from(data, offset)[0]
+    return _read_points(data, offset + 4, byteorder, count, stride, dims)
+
+def _read_points (data, offset, byteorder, count, stride, dims):
+    """Reads count coordinates of stride doubles at once into a list of
+       [x, y(, z)] lists."""
+    end = offset + 8 * count * stride
+    values = array.array('d')
+    values.fromstring(data[offset:end])
+    if byteorder != native_byteorder:
+        values.byteswap()
+    values = values.tolist()
+    if stride == 2:
+        coords = [values[i:i+2] for i in xrange(0, len(values), 2)]
+    else:
+        coords = [values[i:i+dims] for i in xrange(0, len(values), stride)]
+    return coords, end
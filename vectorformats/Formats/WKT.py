@@ -17,20 +17,19 @@ class WKT(Format):
         return features    
 
 
+wkt_linestring_match = re.compile(r'\(([^()]+)\)')
+
 def from_wkt (geom):
     """wkt helper: converts from WKT to a GeoJSON-like geometry."""
-    wkt_linestring_match = re.compile(r'\(([^()]+)\)')
-    re_space             = re.compile(r"\s+")
-
     coords = []
     for line in wkt_linestring_match.findall(geom):
         rings = [[]]
         for pair in line.split(","):
-
-            if not pair.strip():
+            pair = pair.split()
+            if not pair:
                 rings.append([])
                 continue
-            rings[-1].append(map(float, re.split(re_space, pair.strip())))
+            rings[-1].append(map(float, pair))
 
         coords.append(rings[0])
 
@@ -30,6 +30,15 @@ def binary_print(binary_data):
         pass
     sys.stdout.write(binary_data)    
 
+def request_headers (environ):
+    """HTTP request headers of a CGI/WSGI environment, e.g. HTTP_IF_NONE_MATCH
+       as If-None-Match."""
+    headers = {}
+    for key, value in environ.items():
+        if key.startswith('HTTP_'):
+            headers[key[5:].replace('_', '-').title()] = value
+    return headers
+
 def mod_python (dispatch_function, apache_request):
     """mod_python handler."""    
     from mod_python import apache, util
@@ -64,7 +73,8 @@ def mod_python (dispatch_function, apache_request):
           params = params, 
           request_method = request_method, 
           post_data = post_data, 
-          accepts = accepts )
+          accepts = accepts,
+          request_headers = dict([(key.title(), value) for key, value in apache_request.headers_in.items()]) )
         
         if isinstance(returned_data, list) or isinstance(returned_data, tuple): 
             format, data = returned_data[0:2]
@@ -84,7 +94,8 @@ def mod_python (dispatch_function, apache_request):
             apache_request.status = obj.status_code
             apache_request.content_type = obj.content_type
             apache_request.send_http_header()
-            apache_request.write(obj.getData())
+            for chunk in obj.iterData():
+                apache_request.write(chunk)
 
     except ApplicationException, error:
         apache_request.content_type = "text/plain"
@@ -144,7 +155,8 @@ def wsgi (dispatch_function, environ, start_response):
           params = params, 
           request_method = request_method, 
           post_data = post_data, 
-          accepts = accepts )
+          accepts = accepts,
+          request_headers = request_headers(environ) )
         
         if isinstance(returned_data, list) or isinstance(returned_data, tuple): 
 
@@ -163,7 +175,8 @@ def wsgi (dispatch_function, environ, start_response):
             start_response("%s Message" % returned_data.status_code,
                            headers.items())
             
-            return [returned_data.getData()]
+            # streamed responses are sent chunk by chunk as they are encoded
+            return returned_data.iterData()
 
 
     except ApplicationException, error:
@@ -227,7 +240,8 @@ def cgi (dispatch_function):
           params = params, 
           request_method = request_method, 
           post_data = post_data, 
-          accepts = accepts )
+          accepts = accepts,
+          request_headers = request_headers(os.environ) )
         
         if isinstance(returned_data, list) or isinstance(returned_data, tuple): 
             format, data = returned_data[0:2]
@@ -246,6 +260,8 @@ def cgi (dispatch_function):
         else:    
             # Returned object is a 'response'
             obj = returned_data
+            if obj.status_code:
+                print "Status: %s" % obj.status_code
             if obj.extra_headers:
                 for (key, value) in obj.extra_headers.items(): 
                     print "%s: %s" % (key, value)
@@ -255,7 +271,10 @@ def cgi (dispatch_function):
             if sys.platform == "win32":
                 binary_print(obj.getData())
             else:    
-                print obj.getData()
+                for chunk in obj.iterData():
+                    sys.stdout.write(chunk)
+                    sys.stdout.flush()
+                print
     
     except ApplicationException, error:
         print "Cache-Control: max-age=10, must-revalidate" # make the client reload        
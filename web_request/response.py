@@ -1,4 +1,6 @@
 import StringIO
+import zlib
+from email.utils import formatdate, parsedate_tz, mktime_tz
 
 class Response(object): 
     status_code = 200
@@ -19,4 +21,169 @@ class Response(object):
         if len(self.encoding) > 0:
             return self.data.encode(self.encoding)
         else:
-            return str(self.data)
\ No newline at end of file
+            return str(self.data)
+    
+    def iterData(self):
+        """Returns the body as an iterable of byte strings."""
+        return [self.getData()]
+    
+    def setValidators(self, etag=None, last_modified=None):
+        """Adds the ETag and Last-Modified (unix time) headers which
+           clients send back in conditional GET requests."""
+        self.extra_headers = dict(self.extra_headers or {})
+        self.extra_headers.update(validator_headers(etag, last_modified))
+    
+    def compress(self, coding, level=6, min_size=0):
+        """Returns the response with its body compressed with coding,
+           gzip or deflate, or the response itself if the body is smaller
+           than min_size bytes."""
+        data = self.getData()
+        if len(data) < min_size:
+            return self
+        return Response(data=compress(data, coding, level), content_type=self.content_type,
+                        headers=compressed_headers(self.extra_headers, coding), status_code=self.status_code, encoding='')
+
+class NotModifiedResponse(Response):
+    """Empty 304 answer to a conditional GET request."""
+    
+    def __init__(self, etag=None, last_modified=None):
+        Response.__init__(self, data="", content_type="text/plain", status_code="304 Not Modified")
+        self.setValidators(etag, last_modified)
+
+def validator_headers(etag=None, last_modified=None):
+    headers = {}
+    if etag is not None:
+        headers['ETag'] = '"%s"' % etag
+    if last_modified is not None:
+        headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+    return headers
+
+def not_modified(request_headers, etag=None, last_modified=None):
+    """True if the If-None-Match or If-Modified-Since header of a request
+       still matches the current validators. If-None-Match takes
+       precedence as in RFC 7232."""
+    if not request_headers:
+        return False
+    if request_headers.has_key('If-None-Match'):
+        if etag is None:
+            return False
+        for tag in request_headers['If-None-Match'].split(','):
+            tag = tag.strip()
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag == '*' or tag.strip('"') == etag:
+                return True
+        return False
+    if request_headers.has_key('If-Modified-Since') and last_modified is not None:
+        since = parsedate_tz(request_headers['If-Modified-Since'])
+        if since is not None:
+            return int(last_modified) <= mktime_tz(since)
+    return False
+
+class ClosingIterator(object):
+    """Iterator over the chunks of generator which closes source as well
+       when it is closed. The finally clause of a generator only runs once
+       the generator was started, but a WSGI server may close a response
+       before it asks for the first chunk, e.g. if the client went away."""
+    
+    def __init__(self, generator, source):
+        self.generator = generator
+        self.source = source
+    
+    def __iter__(self):
+        return self
+    
+    def next(self):
+        return self.generator.next()
+    
+    def close(self):
+        try:
+            if hasattr(self.generator, 'close'):
+                self.generator.close()
+        finally:
+            if hasattr(self.source, 'close'):
+                self.source.close()
+
+class StreamingResponse(Response):
+    """Response whose data is an iterable of chunks that are encoded and
+       sent one at a time, so the body is never held in memory as a whole."""
+    
+    def encodeChunk(self, chunk):
+        if isinstance(chunk, unicode) and len(self.encoding) > 0:
+            return chunk.encode(self.encoding)
+        return str(chunk)
+    
+    def getData(self):
+        return "".join(self.iterData())
+    
+    def iterData(self):
+        return ClosingIterator(self.encodeChunks(), self.data)
+    
+    def encodeChunks(self):
+        try:
+            for chunk in self.data:
+                if chunk:
+                    yield self.encodeChunk(chunk)
+        finally:
+            # also runs when the server closes the iterable early
+            if hasattr(self.data, 'close'):
+                self.data.close()
+    
+    def compress(self, coding, level=6):
+        """Returns the response with its chunks compressed with coding as
+           they are sent."""
+        return StreamingResponse(data=compress_chunks(self.iterData(), coding, level), content_type=self.content_type,
+                                 headers=compressed_headers(self.extra_headers, coding), status_code=self.status_code, encoding='')
+
+# zlib window bits of the HTTP content codings
+compression_wbits = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+def negotiate_coding(accept_encoding, codings):
+    """Picks the first of codings the Accept-Encoding header accepts,
+       or None for an uncompressed response."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for item in accept_encoding.split(','):
+        parts = item.split(';')
+        quality = 1.0
+        for parameter in parts[1:]:
+            name, sep, value = parameter.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[parts[0].strip().lower()] = quality
+    for coding in codings:
+        if accepted.get(coding, accepted.get('*', 0.0)) > 0:
+            return coding
+    return None
+
+def compressed_headers(headers, coding):
+    headers = dict(headers or {})
+    headers['Content-Encoding'] = coding
+    headers['Vary'] = 'Accept-Encoding'
+    return headers
+
+def compress(data, coding, level=6):
+    compressor = zlib.compressobj(int(level), zlib.DEFLATED, compression_wbits[coding])
+    return compressor.compress(data) + compressor.flush()
+
+def compress_chunks(chunks, coding, level=6):
+    """Iterator compressing byte string chunks into one gzip or deflate
+       stream. Compressed data is passed on whenever zlib emits a block,
+       so the whole body is never held in memory."""
+    return ClosingIterator(iter_compressed(chunks, coding, level), chunks)
+
+def iter_compressed(chunks, coding, level=6):
+    compressor = zlib.compressobj(int(level), zlib.DEFLATED, compression_wbits[coding])
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()